@@ -1,8 +1,9 @@
 import numpy as np
 from flask import Flask, request, jsonify
 from flask_cors import CORS
-from dqn_agent import DQNAgent
 from knight_env import KnightTourEnv
+from numpy_policy import load_policy
+from symmetry import SymmetricQCache
 from model_config import get_best_model_path, get_model_info
 from typing import Tuple, Dict
 import os
@@ -14,8 +15,15 @@ CORS(app)  # Permite requisições de origens diferentes (do nosso HTML para o s
 # Cache de agentes por tamanho para melhor performance
 agents_cache = {}
 
-def load_agent_for_size(board_size: int) -> Tuple[DQNAgent, Dict]:
-    """Carrega o agente apropriado para o tamanho do tabuleiro"""
+# Indexa o cache de Q-valores pela forma canônica do tabuleiro (8 simetrias).
+# Só ative para modelos treinados com AUGMENT_SYMMETRIES (políticas equivariantes).
+USE_SYMMETRY_CACHE = False
+
+def load_agent_for_size(board_size: int) -> Tuple[object, Dict]:
+    """
+    Carrega o agente apropriado para o tamanho do tabuleiro.
+    Usa o backend NumPy (sem TensorFlow) se houver um .npz exportado ao lado dos pesos.
+    """
     
     # Verifica cache primeiro
     if board_size in agents_cache:
@@ -32,16 +40,16 @@ def load_agent_for_size(board_size: int) -> Tuple[DQNAgent, Dict]:
     state_shape = env.observation_space.shape
     action_size = env.action_space.n
     
-    # Cria e carrega o agente
-    agent = DQNAgent(state_shape, action_size, epsilon=0.0)
-    
     try:
-        agent.load(model_info['model_path'])
+        # Cria e carrega o agente
+        policy = load_policy(model_info['model_path'], state_shape, action_size)
+        agent = SymmetricQCache(policy) if USE_SYMMETRY_CACHE else policy
         
         # Log de carregamento
         status = "FALLBACK" if model_info['is_fallback'] else "PRINCIPAL"
         print(f"🎯 Modelo {status} carregado para {board_size}x{board_size}:")
         print(f"   Arquivo: {os.path.basename(model_info['model_path'])}")
+        print(f"   Backend: {type(policy).__name__}" + (" (cache simétrico)" if USE_SYMMETRY_CACHE else ""))
         print(f"   Descrição: {model_info['description']}")
         if model_info['win_rate']:
             print(f"   Taxa de vitória: {model_info['win_rate']}%")
@@ -87,26 +95,8 @@ def predict():
         
         # Reconstrói o ambiente para obter a máscara e o estado 3D
         env = KnightTourEnv(board_size=board_size)
-        env.board = np.zeros((board_size, board_size), dtype=np.int8)
-        current_pos = None
-        visited_count = 0
-        
-        for r in range(board_size):
-            for c in range(board_size):
-                if board_2d[r, c] == 1:
-                    env.board[r, c] = 1
-                    visited_count += 1
-                elif board_2d[r, c] == 2:
-                    env.board[r, c] = 2
-                    current_pos = (r, c)
-                    visited_count += 1
-        
-        env.current_pos = current_pos
-        env.visited_count = visited_count
-
-        # Obtém o estado no formato correto (3 canais) e a máscara
-        state_3_channels = env._get_observation()
-        valid_moves_mask = env._get_valid_moves_mask()
+        state_3_channels = env.set_state(board_2d)
+        valid_moves_mask = env.action_mask
         
         # O agente escolhe a melhor ação (sem exploração)
         action_index = agent.act(state_3_channels, valid_moves_mask)
@@ -165,32 +155,15 @@ def play_with_ai():
         
         # Reconstrói o ambiente
         env = KnightTourEnv(board_size=board_size)
-        env.board = np.zeros((board_size, board_size), dtype=np.int8)
-        visited_count = 0
-        current_pos = None
-        
-        for r in range(board_size):
-            for c in range(board_size):
-                if board[r, c] == 1:
-                    env.board[r, c] = 1
-                    visited_count += 1
-                elif board[r, c] == 2:
-                    env.board[r, c] = 2
-                    current_pos = (r, c)
-                    visited_count += 1
-        
-        env.current_pos = current_pos
-        env.visited_count = visited_count
-        env.path = [current_pos]  # Caminho atual
+        state = env.set_state(board)
         
         # Executa a IA até o fim do jogo
         moves = []
         done = False
-        state = env._get_observation()
         max_moves = board_size * board_size * 2  # Limite de segurança
         
         while not done and len(moves) < max_moves:
-            valid_moves_mask = env._get_valid_moves_mask()
+            valid_moves_mask = env.action_mask
             if not valid_moves_mask.any():
                 break
                 
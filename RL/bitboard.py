@@ -0,0 +1,195 @@
+"""
+Núcleo bitboard para o Passeio do Cavalo.
+
+As casas visitadas ficam em um único inteiro Python (bit i = casa i, com
+i = linha * board_size + coluna) e as casas atacadas pelo cavalo a partir de
+cada posição são pré-calculadas uma vez por tamanho de tabuleiro. Assim o
+conjunto de movimentos legais é um único AND-NOT e a contagem um popcount.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+
+# Mesma ordem de ações usada pelo KnightTourEnv
+KNIGHT_MOVES = (
+    (-2, -1), (-2, 1), (-1, -2), (-1, 2),
+    (1, -2), (1, 2), (2, -1), (2, 1)
+)
+
+# Maior tabuleiro cujo bitmask cabe em um uint64
+MAX_UINT64_BOARD_SIZE = 8
+
+if hasattr(int, 'bit_count'):
+    popcount = int.bit_count
+else:  # Python < 3.10
+    def popcount(bits):
+        """ Número de bits ligados. """
+        return bin(bits).count('1')
+
+
+@lru_cache(maxsize=None)
+def knight_move_table(board_size):
+    """
+    Tabela (casas, 8) de destinos: tabela[casa, ação] é o índice da casa de
+    destino ou -1 se o movimento sai do tabuleiro. Somente leitura.
+    """
+    squares = np.arange(board_size * board_size)
+    rows, cols = np.divmod(squares, board_size)
+    moves = np.array(KNIGHT_MOVES)
+    new_rows = rows[:, None] + moves[:, 0]
+    new_cols = cols[:, None] + moves[:, 1]
+    inside = (new_rows >= 0) & (new_rows < board_size) & (new_cols >= 0) & (new_cols < board_size)
+    table = np.where(inside, new_rows * board_size + new_cols, -1)
+    table.setflags(write=False)
+    return table
+
+
+@lru_cache(maxsize=None)
+def knight_action_targets(board_size):
+    """
+    Para cada casa, tupla de triplas (ação, casa de destino, bit da casa de
+    destino) apenas com os movimentos que permanecem no tabuleiro.
+    """
+    return tuple(
+        tuple((action, int(target), 1 << int(target)) for action, target in enumerate(targets) if target >= 0)
+        for targets in knight_move_table(board_size)
+    )
+
+
+@lru_cache(maxsize=None)
+def knight_action_bits(board_size):
+    """
+    Para cada casa, tupla de pares (ação, bit da casa de destino) apenas com os
+    movimentos que permanecem no tabuleiro.
+    """
+    return tuple(
+        tuple((action, bit) for action, _, bit in pairs)
+        for pairs in knight_action_targets(board_size)
+    )
+
+
+@lru_cache(maxsize=None)
+def knight_attack_masks(board_size):
+    """ Tupla com o bitmask de casas atacadas pelo cavalo a partir de cada casa. """
+    masks = []
+    for pairs in knight_action_bits(board_size):
+        mask = 0
+        for _, bit in pairs:
+            mask |= bit
+        masks.append(mask)
+    return tuple(masks)
+
+
+@lru_cache(maxsize=None)
+def knight_legal_moves(board_size):
+    """
+    Para cada casa, dicionário {bitmask de destinos legais: (máscara (8,),
+    índices das casas de destino)}, ambos arrays somente leitura, com todos
+    os subconjuntos das casas atacadas (no máximo 2^8 por casa). Com ele a
+    máscara de ações sai de uma consulta sobre o AND-NOT, sem percorrer os
+    movimentos.
+    """
+    table = []
+    for targets in knight_action_targets(board_size):
+        entries = {}
+        for subset in range(1 << len(targets)):
+            chosen = [targets[i] for i in range(len(targets)) if subset >> i & 1]
+            mask = np.zeros(len(KNIGHT_MOVES), dtype=bool)
+            mask[[action for action, _, _ in chosen]] = True
+            destinations = np.array([target for _, target, _ in chosen], dtype=np.intp)
+            mask.setflags(write=False)
+            destinations.setflags(write=False)
+            entries[sum(bit for _, _, bit in chosen)] = (mask, destinations)
+        table.append(entries)
+    return tuple(table)
+
+
+@lru_cache(maxsize=None)
+def knight_attack_masks_uint64(board_size):
+    """ Versão uint64 de knight_attack_masks para operações vetorizadas (até 8x8). """
+    if board_size > MAX_UINT64_BOARD_SIZE:
+        raise ValueError(f"Bitboards uint64 suportam no máximo {MAX_UINT64_BOARD_SIZE}x{MAX_UINT64_BOARD_SIZE}")
+    masks = np.array(knight_attack_masks(board_size), dtype=np.uint64)
+    masks.setflags(write=False)
+    return masks
+
+
+def square_index(pos, board_size):
+    """ Converte (linha, coluna) para o índice da casa. """
+    return pos[0] * board_size + pos[1]
+
+
+def legal_moves(square, visited, board_size):
+    """ Bitmask das casas livres alcançáveis a partir de `square`. """
+    return knight_attack_masks(board_size)[square] & ~visited
+
+
+def count_legal_moves(square, visited, board_size):
+    """ Número de movimentos legais a partir de `square`. """
+    return popcount(legal_moves(square, visited, board_size))
+
+
+def legal_actions_mask(square, visited, board_size):
+    """ Máscara booleana (8,) de ações legais na ordem de KNIGHT_MOVES. """
+    mask, _ = knight_legal_moves(board_size)[square][legal_moves(square, visited, board_size)]
+    return mask.copy()
+
+
+def board_to_bits(board):
+    """ Converte um tabuleiro 2D (qualquer valor diferente de zero = ocupado) em bitmask. """
+    bits = 0
+    for square in np.flatnonzero(np.asarray(board).ravel()):
+        bits |= 1 << int(square)
+    return bits
+
+
+def bits_to_board(bits, board_size):
+    """ Converte um bitmask em um tabuleiro 2D booleano. """
+    flat = np.array([(bits >> square) & 1 for square in range(board_size * board_size)], dtype=bool)
+    return flat.reshape(board_size, board_size)
+
+
+def encode_observations(observations):
+    """
+    Codifica observações (N, S, S, 3) do ambiente em (índice da casa do cavalo,
+    bitmask uint64 de casas ocupadas). Tabuleiros de até 8x8.
+    """
+    observations = np.asarray(observations)
+    board_size = observations.shape[-2]
+    if board_size > MAX_UINT64_BOARD_SIZE:
+        raise ValueError(f"Bitboards uint64 suportam no máximo {MAX_UINT64_BOARD_SIZE}x{MAX_UINT64_BOARD_SIZE}")
+
+    flat = observations.reshape(len(observations), board_size * board_size, 3)
+    positions = np.argmax(flat[:, :, 0], axis=1)
+    occupied = (flat[:, :, 0] + flat[:, :, 1]) > 0
+    shifts = np.arange(board_size * board_size, dtype=np.uint64)
+    bits = np.bitwise_or.reduce(occupied.astype(np.uint64) << shifts, axis=1)
+    return positions, bits
+
+
+def decode_observations(positions, bits, board_size):
+    """
+    Reconstrói de forma vetorizada as observações (N, S, S, 3) e as máscaras de
+    ações válidas (N, 8) a partir de posições e bitmasks uint64.
+    """
+    positions = np.asarray(positions, dtype=np.int64)
+    bits = np.asarray(bits, dtype=np.uint64)
+    n = len(positions)
+    rows = np.arange(n)
+    total_squares = board_size * board_size
+
+    shifts = np.arange(total_squares, dtype=np.uint64)
+    occupied = ((bits[:, None] >> shifts) & np.uint64(1)).astype(bool)
+
+    targets = knight_move_table(board_size)[positions]
+    masks = (targets >= 0) & ~occupied[rows[:, None], np.maximum(targets, 0)]
+
+    obs = np.zeros((n, total_squares, 3), dtype=np.float32)
+    obs[:, :, 1] = occupied
+    obs[rows, positions, 0] = 1.0
+    obs[rows, positions, 1] = 0.0
+    env_idx, action_idx = np.nonzero(masks)
+    obs[env_idx, targets[env_idx, action_idx], 2] = 1.0
+
+    return obs.reshape(n, board_size, board_size, 3), masks
@@ -0,0 +1,185 @@
+"""
+Checkpoints completos de treinamento, gravados em segundo plano.
+
+Cada checkpoint é um diretório ckpt_e<episódio> com:
+- agent.npz: pesos do modelo e da target network e variáveis do otimizador;
+- state.json: epsilon, episódio e contadores do loop de treinamento;
+- rng.pkl: estados dos geradores aleatórios (random, np.random e da memória);
+- replay/: arrays da memória de replay em .npy (opcional), lidos com mmap.
+
+O diretório é escrito com um nome temporário e renomeado só quando completo;
+o arquivo `latest` aponta para o último checkpoint e é trocado com os.replace.
+"""
+
+import json
+import os
+import pickle
+import queue
+import random
+import shutil
+import threading
+
+import numpy as np
+
+LATEST_FILE = 'latest'
+
+
+def capture_checkpoint(agent, episode, counters=None, include_replay=True):
+    """
+    Cópia em memória do estado de treinamento, tirada na thread principal
+    para que a gravação em segundo plano não veja o agente mudando.
+    """
+    agent_state = agent.training_state()
+    return {
+        'agent': agent_state,
+        'state': {'episode': episode, 'epsilon': agent_state['epsilon'], **(counters or {})},
+        'rng': {
+            'python': random.getstate(),
+            'numpy': np.random.get_state(),
+            'replay': agent.memory.rng.bit_generator.state,
+        },
+        'replay': agent.memory.snapshot() if include_replay else None,
+    }
+
+
+def write_checkpoint(directory, checkpoint, keep=2):
+    """ Grava um checkpoint de forma atômica e atualiza `latest`. Retorna o caminho final. """
+    os.makedirs(directory, exist_ok=True)
+    name = f"ckpt_e{checkpoint['state']['episode']:07d}"
+    final_path = os.path.join(directory, name)
+    tmp_path = os.path.join(directory, f".tmp-{name}")
+    if os.path.exists(tmp_path):
+        shutil.rmtree(tmp_path)
+    os.makedirs(tmp_path)
+
+    agent_state = checkpoint['agent']
+    arrays = {}
+    for prefix, key in (('w', 'weights'), ('t', 'target_weights'), ('o', 'optimizer')):
+        arrays.update({f'{prefix}{i}': value for i, value in enumerate(agent_state[key])})
+    np.savez(os.path.join(tmp_path, 'agent.npz'), **arrays)
+
+    state = dict(checkpoint['state'])
+    if checkpoint['replay'] is not None:
+        replay_arrays, head, size = checkpoint['replay']
+        os.makedirs(os.path.join(tmp_path, 'replay'))
+        for field, values in replay_arrays.items():
+            np.save(os.path.join(tmp_path, 'replay', f'{field}.npy'), values)
+        state['replay'] = {'head': head, 'size': size, 'fields': list(replay_arrays)}
+
+    with open(os.path.join(tmp_path, 'state.json'), 'w') as f:
+        json.dump(state, f, indent=2)
+    with open(os.path.join(tmp_path, 'rng.pkl'), 'wb') as f:
+        pickle.dump(checkpoint['rng'], f)
+
+    if os.path.exists(final_path):
+        shutil.rmtree(final_path)
+    os.rename(tmp_path, final_path)
+
+    latest_tmp = os.path.join(directory, LATEST_FILE + '.tmp')
+    with open(latest_tmp, 'w') as f:
+        f.write(name)
+    os.replace(latest_tmp, os.path.join(directory, LATEST_FILE))
+
+    _prune(directory, keep)
+    return final_path
+
+
+def _prune(directory, keep):
+    checkpoints = sorted(d for d in os.listdir(directory) if d.startswith('ckpt_e'))
+    for name in checkpoints[:-keep] if keep > 0 else []:
+        shutil.rmtree(os.path.join(directory, name), ignore_errors=True)
+
+
+def latest_checkpoint(directory):
+    """ Caminho do último checkpoint completo, ou None. """
+    latest_path = os.path.join(directory, LATEST_FILE)
+    if not os.path.exists(latest_path):
+        return None
+    with open(latest_path) as f:
+        path = os.path.join(directory, f.read().strip())
+    return path if os.path.isdir(path) else None
+
+
+def load_checkpoint(path):
+    """ Lê um checkpoint gravado por write_checkpoint. A memória de replay vem memory-mapped. """
+    with open(os.path.join(path, 'state.json')) as f:
+        state = json.load(f)
+    with open(os.path.join(path, 'rng.pkl'), 'rb') as f:
+        rng = pickle.load(f)
+
+    with np.load(os.path.join(path, 'agent.npz')) as data:
+        def stacked(prefix):
+            count = len([key for key in data.files if key.startswith(prefix)])
+            return [data[f'{prefix}{i}'] for i in range(count)]
+
+        agent_state = {
+            'weights': stacked('w'),
+            'target_weights': stacked('t'),
+            'optimizer': stacked('o'),
+            'epsilon': state['epsilon'],
+        }
+
+    replay = None
+    if 'replay' in state:
+        arrays = {
+            field: np.load(os.path.join(path, 'replay', f'{field}.npy'), mmap_mode='r')
+            for field in state['replay']['fields']
+        }
+        replay = (arrays, state['replay']['head'], state['replay']['size'])
+
+    return {'agent': agent_state, 'state': state, 'rng': rng, 'replay': replay}
+
+
+def restore_checkpoint(agent, checkpoint):
+    """ Aplica um checkpoint ao agente e aos geradores aleatórios. Retorna o dicionário `state`. """
+    agent.restore_training_state(checkpoint['agent'])
+    if checkpoint['replay'] is not None:
+        agent.memory.restore(*checkpoint['replay'])
+
+    random.setstate(checkpoint['rng']['python'])
+    np.random.set_state(checkpoint['rng']['numpy'])
+    agent.memory.rng.bit_generator.state = checkpoint['rng']['replay']
+    return checkpoint['state']
+
+
+class CheckpointWriter:
+    """
+    Grava checkpoints em uma thread em segundo plano. submit() só bloqueia se
+    o checkpoint anterior ainda estiver sendo gravado (no máximo um pendente).
+    """
+
+    def __init__(self, directory, keep=2):
+        self.directory = directory
+        self.keep = keep
+        self.last_path = None
+        self._error = None
+        self._queue = queue.Queue(maxsize=1)
+        self._thread = threading.Thread(target=self._run, name='checkpoint-writer', daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            checkpoint = self._queue.get()
+            try:
+                if checkpoint is None:
+                    return
+                self.last_path = write_checkpoint(self.directory, checkpoint, self.keep)
+            except Exception as error:
+                self._error = error
+            finally:
+                self._queue.task_done()
+
+    def _raise_pending_error(self):
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise RuntimeError("Falha ao gravar checkpoint") from error
+
+    def submit(self, checkpoint):
+        self._raise_pending_error()
+        self._queue.put(checkpoint)
+
+    def close(self):
+        """ Espera a gravação pendente terminar e encerra a thread. """
+        self._queue.put(None)
+        self._thread.join()
+        self._raise_pending_error()
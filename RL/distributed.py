@@ -0,0 +1,450 @@
+"""
+Treinamento distribuído local (atores/aprendiz) usando apenas multiprocessing.
+
+N processos atores rodam cada um um VecKnightTourEnv com uma cópia NumPy da
+política (sem TensorFlow) e escrevem transições em uma memória de replay em
+memória compartilhada. O processo aprendiz (o próprio train.py) executa os
+passos de gradiente do DQNAgent e publica os novos pesos periodicamente.
+"""
+
+import multiprocessing as mp
+import queue
+import time
+import traceback
+from collections import deque
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from numpy_policy import NumpyPolicy, epsilon_greedy
+from bitboard import MAX_UINT64_BOARD_SIZE, encode_observations
+from replay_buffer import CompactReplayBuffer, ReplayBuffer
+from vec_env import VecKnightTourEnv, STATUS_WIN, STATUS_INVALID_MOVE
+
+# Intervalo (s) entre as verificações de que os atores continuam vivos
+ACTOR_CHECK_INTERVAL = 0.5
+
+
+class SharedReplayBuffer(ReplayBuffer):
+    """
+    Memória de replay (buffer circular) cujos arrays vivem em blocos de
+    multiprocessing.shared_memory, compartilhados entre atores e aprendiz.
+
+    head/size ficam em um array compartilhado; o lock é um multiprocessing.Lock,
+    então escritas em lote e amostragens nunca leem uma linha pela metade.
+    Cada processo tem seu próprio gerador aleatório.
+    """
+
+    def __init__(self, capacity, state_shape, action_size=8, seed=None, ctx=None):
+        ctx = mp.get_context('spawn') if ctx is None else ctx
+        self.capacity = int(capacity)
+        self.state_shape = tuple(state_shape)
+        self.action_size = action_size
+        self.lock = ctx.Lock()
+        self.rng = np.random.default_rng(seed)
+
+        self._owner = True
+        self._blocks = {}
+        self._allocate()
+
+    def _fields(self):
+        return {
+            'states': ((self.capacity,) + self.state_shape, np.float32),
+            'actions': ((self.capacity,), np.int32),
+            'rewards': ((self.capacity,), np.float32),
+            'next_states': ((self.capacity,) + self.state_shape, np.float32),
+            'dones': ((self.capacity,), bool),
+            'next_masks': ((self.capacity, self.action_size), bool),
+            # head, size e total de transições já inseridas
+            '_counters': ((3,), np.int64),
+        }
+
+    def _allocate(self, names=None):
+        for field, (shape, dtype) in self._fields().items():
+            if names is None:
+                nbytes = max(int(np.prod(shape)) * np.dtype(dtype).itemsize, 1)
+                block = shared_memory.SharedMemory(create=True, size=nbytes)
+            else:
+                block = shared_memory.SharedMemory(name=names[field])
+            self._blocks[field] = block
+            setattr(self, field, np.ndarray(shape, dtype=dtype, buffer=block.buf))
+        if names is None:
+            self._counters[:] = 0
+            if 'next_masks' in self._blocks:
+                self.next_masks[:] = True
+
+    def __getstate__(self):
+        # Envia apenas os nomes dos blocos: o processo filho se conecta a eles
+        return {
+            'capacity': self.capacity,
+            'state_shape': self.state_shape,
+            'action_size': self.action_size,
+            'lock': self.lock,
+            'names': {field: block.name for field, block in self._blocks.items()},
+        }
+
+    def __setstate__(self, state):
+        self.capacity = state['capacity']
+        self.state_shape = state['state_shape']
+        self.action_size = state['action_size']
+        self.lock = state['lock']
+        self.rng = np.random.default_rng()
+        self._owner = False
+        self._blocks = {}
+        self._allocate(state['names'])
+
+    @property
+    def head(self):
+        return int(self._counters[0])
+
+    @property
+    def size(self):
+        return int(self._counters[1])
+
+    @property
+    def total_added(self):
+        """ Total de transições inseridas desde o início (passos do ambiente). """
+        return int(self._counters[2])
+
+    def add(self, state, action, reward, next_state, done, next_mask=None):
+        """ Armazena uma transição, sobrescrevendo a mais antiga quando cheio. """
+        mask = np.ones((1, self.action_size), dtype=bool) if next_mask is None else np.asarray(next_mask)[None]
+        self.add_batch(np.asarray(state)[None], [action], [reward], np.asarray(next_state)[None], [done], mask)
+
+    def add_batch(self, states, actions, rewards, next_states, dones, next_masks):
+        """ Armazena N transições de uma vez (um passo de um ambiente vetorizado). """
+        n = len(actions)
+        with self.lock:
+            idx = (self._counters[0] + np.arange(n)) % self.capacity
+            self.states[idx] = states
+            self.actions[idx] = actions
+            self.rewards[idx] = rewards
+            self.next_states[idx] = next_states
+            self.dones[idx] = dones
+            self.next_masks[idx] = next_masks
+
+            self._counters[0] = (self._counters[0] + n) % self.capacity
+            self._counters[1] = min(self._counters[1] + n, self.capacity)
+            self._counters[2] += n
+
+    def close(self):
+        """ Desconecta os blocos compartilhados (e os libera, no processo dono). """
+        for field in self._fields():
+            setattr(self, field, None)
+        for block in self._blocks.values():
+            block.close()
+            if self._owner:
+                block.unlink()
+        self._blocks = {}
+
+
+class SharedCompactReplayBuffer(SharedReplayBuffer):
+    """
+    Versão compartilhada da CompactReplayBuffer (tabuleiros de até 8x8): cada
+    estado é (casa do cavalo, bitmask uint64), codificado pelo ator antes de
+    pegar o lock; a amostragem reconstrói observações e máscaras.
+    """
+
+    FIELDS = CompactReplayBuffer.FIELDS
+    _gather = CompactReplayBuffer._gather
+
+    def __init__(self, capacity, state_shape, action_size=8, seed=None, ctx=None):
+        if state_shape[0] > MAX_UINT64_BOARD_SIZE:
+            raise ValueError(f"Memória compacta suporta no máximo {MAX_UINT64_BOARD_SIZE}x{MAX_UINT64_BOARD_SIZE}")
+        super().__init__(capacity, state_shape, action_size, seed, ctx)
+
+    @property
+    def board_size(self):
+        return self.state_shape[0]
+
+    def _fields(self):
+        return {
+            'positions': ((self.capacity,), np.int16),
+            'visited_bits': ((self.capacity,), np.uint64),
+            'actions': ((self.capacity,), np.int32),
+            'rewards': ((self.capacity,), np.float32),
+            'next_positions': ((self.capacity,), np.int16),
+            'next_visited_bits': ((self.capacity,), np.uint64),
+            'dones': ((self.capacity,), bool),
+            '_counters': ((3,), np.int64),
+        }
+
+    def add_batch(self, states, actions, rewards, next_states, dones, next_masks):
+        """ Armazena N transições; as máscaras são derivadas do bitmask na amostragem. """
+        n = len(actions)
+        positions, bits = encode_observations(np.concatenate([states, next_states]))
+        with self.lock:
+            idx = (self._counters[0] + np.arange(n)) % self.capacity
+            self.positions[idx] = positions[:n]
+            self.visited_bits[idx] = bits[:n]
+            self.actions[idx] = actions
+            self.rewards[idx] = rewards
+            self.next_positions[idx] = positions[n:]
+            self.next_visited_bits[idx] = bits[n:]
+            self.dones[idx] = dones
+
+            self._counters[0] = (self._counters[0] + n) % self.capacity
+            self._counters[1] = min(self._counters[1] + n, self.capacity)
+            self._counters[2] += n
+
+
+class SharedWeights:
+    """
+    Pesos da política em um vetor float32 compartilhado, com contador de versão.
+    O aprendiz publica; os atores só copiam quando a versão muda.
+    """
+
+    def __init__(self, weights, ctx=None):
+        ctx = mp.get_context('spawn') if ctx is None else ctx
+        self.shapes = [np.shape(w) for w in weights]
+        self.sizes = [int(np.prod(shape)) for shape in self.shapes]
+        self.array = ctx.Array('f', sum(self.sizes))
+        self.version = ctx.Value('q', 0)
+        self.publish(weights)
+
+    def publish(self, weights):
+        flat = np.concatenate([np.asarray(w, dtype=np.float32).ravel() for w in weights])
+        with self.array.get_lock():
+            np.frombuffer(self.array.get_obj(), dtype=np.float32)[:] = flat
+            self.version.value += 1
+
+    def fetch(self, known_version):
+        """ Retorna (versão, lista de pesos) ou (known_version, None) se não houver novidade. """
+        if self.version.value == known_version:
+            return known_version, None
+        with self.array.get_lock():
+            version = self.version.value
+            flat = np.frombuffer(self.array.get_obj(), dtype=np.float32).copy()
+        weights = [chunk.reshape(shape) for chunk, shape in
+                   zip(np.split(flat, np.cumsum(self.sizes)[:-1]), self.shapes)]
+        return version, weights
+
+
+def _drain(q):
+    """ Itens disponíveis na fila, sem bloquear. """
+    while True:
+        try:
+            yield q.get_nowait()
+        except queue.Empty:
+            return
+
+
+def data_allowance(gradient_steps, warmup, train_every, gradient_steps_per_update, max_data_ratio=1.0):
+    """
+    Transições que os atores podem ter escrito dado o progresso do aprendiz:
+    as do warm-up mais max_data_ratio * train_every por update de
+    gradient_steps_per_update passos, incluindo o próximo update. Com
+    max_data_ratio = 1 mantém a razão passos de ambiente / passos de gradiente
+    do treino de um processo.
+    """
+    return warmup + (gradient_steps // gradient_steps_per_update + 1) * train_every * max_data_ratio
+
+
+def actor_loop(actor_id, replay, weights, epsilon, stop_event, episode_queue,
+               board_size, num_envs, max_steps, state_shape, learner_steps, schedule):
+    """
+    Processo ator: joga num_envs tabuleiros em paralelo com a política mais
+    recente publicada, escreve as transições na memória compartilhada e envia
+    as estatísticas dos episódios terminados para o aprendiz.
+
+    Se schedule for a tupla (warmup, train_every, gradient_steps_per_update,
+    max_data_ratio), o ator espera enquanto a memória estiver à frente de
+    data_allowance() para os passos de gradiente já dados (learner_steps);
+    com schedule None a coleta nunca espera pelo aprendiz.
+    """
+    # Não segura o encerramento do ator esperando o aprendiz consumir a fila
+    episode_queue.cancel_join_thread()
+    rng = np.random.default_rng()
+    env = VecKnightTourEnv(num_envs, board_size=board_size, max_steps=max_steps)
+
+    version, policy_weights = weights.fetch(-1)
+    policy = NumpyPolicy(policy_weights, state_shape)
+
+    states, info = env.reset(return_info=True)
+    masks = info['action_mask']
+    episode_rewards = np.zeros(num_envs)
+    episode_lengths = np.zeros(num_envs, dtype=np.int64)
+    invalid_moves = np.zeros(num_envs, dtype=np.int64)
+
+    while not stop_event.is_set():
+        if schedule is not None and replay.total_added >= data_allowance(learner_steps.value, *schedule):
+            time.sleep(0.0005)
+            continue
+
+        version, new_weights = weights.fetch(version)
+        if new_weights is not None:
+            policy = NumpyPolicy(new_weights, state_shape)
+
+        actions = epsilon_greedy(policy, states, masks, epsilon.value, rng)
+        next_states, rewards, dones, info = env.step(actions)
+
+        # Para os tabuleiros reiniciados, o próximo estado (e máscara) da transição é o terminal
+        stored_next_states, stored_next_masks = next_states, info['action_mask']
+        done_idx = np.flatnonzero(dones)
+        if len(done_idx) > 0:
+            stored_next_states = next_states.copy()
+            stored_next_states[done_idx] = info['final_observation']
+            stored_next_masks = stored_next_masks.copy()
+            stored_next_masks[done_idx] = info['final_action_mask']
+
+        # Episódios cortados por max_steps não são terminais: a transição mantém o bootstrap
+        terminals = dones & ~info['truncated']
+        replay.add_batch(states, actions, rewards, stored_next_states, terminals, stored_next_masks)
+
+        episode_rewards += rewards
+        episode_lengths += 1
+        invalid_moves += info['status'] == STATUS_INVALID_MOVE
+
+        if len(done_idx) > 0:
+            finished = [
+                (int(episode_lengths[i]), int(info['visited_count'][i]), float(episode_rewards[i]),
+                 int(invalid_moves[i]), int(info['status'][i] == STATUS_WIN))
+                for i in done_idx
+            ]
+            episode_queue.put(finished)
+            episode_rewards[done_idx] = 0
+            episode_lengths[done_idx] = 0
+            invalid_moves[done_idx] = 0
+
+        states, masks = next_states, info['action_mask']
+
+
+def _actor_main(actor_id, error_queue, *args):
+    """ Ponto de entrada do processo ator: repassa o traceback de uma falha ao aprendiz. """
+    try:
+        actor_loop(actor_id, *args)
+    except Exception:
+        error_queue.put((actor_id, traceback.format_exc()))
+        raise
+
+
+def _check_actors(actors, error_queue):
+    """ Levanta RuntimeError se algum ator terminou antes do fim do treino. """
+    dead = [(i, actor.exitcode) for i, actor in enumerate(actors) if actor.exitcode is not None]
+    if not dead:
+        return
+    tracebacks = dict(_drain(error_queue))
+    details = "\n".join(
+        f"Ator {i} terminou com código {exitcode}:\n"
+        + tracebacks.get(i, "(sem traceback: o processo falhou antes de iniciar, veja o stderr)")
+        for i, exitcode in dead
+    )
+    raise RuntimeError(f"{len(dead)} de {len(actors)} ator(es) terminaram inesperadamente\n{details}")
+
+
+def train_distributed(agent, num_actors, episodes, batch_size, board_size, memory_size,
+                      train_every, gradient_steps_per_update, learning_starts, target_update,
+                      weight_sync=50, envs_per_actor=16, max_steps=None, max_data_ratio=None,
+                      log_writer=None, on_summary=None):
+    """
+    Loop do aprendiz. A razão update-to-data (gradient_steps_per_update /
+    train_every) é um teto: o aprendiz nunca treina à frente dos dados.
+
+    Com max_data_ratio None os atores coletam o mais rápido que conseguem e a
+    vazão cresce com o número de atores (o aprendiz pode ficar com menos passos
+    de gradiente por transição do que no treino de um processo). Com um valor
+    >= 1 os atores esperam quando coletaram mais de max_data_ratio vezes as
+    transições que a agenda liberaria para os passos de gradiente já dados
+    (1 = mesma razão do treino de um processo).
+
+    log_writer(episode, score, max_visited, avg_reward, invalid_moves, epsilon, win)
+    é chamado por episódio (ex.: TrainingLogger.log) e
+    on_summary(episode, last_100, stats) é chamado a cada 100 episódios.
+    """
+    ctx = mp.get_context('spawn')
+    state_shape = tuple(agent.state_shape)
+
+    # Mesmo formato de armazenamento da memória do agente ('dense' ou 'compact')
+    replay_cls = SharedCompactReplayBuffer if isinstance(agent.memory, CompactReplayBuffer) else SharedReplayBuffer
+    replay = replay_cls(memory_size, state_shape, agent.action_size, ctx=ctx)
+    # O aprendiz amostra diretamente da memória compartilhada
+    agent.memory = replay
+
+    weights = SharedWeights(agent.model.get_weights(), ctx=ctx)
+    epsilon = ctx.Value('d', agent.epsilon, lock=False)
+    stop_event = ctx.Event()
+    episode_queue = ctx.Queue()
+    learner_steps = ctx.Value('q', 0, lock=False)
+    error_queue = ctx.Queue()
+    warmup = max(learning_starts, batch_size)
+    schedule = None if max_data_ratio is None else (warmup, train_every, gradient_steps_per_update, max_data_ratio)
+
+    actors = [
+        ctx.Process(
+            target=_actor_main,
+            args=(i, error_queue, replay, weights, epsilon, stop_event, episode_queue,
+                  board_size, envs_per_actor, max_steps, state_shape, learner_steps, schedule),
+            daemon=True,
+        )
+        for i in range(num_actors)
+    ]
+    for actor in actors:
+        actor.start()
+    print(f"🚀 {num_actors} atores iniciados ({envs_per_actor} tabuleiros cada)")
+
+    episode = 0
+    gradient_steps = 0
+    last_100 = deque(maxlen=100)
+    start_time = time.time()
+    next_actor_check = start_time
+
+    try:
+        while episode < episodes:
+            # Sem atores vivos nenhum episódio chegaria e o aprendiz esperaria para sempre
+            if time.time() >= next_actor_check:
+                _check_actors(actors, error_queue)
+                next_actor_check = time.time() + ACTOR_CHECK_INTERVAL
+
+            for finished in _drain(episode_queue):
+                for score, visited, total_reward, invalid, win in finished:
+                    if episode >= episodes:
+                        break
+                    # Epsilon decai uma vez por episódio, como no treino de um processo
+                    agent.decay_epsilon()
+                    epsilon.value = agent.epsilon
+
+                    avg_reward = total_reward / score if score > 0 else 0
+                    if log_writer is not None:
+                        log_writer(episode, score, visited, avg_reward, invalid, agent.epsilon, win)
+                    last_100.append({
+                        'episode': episode,
+                        'score': score,
+                        'visited': visited,
+                        'win': win,
+                        'epsilon': agent.epsilon,
+                        'avg_reward': avg_reward,
+                        'invalid_moves': invalid
+                    })
+                    episode += 1
+
+                    if episode % 100 == 0 and on_summary is not None:
+                        on_summary(episode - 1, list(last_100), {
+                            'total_steps': replay.total_added,
+                            'gradient_steps': gradient_steps,
+                            'memory': len(replay),
+                            'steps_per_sec': replay.total_added / (time.time() - start_time),
+                        })
+
+            # Passos de gradiente liberados pelos dados coletados até agora
+            collected = replay.total_added - warmup
+            budget = (collected // train_every) * gradient_steps_per_update if collected >= 0 else 0
+            if len(replay) >= warmup and gradient_steps < budget:
+                agent.replay(batch_size, decay_epsilon=False)
+                gradient_steps += 1
+                learner_steps.value = gradient_steps
+
+                if gradient_steps % target_update == 0:
+                    agent.update_target_model()
+                if gradient_steps % weight_sync == 0:
+                    weights.publish(agent.model.get_weights())
+            else:
+                time.sleep(0.001)
+    finally:
+        stop_event.set()
+        for actor in actors:
+            actor.join(timeout=5)
+            if actor.is_alive():
+                actor.terminate()
+        replay.close()
+
+    return gradient_steps
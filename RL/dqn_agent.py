@@ -3,18 +3,100 @@ import tensorflow as tf
 from tensorflow.keras.models import Sequential
 from tensorflow.keras.layers import Conv2D, Dense, Flatten
 from tensorflow.keras.optimizers import Adam
-from collections import deque
 import random
 
-class DQNAgent:
+from replay_buffer import ReplayBuffer, CompactReplayBuffer
+from eval_cache import file_sha256
+from numpy_policy import GreedyPolicyMixin, save_weights_npz, npz_path_for
+from symmetry import augment_batch
+
+
+def build_q_network(state_shape, action_size):
+    """
+    Constrói uma rede neural convolucional (CNN) para o modelo DQN, sem compilar.
+    CNNs são mais eficazes para processar dados espaciais como um tabuleiro.
+    """
+    model = Sequential()
+    model.add(Conv2D(32, kernel_size=(3, 3), activation='relu', 
+                     input_shape=state_shape, padding='same'))
+    model.add(Conv2D(64, kernel_size=(3, 3), activation='relu', padding='same'))
+    model.add(Flatten())
+    model.add(Dense(64, activation='relu'))
+    model.add(Dense(action_size, activation='linear'))
+    return model
+
+
+def _make_predict_fn(model, state_shape):
+    """ Inferência com assinatura fixa: evita o data adapter do Keras predict a cada jogada. """
+    return tf.function(
+        lambda states: model(states, training=False),
+        input_signature=[tf.TensorSpec((None,) + tuple(state_shape), tf.float32)]
+    )
+
+
+def _optimizer_variables(optimizer):
+    """ Variáveis do otimizador: propriedade no Keras >= 2.11, método nas versões anteriores. """
+    variables = optimizer.variables
+    return list(variables() if callable(variables) else variables)
+
+
+class _KerasPolicyMixin(GreedyPolicyMixin):
+    """ Inferência comum às políticas com rede Keras (self.model e self._predict_fn). """
+
+    def _forward(self, states):
+        return self._predict_fn(states).numpy()
+
+    def export_numpy(self, path=None, weights_path=None):
+        """
+        Exporta os pesos para um .npz carregável por numpy_policy.NumpyPolicy,
+        sem TensorFlow. Por padrão usa o caminho derivado de weights_path; o
+        sha256 de weights_path fica gravado para load_policy detectar um .npz
+        desatualizado.
+        """
+        if path is None:
+            path = npz_path_for(weights_path)
+        source_sha256 = file_sha256(weights_path) if weights_path is not None else None
+        save_weights_npz(self.model.get_weights(), path, self.state_shape, source_sha256)
+        return path
+
+
+class InferencePolicy(_KerasPolicyMixin):
+    """
+    Política apenas para inferência: uma única rede não compilada, sem target
+    network, otimizador ou memória de replay. Mesma interface de inferência do
+    DQNAgent (q_values, act, act_batch), gulosa por padrão (epsilon = 0).
+    """
+    def __init__(self, state_shape, action_size):
+        self.state_shape = state_shape
+        self.action_size = action_size
+        self.epsilon = 0.0
+        self.model = build_q_network(state_shape, action_size)
+        self._predict_fn = _make_predict_fn(self.model, state_shape)
+
+    def load(self, name):
+        """ Carrega os pesos do modelo a partir de um arquivo. """
+        self.model.load_weights(name)
+
+
+class DQNAgent(_KerasPolicyMixin):
     """
     Agente de Deep Q-Learning (DQN) para o problema do Passeio do Cavalo.
     """
     def __init__(self, state_shape, action_size, learning_rate=0.001, gamma=0.99, 
-                 epsilon=1.0, epsilon_decay=0.995, epsilon_min=0.01):
+                 epsilon=1.0, epsilon_decay=0.995, epsilon_min=0.01, memory_size=50000,
+                 replay_storage='dense', loss='mse', jit_compile=False, double_dqn=False,
+                 augment_symmetries=False):
         self.state_shape = state_shape
         self.action_size = action_size
-        self.memory = deque(maxlen=50000)
+
+        # 'dense' guarda as observações completas; 'compact' guarda posição + bitmask
+        # (até 8x8), permitindo memórias de milhões de transições
+        if replay_storage == 'compact':
+            self.memory = CompactReplayBuffer(memory_size, state_shape, action_size)
+        elif replay_storage == 'dense':
+            self.memory = ReplayBuffer(memory_size, state_shape, action_size)
+        else:
+            raise ValueError(f"replay_storage inválido: {replay_storage} (use 'dense' ou 'compact')")
         
         # Hiperparâmetros
         self.gamma = gamma    # Fator de desconto
@@ -22,34 +104,48 @@ class DQNAgent:
         self.epsilon_min = epsilon_min
         self.epsilon_decay = epsilon_decay
         self.learning_rate = learning_rate
+        self.double_dqn = double_dqn # Ação do próximo estado escolhida pela rede online, avaliada pela target
+        self.augment_symmetries = augment_symmetries # Rotações/reflexões aleatórias em cada minibatch
+
+        if loss == 'huber':
+            self.loss_fn = tf.keras.losses.Huber()
+        elif loss == 'mse':
+            self.loss_fn = tf.keras.losses.MeanSquaredError()
+        else:
+            raise ValueError(f"loss inválida: {loss} (use 'mse' ou 'huber')")
         
         self.model = self._build_model()
         self.target_model = self._build_model()
         self.update_target_model()
 
-    def _build_model(self):
+        # Passo de treinamento compilado em um único grafo (opcionalmente com XLA)
+        self._train_step = tf.function(self._train_step_impl, jit_compile=jit_compile)
+
+        self._predict_fn = _make_predict_fn(self.model, self.state_shape)
+
+    @classmethod
+    def for_inference(cls, path, state_shape, action_size=8):
         """
-        Constrói uma rede neural convolucional (CNN) para o modelo DQN.
-        CNNs são mais eficazes para processar dados espaciais como um tabuleiro.
+        Carrega pesos em uma InferencePolicy leve (uma rede, sem compilar), em
+        vez de um agente completo com target network, otimizador e memória.
         """
-        model = Sequential()
-        model.add(Conv2D(32, kernel_size=(3, 3), activation='relu', 
-                         input_shape=self.state_shape, padding='same'))
-        model.add(Conv2D(64, kernel_size=(3, 3), activation='relu', padding='same'))
-        model.add(Flatten())
-        model.add(Dense(64, activation='relu'))
-        model.add(Dense(self.action_size, activation='linear'))
-        
-        model.compile(loss='mse', optimizer=Adam(learning_rate=self.learning_rate))
+        policy = InferencePolicy(state_shape, action_size)
+        policy.load(path)
+        return policy
+
+    def _build_model(self):
+        """ Constrói e compila a rede do DQN. """
+        model = build_q_network(self.state_shape, self.action_size)
+        model.compile(loss=self.loss_fn, optimizer=Adam(learning_rate=self.learning_rate))
         return model
 
     def update_target_model(self):
         """ Copia os pesos do modelo principal para o modelo alvo. """
         self.target_model.set_weights(self.model.get_weights())
 
-    def remember(self, state, action, reward, next_state, done):
+    def remember(self, state, action, reward, next_state, done, next_valid_moves_mask=None):
         """ Armazena a experiência na memória de replay. """
-        self.memory.append((state, action, reward, next_state, done))
+        self.memory.add(state, action, reward, next_state, done, next_valid_moves_mask)
 
     def act(self, state, valid_moves_mask):
         """
@@ -64,50 +160,118 @@ class DQNAgent:
                 return random.randrange(self.action_size) # Fallback
 
         # Explotação: escolhe a melhor ação válida com base nos Q-valores
-        state_tensor = np.expand_dims(state, axis=0)
-        act_values = self.model.predict(state_tensor, verbose=0)[0]
-        
-        # Aplica a máscara: define Q-valores de ações inválidas como -infinito
-        masked_act_values = np.where(valid_moves_mask, act_values, -np.inf)
+        masked_act_values = self.q_values(state, valid_moves_mask)
         
         return np.argmax(masked_act_values)
 
-    def replay(self, batch_size):
+    def decay_epsilon(self):
+        """ Aplica um passo de decaimento à taxa de exploração. """
+        if self.epsilon > self.epsilon_min:
+            self.epsilon *= self.epsilon_decay
+
+    def replay(self, batch_size, decay_epsilon=True):
         """
         Treina o agente com experiências da memória (Experience Replay).
+        Com decay_epsilon=False o decaimento fica a cargo de quem chama (decay_epsilon()).
         """
         if len(self.memory) < batch_size:
             return
             
-        minibatch = random.sample(self.memory, batch_size)
-        
-        states = np.array([t[0] for t in minibatch])
-        actions = np.array([t[1] for t in minibatch])
-        rewards = np.array([t[2] for t in minibatch])
-        next_states = np.array([t[3] for t in minibatch])
-        dones = np.array([t[4] for t in minibatch])
-
-        # Alvo para o treinamento do batch
-        target_q = self.model.predict(states, verbose=0)
-        # Q-valores futuros para o cálculo do TD target
-        next_q_values = self.target_model.predict(next_states, verbose=0)
-        
-        for i in range(batch_size):
-            if dones[i]:
-                target_q[i][actions[i]] = rewards[i]
-            else:
-                target_q[i][actions[i]] = rewards[i] + self.gamma * np.amax(next_q_values[i])
+        loss = self.train_on_batch(self.sample_batch(batch_size))
 
-        self.model.fit(states, target_q, epochs=1, verbose=0, batch_size=batch_size)
+        if decay_epsilon:
+            self.decay_epsilon()
 
-        if self.epsilon > self.epsilon_min:
-            self.epsilon *= self.epsilon_decay
+        return loss
+
+    def sample_batch(self, batch_size):
+        """
+        Sorteia um minibatch da memória (com augmentação por simetrias, se
+        ativa). Pode ser chamado de uma thread de prefetch.
+        """
+        batch = self.memory.sample(batch_size)
+        if self.augment_symmetries:
+            batch = augment_batch(*batch, rng=self.memory.rng)
+        return batch
+
+    def train_on_batch(self, batch):
+        """ Um passo de gradiente sobre um minibatch já sorteado. Retorna a loss. """
+        states, actions, rewards, next_states, dones, next_masks = batch
+
+        return self._train_step(
+            tf.convert_to_tensor(states, dtype=tf.float32),
+            tf.convert_to_tensor(actions, dtype=tf.int32),
+            tf.convert_to_tensor(rewards, dtype=tf.float32),
+            tf.convert_to_tensor(next_states, dtype=tf.float32),
+            tf.convert_to_tensor(dones, dtype=tf.float32),
+            tf.convert_to_tensor(next_masks, dtype=tf.bool),
+        )
+
+    def _train_step_impl(self, states, actions, rewards, next_states, dones, next_masks):
+        """
+        Calcula os TD targets, a loss e a atualização do otimizador em um único
+        grafo, no lugar de predict + predict + fit.
+        """
+        # Q-valores futuros para o cálculo do TD target, apenas sobre ações legais
+        # do próximo estado (ações ilegais nunca serão tomadas pela política)
+        next_q_values = self.target_model(next_states, training=False)
+        very_negative = tf.fill(tf.shape(next_q_values), next_q_values.dtype.min)
+        if self.double_dqn:
+            online_next_q = tf.where(next_masks, self.model(next_states, training=False), very_negative)
+            next_actions = tf.argmax(online_next_q, axis=1, output_type=tf.int32)
+            next_values = tf.gather(next_q_values, next_actions, axis=1, batch_dims=1)
+        else:
+            next_values = tf.reduce_max(tf.where(next_masks, next_q_values, very_negative), axis=1)
+
+        # Sem ações legais (ou estado terminal) não há valor futuro
+        next_values = tf.where(tf.reduce_any(next_masks, axis=1), next_values, tf.zeros_like(next_values))
+        td_targets = rewards + self.gamma * next_values * (1.0 - dones)
+
+        with tf.GradientTape() as tape:
+            q_values = self.model(states, training=True)
+            # Apenas o Q-valor da ação tomada recebe o TD target; os demais alvos
+            # são os próprios Q-valores previstos (mesma loss do antigo fit)
+            action_mask = tf.one_hot(actions, self.action_size)
+            target_q = tf.stop_gradient(q_values * (1.0 - action_mask) + td_targets[:, None] * action_mask)
+            loss = self.loss_fn(target_q, q_values)
+
+        gradients = tape.gradient(loss, self.model.trainable_variables)
+        self.model.optimizer.apply_gradients(zip(gradients, self.model.trainable_variables))
+        return loss
 
     def load(self, name):
         """ Carrega os pesos do modelo a partir de um arquivo. """
         self.model.load_weights(name)
         self.update_target_model()
 
+    def training_state(self):
+        """
+        Estado completo de treinamento como arrays NumPy: pesos das duas redes,
+        variáveis do otimizador (momentos do Adam, iterações) e epsilon.
+        """
+        return {
+            'weights': self.model.get_weights(),
+            'target_weights': self.target_model.get_weights(),
+            'optimizer': [np.array(v) for v in _optimizer_variables(self.model.optimizer)],
+            'epsilon': float(self.epsilon),
+        }
+
+    def restore_training_state(self, state):
+        """ Restaura o estado salvo por training_state(). """
+        self.model.set_weights(state['weights'])
+        self.target_model.set_weights(state['target_weights'])
+
+        optimizer = self.model.optimizer
+        if len(_optimizer_variables(optimizer)) != len(state['optimizer']):
+            # Cria as variáveis do otimizador com um passo de gradiente zero;
+            # todas (inclusive o contador de iterações) são sobrescritas abaixo
+            variables = self.model.trainable_variables
+            optimizer.apply_gradients(zip([tf.zeros_like(v) for v in variables], variables))
+        for variable, value in zip(_optimizer_variables(optimizer), state['optimizer']):
+            variable.assign(value)
+
+        self.epsilon = state['epsilon']
+
     def save(self, name):
         """ Salva os pesos do modelo em um arquivo. """
-        self.model.save_weights(name) 
\ No newline at end of file
+        self.model.save_weights(name)
@@ -0,0 +1,100 @@
+"""
+Cache persistente de avaliações de checkpoints (SQLite em models/).
+
+Arquivos de pesos não mudam depois de gravados, então o resultado de uma
+avaliação é identificado pelo sha256 do arquivo jogado (o .npz exportado ou
+o .weights.h5) e pelos parâmetros do protocolo (tamanho do tabuleiro, casas
+iniciais com pesos, partidas por casa, epsilon, max_steps, seed). Guarda as partidas distintas em JSON; as
+estatísticas são recalculadas por evaluation.summarize_games.
+
+PROTOCOL_VERSION deve ser incrementado sempre que a forma de jogar/contar as
+partidas mudar, invalidando os resultados antigos.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+# 2: chave pelo arquivo efetivamente jogado (.npz ou .h5) em vez de sempre o .h5
+PROTOCOL_VERSION = 2
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'models', 'eval_cache.sqlite')
+
+# Hashes já calculados neste processo: {(caminho, mtime, tamanho): sha256}
+_HASHES = {}
+
+
+def file_sha256(path):
+    """ sha256 do conteúdo de um arquivo (memorizado por caminho, mtime e tamanho). """
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+    if key not in _HASHES:
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+        _HASHES[key] = digest.hexdigest()
+    return _HASHES[key]
+
+
+def protocol_key(board_size, starts, games_per_start, epsilon, max_steps, seed):
+    """
+    Parâmetros da avaliação (exceto o modelo) como JSON canônico.
+    Os números são normalizados para que epsilon=0 e epsilon=0.0 (ou inteiros
+    NumPy) gerem a mesma chave.
+    """
+    return json.dumps({
+        'board_size': int(board_size),
+        'starts': [[[int(r), int(c)], int(weight)] for (r, c), weight in starts],
+        'games_per_start': int(games_per_start),
+        'epsilon': float(epsilon),
+        'max_steps': None if max_steps is None else int(max_steps),
+        'seed': None if seed is None else int(seed),
+    }, sort_keys=True, separators=(',', ':'))
+
+
+class EvalCache:
+    """ Resultados de avaliação por (sha256 dos pesos, protocolo, versão). """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS evaluations (
+                weights_sha256 TEXT NOT NULL,
+                board_size INTEGER NOT NULL,
+                params TEXT NOT NULL,
+                protocol INTEGER NOT NULL,
+                model_file TEXT,
+                games TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (weights_sha256, board_size, params, protocol)
+            )
+        """)
+        self._conn.commit()
+
+    def get(self, weights_sha256, board_size, params):
+        """ Partidas gravadas para a chave, ou None. """
+        row = self._conn.execute(
+            "SELECT games FROM evaluations "
+            "WHERE weights_sha256 = ? AND board_size = ? AND params = ? AND protocol = ?",
+            (weights_sha256, board_size, params, PROTOCOL_VERSION),
+        ).fetchone()
+        if row is None:
+            return None
+        return [dict(game, start=tuple(game['start'])) for game in json.loads(row[0])]
+
+    def put(self, weights_sha256, board_size, params, model_file, games):
+        """ Grava (ou substitui) as partidas de uma avaliação. """
+        self._conn.execute(
+            "INSERT OR REPLACE INTO evaluations VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (weights_sha256, board_size, params, PROTOCOL_VERSION,
+             os.path.basename(model_file), json.dumps(games), time.time()),
+        )
+        self._conn.commit()
+
+    def close(self):
+        self._conn.close()
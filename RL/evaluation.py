@@ -0,0 +1,573 @@
+"""
+Motor de avaliação de checkpoints compartilhado pelos scripts de teste.
+
+Recebe uma lista de arquivos de pesos e um conjunto de posições iniciais,
+distribui os modelos em um pool de processos (spawn) e, em cada processo,
+carrega o modelo uma única vez (NumPy via .npz quando existir) e joga todas
+as partidas dele em lote em um VecKnightTourEnv. O resultado é uma tabela
+estruturada: um dicionário por modelo, com as partidas individuais.
+
+Com epsilon = 0 a política (argmax) e o ambiente são determinísticos: as
+partidas a partir de uma mesma casa são idênticas. Nesse caso cada par
+(modelo, casa inicial) é jogado uma única vez e a partida recebe o peso das
+repetições pedidas (campo 'count'). Por padrão são varridas todas as N² casas
+iniciais ('all'); 'symmetric' joga uma casa por órbita das 8 simetrias do
+tabuleiro, com peso igual ao tamanho da órbita.
+
+Resultados ficam no cache SQLite de eval_cache (models/eval_cache.sqlite),
+indexado pelo sha256 do arquivo que é de fato jogado (o .npz exportado, se
+estiver atualizado, senão o .h5): só os modelos ainda não avaliados com o
+mesmo protocolo são jogados.
+
+evaluate_sequential() é o modo com parada antecipada: joga partidas em lotes
+(casas iniciais sorteadas) e para assim que um intervalo de confiança
+(Wilson ou Clopper-Pearson) ou um SPRT decide se a taxa de vitória está acima
+ou abaixo de um limiar (por padrão, a do melhor modelo em model_config,
+comparada nas mesmas casas iniciais em que foi medida).
+"""
+
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing as mp
+
+import numpy as np
+
+from eval_cache import DEFAULT_CACHE_PATH, EvalCache, file_sha256, protocol_key
+from numpy_policy import fresh_npz_path, load_policy, epsilon_greedy
+from symmetry import canonical_form
+from vec_env import VecKnightTourEnv, STATUS_WIN
+
+START_SETS = ('center', 'all', 'symmetric')
+
+# Políticas já carregadas neste processo: {(caminho, arquivo carregado, mtime): política}
+_POLICIES = {}
+
+
+def checkpoint_episode(path):
+    """ Episódio de um arquivo knight_tour_dqn_b{N}_e{E}.weights.h5 (None se não houver). """
+    try:
+        return int(os.path.basename(path).split('_e')[1].split('.')[0])
+    except (IndexError, ValueError):
+        return None
+
+
+def list_checkpoints(models_dir):
+    """ Checkpoints (.h5) de um diretório, ordenados por episódio. """
+    models = []
+    if os.path.exists(models_dir):
+        for file in os.listdir(models_dir):
+            episode = checkpoint_episode(file) if file.endswith('.h5') else None
+            if episode is not None:
+                models.append({'filename': file, 'episode': episode, 'path': os.path.join(models_dir, file)})
+    return sorted(models, key=lambda x: x['episode'])
+
+
+def start_squares(board_size, start_positions='all'):
+    """
+    Casas iniciais de uma avaliação como lista de ((linha, coluna), peso).
+
+    'center': só o centro; 'all': as N² casas; 'symmetric': uma casa por
+    órbita das simetrias do tabuleiro, com peso = tamanho da órbita (exato só
+    para políticas equivariantes, ex.: treinadas com augment_symmetries=True).
+    Uma lista explícita de posições recebe peso 1 em cada.
+    """
+    if start_positions == 'center':
+        return [((board_size // 2, board_size // 2), 1)]
+    if start_positions == 'all':
+        return [((r, c), 1) for r in range(board_size) for c in range(board_size)]
+    if start_positions == 'symmetric':
+        orbits = {}
+        for r in range(board_size):
+            for c in range(board_size):
+                board = np.zeros((board_size, board_size), dtype=np.int8)
+                board[r, c] = 1
+                key, _ = canonical_form(board)
+                if key not in orbits:
+                    orbits[key] = [(r, c), 0]
+                orbits[key][1] += 1
+        return [tuple(orbit) for orbit in orbits.values()]
+    if isinstance(start_positions, str):
+        raise ValueError(f"Conjunto de casas iniciais desconhecido: {start_positions} (use {START_SETS})")
+    return [((int(r), int(c)), 1) for r, c in start_positions]
+
+
+def policy_source(path):
+    """ Arquivo que load_policy carrega para `path`: o .npz atualizado ou o próprio .h5. """
+    return fresh_npz_path(path) or path
+
+
+def _get_policy(path, board_size):
+    source = policy_source(path)
+    key = (os.path.abspath(path), source, os.path.getmtime(source))
+    if key not in _POLICIES:
+        _POLICIES[key] = load_policy(path, (board_size, board_size, 3), 8)
+    return _POLICIES[key]
+
+
+def play_games(policy, board_size, start_positions, epsilon=0.0, max_steps=None, rng=None):
+    """
+    Joga uma partida por posição inicial, todas em lote. Retorna arrays
+    (visited, steps, wins) na ordem de start_positions.
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    start_positions = np.asarray(start_positions).reshape(-1, 2)
+    num_games = len(start_positions)
+
+    env = VecKnightTourEnv(num_games, board_size=board_size, auto_reset=False)
+    states, info = env.reset(start_positions=start_positions, return_info=True)
+    masks = info['action_mask']
+
+    active = masks.any(axis=1)
+    wins = np.zeros(num_games, dtype=bool)
+    steps = np.zeros(num_games, dtype=np.int64)
+    actions = np.zeros(num_games, dtype=np.int64)
+
+    while active.any() and (max_steps is None or steps.max() < max_steps):
+        # Apenas tabuleiros em jogo passam pela rede; os demais recebem uma
+        # ação qualquer, que é inválida e não altera um tabuleiro terminado
+        actions[active] = epsilon_greedy(policy, states[active], masks[active], epsilon, rng)
+        states, _, dones, info = env.step(actions)
+        masks = info['action_mask']
+
+        steps[active] += 1
+        wins |= active & (info['status'] == STATUS_WIN)
+        active &= ~dones
+
+    return env.visited_counts.copy(), steps, wins
+
+
+def _evaluate_task(task):
+    """ Avalia um modelo (executado nos processos do pool). """
+    board_size = task['board_size']
+    policy = _get_policy(task['model_path'], board_size)
+    starts = [pos for pos, _ in task['starts']]
+    weights = [weight for _, weight in task['starts']]
+
+    if task['epsilon'] == 0:
+        # Determinístico: uma partida por casa, com o peso das repetições
+        repeats = [1] * len(starts)
+        counts = [weight * task['games_per_start'] for weight in weights]
+    else:
+        repeats = [task['games_per_start']] * len(starts)
+        counts = weights
+
+    games_starts = np.repeat(np.asarray(starts).reshape(-1, 2), repeats, axis=0)
+    games_counts = np.repeat(counts, repeats)
+    visited, steps, wins = play_games(policy, board_size, games_starts, task['epsilon'], task['max_steps'],
+                                      np.random.default_rng(task['seed']))
+    return [
+        {'start': (int(r), int(c)), 'visited': int(v), 'steps': int(s), 'win': bool(w), 'count': int(n)}
+        for (r, c), v, s, w, n in zip(games_starts, visited, steps, wins, games_counts)
+    ]
+
+
+def _error_message(error):
+    return f"{type(error).__name__}: {error}"
+
+
+def _evaluate_task_isolated(task):
+    """ _evaluate_task que devolve o erro em vez de derrubar o lote (errors='return'). """
+    try:
+        return {'games': _evaluate_task(task)}
+    except Exception as e:
+        return {'error': _error_message(e)}
+
+
+def summarize_games(model_path, board_size, games):
+    """
+    Estatísticas de um modelo a partir da lista de partidas. Cada partida
+    conta `count` vezes; scores e game_lengths vêm expandidos por esse peso.
+    """
+    counts = [game.get('count', 1) for game in games]
+    scores = [game['visited'] for game, n in zip(games, counts) for _ in range(n)]
+    lengths = [game['steps'] for game, n in zip(games, counts) for _ in range(n)]
+    total = sum(counts)
+    wins = sum(n for game, n in zip(games, counts) if game['win'])
+
+    per_start = {}
+    for game, n in zip(games, counts):
+        entry = per_start.setdefault(game['start'], {'start': game['start'], 'games': 0, 'wins': 0, 'visited': 0})
+        entry['games'] += n
+        entry['wins'] += n * int(game['win'])
+        entry['visited'] += n * game['visited']
+    for entry in per_start.values():
+        entry['win_rate'] = entry['wins'] / entry['games']
+        entry['avg_visited'] = entry.pop('visited') / entry['games']
+
+    return {
+        'model_path': model_path,
+        'episode': checkpoint_episode(model_path),
+        'board_size': board_size,
+        'wins': int(wins),
+        'total_tests': total,
+        'games_played': len(games),
+        'win_rate': wins / total if total else 0.0,
+        'scores': scores,
+        'game_lengths': lengths,
+        'avg_score': float(np.mean(scores)) if scores else 0.0,
+        'max_score': max(scores) if scores else 0,
+        'min_score': min(scores) if scores else 0,
+        'std_score': float(np.std(scores)) if scores else 0.0,
+        'avg_game_length': float(np.mean(lengths)) if lengths else 0.0,
+        'stuck_games': total - int(wins),
+        'per_start': sorted(per_start.values(), key=lambda entry: entry['start']),
+        'games': games,
+    }
+
+
+def _init_worker():
+    # Avaliação roda na CPU; a GPU fica para o treinamento
+    os.environ['CUDA_VISIBLE_DEVICES'] = '-1'
+
+
+def _map_tasks(fn, tasks, workers):
+    """ fn(task) para cada tarefa, em um pool de processos quando workers > 1. """
+    workers = min(workers or os.cpu_count() or 1, len(tasks))
+    if workers <= 1:
+        return [fn(task) for task in tasks]
+    with ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context('spawn'),
+                             initializer=_init_worker) as pool:
+        return list(pool.map(fn, tasks))
+
+
+def evaluate_checkpoints(model_paths, board_size=5, start_positions='all', games_per_start=1,
+                         epsilon=0.0, max_steps=None, workers=None, seed=None, cache_path=DEFAULT_CACHE_PATH,
+                         errors='raise'):
+    """
+    Avalia cada modelo em `games_per_start` partidas por casa inicial
+    (start_positions: 'all', 'symmetric', 'center' ou lista de posições).
+    Com epsilon = 0 cada casa é jogada uma vez só (as repetições seriam
+    idênticas). Com mais de um modelo e workers != 1, os modelos são
+    distribuídos em um pool de processos.
+
+    Retorna uma lista (na ordem de model_paths) de dicionários com wins,
+    total_tests, games_played, win_rate, scores, game_lengths,
+    avg/max/min/std_score, avg_game_length, stuck_games, per_start e as
+    partidas distintas em 'games'.
+
+    Resultados são lidos/gravados no cache em `cache_path` (None desliga).
+    Avaliações com epsilon > 0 só entram no cache quando há `seed`.
+
+    errors='raise' propaga o primeiro erro de qualquer modelo; com
+    errors='return' um modelo que falha (arquivo ausente ou corrompido, etc.)
+    vira {'model_path', 'episode', 'board_size', 'error'} e os demais são
+    avaliados normalmente.
+    """
+    if errors not in ('raise', 'return'):
+        raise ValueError(f"errors deve ser 'raise' ou 'return': {errors}")
+    starts = start_squares(board_size, start_positions)
+    deterministic = epsilon == 0
+    params = protocol_key(board_size, starts, games_per_start, epsilon, max_steps,
+                          None if deterministic else seed)
+    use_cache = cache_path is not None and (deterministic or seed is not None)
+    cache = EvalCache(cache_path) if use_cache else None
+
+    all_games = {}
+    failures = {}
+    hashes = {}
+    queued = set()
+    tasks = []
+    for path in model_paths:
+        # O .npz grava o sha256 do .h5 de origem: o hash do arquivo jogado identifica os dois
+        try:
+            hashes[path] = file_sha256(policy_source(path))
+        except OSError as e:
+            if errors == 'raise':
+                raise
+            failures[path] = _error_message(e)
+            continue
+        if cache is not None:
+            cached = cache.get(hashes[path], board_size, params)
+            if cached is not None:
+                all_games[path] = cached
+                continue
+        if path in queued:
+            continue
+        queued.add(path)
+        # Semente por conteúdo do modelo: independe da ordem em model_paths
+        task_seed = None if seed is None else np.random.SeedSequence([seed, int(hashes[path][:16], 16)])
+        tasks.append({
+            'model_path': path,
+            'board_size': board_size,
+            'starts': starts,
+            'games_per_start': games_per_start,
+            'epsilon': epsilon,
+            'max_steps': max_steps,
+            'seed': task_seed,
+        })
+
+    if errors == 'raise':
+        outcomes = [{'games': games} for games in _map_tasks(_evaluate_task, tasks, workers)]
+    else:
+        outcomes = _map_tasks(_evaluate_task_isolated, tasks, workers)
+    for task, outcome in zip(tasks, outcomes):
+        path = task['model_path']
+        if 'error' in outcome:
+            failures[path] = outcome['error']
+            continue
+        all_games[path] = outcome['games']
+        if cache is not None:
+            cache.put(hashes[path], board_size, params, path, outcome['games'])
+    if cache is not None:
+        cache.close()
+
+    return [
+        {'model_path': path, 'episode': checkpoint_episode(path), 'board_size': board_size,
+         'error': failures[path]} if path in failures else summarize_games(path, board_size, all_games[path])
+        for path in model_paths
+    ]
+
+
+# ---------------------------------------------------------------------------
+# Avaliação sequencial (parada antecipada)
+# ---------------------------------------------------------------------------
+
+SEQUENTIAL_METHODS = ('wilson', 'clopper-pearson', 'sprt')
+
+
+def _normal_quantile(p):
+    """ Quantil da normal padrão (bisseção sobre erfc; sem scipy). """
+    lo, hi = -10.0, 10.0
+    for _ in range(100):
+        mid = (lo + hi) / 2
+        if 0.5 * math.erfc(-mid / math.sqrt(2)) < p:
+            lo = mid
+        else:
+            hi = mid
+    return (lo + hi) / 2
+
+
+def wilson_interval(wins, n, confidence=0.95):
+    """ Intervalo de Wilson para a taxa de vitória wins/n. """
+    if n == 0:
+        return 0.0, 1.0
+    z = _normal_quantile(1 - (1 - confidence) / 2)
+    p = wins / n
+    center = (p + z * z / (2 * n)) / (1 + z * z / n)
+    half = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / (1 + z * z / n)
+    return max(0.0, center - half), min(1.0, center + half)
+
+
+def _binomial_cdf(k, n, p):
+    """ P(X <= k) para X ~ Binomial(n, p). """
+    if k < 0:
+        return 0.0
+    if k >= n:
+        return 1.0
+    if p <= 0:
+        return 1.0
+    if p >= 1:
+        return 0.0
+    log_p, log_q = math.log(p), math.log1p(-p)
+    return min(1.0, sum(
+        math.exp(math.lgamma(n + 1) - math.lgamma(i + 1) - math.lgamma(n - i + 1) + i * log_p + (n - i) * log_q)
+        for i in range(k + 1)
+    ))
+
+
+def _bisect(fn, target, increasing):
+    lo, hi = 0.0, 1.0
+    for _ in range(60):
+        mid = (lo + hi) / 2
+        if (fn(mid) < target) == increasing:
+            lo = mid
+        else:
+            hi = mid
+    return (lo + hi) / 2
+
+
+def clopper_pearson_interval(wins, n, confidence=0.95):
+    """ Intervalo exato de Clopper-Pearson para a taxa de vitória wins/n. """
+    if n == 0:
+        return 0.0, 1.0
+    alpha = 1 - confidence
+    # lower: P(X >= wins | p) = alpha/2 ; upper: P(X <= wins | p) = alpha/2
+    lower = 0.0 if wins == 0 else _bisect(lambda p: 1 - _binomial_cdf(wins - 1, n, p), alpha / 2, True)
+    upper = 1.0 if wins == n else _bisect(lambda p: _binomial_cdf(wins, n, p), alpha / 2, False)
+    return lower, upper
+
+
+def sprt_llr(wins, n, threshold, delta=0.05):
+    """ Log da razão de verossimilhança de H1: p = threshold + delta contra H0: p = threshold - delta. """
+    p0 = min(max(threshold - delta, 1e-6), 1 - 1e-6)
+    p1 = min(max(threshold + delta, 1e-6), 1 - 1e-6)
+    return wins * math.log(p1 / p0) + (n - wins) * math.log((1 - p1) / (1 - p0))
+
+
+def sequential_decision(wins, n, threshold, method='wilson', confidence=0.95, delta=0.05):
+    """
+    'above' / 'below' quando o teste decide a taxa de vitória em relação ao
+    limiar, senão None. Retorna também o intervalo de confiança (ou o LLR do SPRT).
+    """
+    if method == 'sprt':
+        alpha = beta = 1 - confidence
+        llr = sprt_llr(wins, n, threshold, delta)
+        if llr >= math.log((1 - beta) / alpha):
+            return 'above', llr
+        if llr <= math.log(beta / (1 - alpha)):
+            return 'below', llr
+        return None, llr
+
+    interval_fn = clopper_pearson_interval if method == 'clopper-pearson' else wilson_interval
+    low, high = interval_fn(wins, n, confidence)
+    if low > threshold:
+        return 'above', (low, high)
+    if high < threshold:
+        return 'below', (low, high)
+    return None, (low, high)
+
+
+def _incumbent_info(board_size):
+    from model_config import model_config
+
+    return model_config.BEST_MODELS.get(model_config.get_board_size_key(board_size), {})
+
+
+def incumbent_win_rate(board_size):
+    """ Taxa de vitória (0-1) do melhor modelo em model_config.BEST_MODELS, ou None. """
+    info = _incumbent_info(board_size)
+    return None if info.get('win_rate') is None else info['win_rate'] / 100
+
+
+def incumbent_start_positions(board_size):
+    """ Casas iniciais em que a taxa do melhor modelo foi medida (o centro, se não registrada). """
+    start = _incumbent_info(board_size).get('starting_position')
+    return 'center' if start is None else [tuple(start)]
+
+
+def _sequential_task(task):
+    """ Joga lotes de um modelo até o teste decidir (executado nos processos do pool). """
+    board_size = task['board_size']
+    policy = _get_policy(task['model_path'], board_size)
+    rng = np.random.default_rng(task['seed'])
+    positions = np.array([pos for pos, _ in task['starts']])
+    weights = np.array([weight for _, weight in task['starts']], dtype=np.float64)
+    deterministic = task['epsilon'] == 0
+
+    outcomes = {}  # Determinístico: resultado já jogado de cada casa inicial
+    games = []
+    wins = 0
+    decision, statistic = None, None
+
+    while len(games) < task['max_games']:
+        batch = min(task['batch_size'], task['max_games'] - len(games))
+        starts = [tuple(int(x) for x in pos)
+                  for pos in positions[rng.choice(len(positions), size=batch, p=weights / weights.sum())]]
+
+        to_play = sorted(set(starts) - set(outcomes)) if deterministic else starts
+        if to_play:
+            visited, steps, won = play_games(policy, board_size, to_play, task['epsilon'], task['max_steps'], rng)
+            played = [{'start': start, 'visited': int(v), 'steps': int(s), 'win': bool(w), 'count': 1}
+                      for start, v, s, w in zip(to_play, visited, steps, won)]
+        else:
+            played = []
+
+        if deterministic:
+            outcomes.update((game['start'], game) for game in played)
+            batch_games = [dict(outcomes[start]) for start in starts]
+        else:
+            batch_games = played
+
+        if deterministic and len(outcomes) == len(positions):
+            # Todas as casas já jogadas: a taxa de vitória é exata, sem amostragem
+            exact_games = [dict(outcomes[tuple(int(x) for x in pos)], count=int(weight))
+                           for pos, weight in task['starts']]
+            rate = sum(game['count'] for game in exact_games if game['win']) / weights.sum()
+            decision = 'above' if rate > task['threshold'] else 'below' if rate < task['threshold'] else None
+            return {'games': exact_games, 'decision': decision, 'statistic': None,
+                    'games_played': len(outcomes), 'exact': True}
+
+        games.extend(batch_games)
+        wins += sum(game['win'] for game in batch_games)
+        if len(games) >= task['min_games']:
+            decision, statistic = sequential_decision(wins, len(games), task['threshold'], task['method'],
+                                                      task['confidence'], task['delta'])
+            if decision is not None:
+                break
+
+    games_played = len(outcomes) if deterministic else len(games)
+    return {'games': games, 'decision': decision, 'statistic': statistic,
+            'games_played': games_played, 'exact': False}
+
+
+def evaluate_sequential(model_paths, board_size=5, threshold=None, method='wilson', confidence=0.95,
+                        delta=0.05, batch_size=20, min_games=20, max_games=1000, start_positions=None,
+                        epsilon=0.0, max_steps=None, workers=None, seed=None):
+    """
+    Avaliação com parada antecipada: cada modelo joga lotes de `batch_size`
+    partidas com casas iniciais sorteadas (pesos de start_squares) até que o
+    método decida se a taxa de vitória está acima ou abaixo de `threshold`
+    (0-1; padrão: a do melhor modelo em model_config) ou até `max_games`.
+
+    start_positions segue start_squares; o padrão é 'all' com threshold
+    informado. Sem threshold, a taxa do melhor modelo só é comparável no
+    protocolo em que foi medida (incumbent_start_positions, o centro): esse é
+    o padrão, e outras casas iniciais levantam ValueError.
+
+    method: 'wilson' ou 'clopper-pearson' (o intervalo de confiança deixa de
+    conter o limiar) ou 'sprt' (H0: threshold - delta, H1: threshold + delta,
+    erros alfa = beta = 1 - confidence). Com epsilon = 0 cada casa é jogada
+    uma vez só e os sorteios repetidos reaproveitam o resultado.
+
+    Com epsilon = 0, assim que todas as casas tiverem sido jogadas a taxa de
+    vitória é exata: a busca para com exact=True e win_rate igual à taxa
+    ponderada de todas as casas (sem intervalo, LLR nem games_used).
+
+    Retorna os dicionários de evaluate_checkpoints com, além disso, decision
+    ('above', 'below' ou 'undecided'), threshold, method, exact, interval (ou
+    llr), games_used (partidas sorteadas contabilizadas) e games_played
+    (partidas jogadas).
+    """
+    if method not in SEQUENTIAL_METHODS:
+        raise ValueError(f"Método sequencial desconhecido: {method} (use {SEQUENTIAL_METHODS})")
+    if threshold is None:
+        threshold = incumbent_win_rate(board_size)
+        if threshold is None:
+            raise ValueError(f"Sem taxa de vitória do melhor modelo {board_size}x{board_size}; informe threshold")
+        incumbent_starts = incumbent_start_positions(board_size)
+        if start_positions is None:
+            start_positions = incumbent_starts
+        elif start_squares(board_size, start_positions) != start_squares(board_size, incumbent_starts):
+            raise ValueError(f"A taxa do melhor modelo {board_size}x{board_size} foi medida em "
+                             f"{incumbent_starts}, não em {start_positions}; informe threshold")
+    elif start_positions is None:
+        start_positions = 'all'
+
+    starts = start_squares(board_size, start_positions)
+    seeds = np.random.SeedSequence(seed).spawn(len(model_paths))
+    tasks = [
+        {
+            'model_path': path,
+            'board_size': board_size,
+            'starts': starts,
+            'threshold': threshold,
+            'method': method,
+            'confidence': confidence,
+            'delta': delta,
+            'batch_size': batch_size,
+            'min_games': min_games,
+            'max_games': max_games,
+            'epsilon': epsilon,
+            'max_steps': max_steps,
+            'seed': task_seed,
+        }
+        for path, task_seed in zip(model_paths, seeds)
+    ]
+
+    results = []
+    for path, outcome in zip(model_paths, _map_tasks(_sequential_task, tasks, workers)):
+        result = summarize_games(path, board_size, outcome['games'])
+        result.update({
+            'decision': outcome['decision'] or 'undecided',
+            'threshold': threshold,
+            'method': method,
+            'exact': outcome['exact'],
+            'games_played': outcome['games_played'],
+        })
+        # Com exact=True, win_rate já é a taxa exata (cada casa com seu peso)
+        if not outcome['exact']:
+            result['games_used'] = len(outcome['games'])
+            result['llr' if method == 'sprt' else 'interval'] = outcome['statistic']
+        results.append(result)
+    return results
@@ -0,0 +1,146 @@
+"""
+Instrumentação leve do loop de treinamento: timers por fase e contadores.
+
+    timers = PhaseTimers(enabled=True)
+    with timers.phase('env_step'):
+        env.step(action)
+    timers.incr('env_steps')
+    print(format_report(timers.report()))
+
+Desligado (enabled=False), phase() devolve sempre o mesmo context manager
+vazio e incr() não faz nada, então o custo é de uma chamada de método.
+"""
+
+from collections import defaultdict, deque
+from time import perf_counter
+
+import numpy as np
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _PhaseTimer:
+    __slots__ = ('stats', 'start')
+
+    def __init__(self, stats):
+        self.stats = stats
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.stats.add(perf_counter() - self.start)
+        return False
+
+
+class _PhaseStats:
+    __slots__ = ('total', 'count', 'samples')
+
+    def __init__(self, max_samples):
+        self.total = 0.0
+        self.count = 0
+        self.samples = deque(maxlen=max_samples)
+
+    def add(self, elapsed):
+        self.total += elapsed
+        self.count += 1
+        self.samples.append(elapsed)
+
+
+class PhaseTimers:
+    """
+    Tempo acumulado por fase (com as últimas `max_samples` durações para
+    percentis) e contadores, agregados em janelas entre chamadas de report().
+    """
+
+    def __init__(self, enabled=True, max_samples=4096):
+        self.enabled = enabled
+        self.max_samples = max_samples
+        self._stats = {}
+        self._timers = {}
+        self._counters = defaultdict(int)
+        self._window_start = perf_counter()
+
+    def phase(self, name):
+        """ Context manager que cronometra um trecho como a fase `name`. """
+        if not self.enabled:
+            return _NULL_TIMER
+        timer = self._timers.get(name)
+        if timer is None:
+            self._stats[name] = _PhaseStats(self.max_samples)
+            timer = self._timers[name] = _PhaseTimer(self._stats[name])
+        return timer
+
+    def incr(self, name, n=1):
+        """ Incrementa um contador (reportado como taxa por segundo). """
+        if self.enabled:
+            self._counters[name] += n
+
+    def report(self, reset=True):
+        """
+        Agregados da janela atual: tempo de parede, por fase (total, contagem,
+        fração do tempo, média e percentis p50/p90/p99 em ms) e taxas dos
+        contadores. Com reset=True começa uma nova janela.
+        """
+        wall = perf_counter() - self._window_start
+        phases = {}
+        for name, stats in self._stats.items():
+            if stats.count == 0:
+                continue
+            p50, p90, p99 = np.percentile(np.fromiter(stats.samples, dtype=np.float64), [50, 90, 99]) * 1000
+            phases[name] = {
+                'total_s': stats.total,
+                'count': stats.count,
+                'share': stats.total / wall if wall > 0 else 0.0,
+                'mean_ms': stats.total / stats.count * 1000,
+                'p50_ms': p50,
+                'p90_ms': p90,
+                'p99_ms': p99,
+            }
+        rates = {name: count / wall if wall > 0 else 0.0 for name, count in self._counters.items()}
+
+        if reset:
+            for name in self._stats:
+                self._stats[name] = _PhaseStats(self.max_samples)
+                self._timers[name].stats = self._stats[name]
+            self._counters.clear()
+            self._window_start = perf_counter()
+
+        return {'wall_s': wall, 'phases': phases, 'rates': rates}
+
+
+def format_report(report):
+    """ Linhas de texto de um report() para o resumo do treinamento. """
+    phases = sorted(report['phases'].items(), key=lambda item: -item[1]['total_s'])
+    shares = " | ".join(f"{name} {stats['share']:.0%}" for name, stats in phases)
+    lines = [f"⏱️  Fases ({report['wall_s']:.1f}s): {shares}"]
+    for name, stats in phases:
+        lines.append(f"   {name:<14} {stats['count']:7d}x  média {stats['mean_ms']:.3f}ms  "
+                     f"p50 {stats['p50_ms']:.3f}ms  p90 {stats['p90_ms']:.3f}ms  p99 {stats['p99_ms']:.3f}ms")
+    if report['rates']:
+        lines.append("   " + " | ".join(f"{name}/s: {rate:.1f}" for name, rate in report['rates'].items()))
+    return lines
+
+
+def flatten_report(report):
+    """ report() como dicionário plano (ex.: 'sample.p99_ms'), para exportar no log de métricas. """
+    flat = {'wall_s': report['wall_s']}
+    for name, stats in report['phases'].items():
+        for key, value in stats.items():
+            flat[f'{name}.{key}'] = value
+    for name, rate in report['rates'].items():
+        flat[f'{name}_per_sec'] = rate
+    return flat
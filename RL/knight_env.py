@@ -2,6 +2,8 @@ import gym
 from gym import spaces
 import numpy as np
 
+from bitboard import KNIGHT_MOVES, knight_attack_masks, knight_legal_moves, board_to_bits
+
 class KnightTourEnv(gym.Env):
     """
     Ambiente customizado para o problema do Passeio do Cavalo (Knight's Tour)
@@ -9,31 +11,50 @@ class KnightTourEnv(gym.Env):
     """
     metadata = {'render.modes': ['console']}
 
-    def __init__(self, board_size=5):
+    def __init__(self, board_size=5, copy_observations=True):
+        """
+        Args:
+            board_size: Tamanho do tabuleiro (NxN)
+            copy_observations: Se False, reset/step retornam uma visão somente
+                leitura do buffer interno de observação, que muda no próximo step
+        """
         super(KnightTourEnv, self).__init__()
 
         self.board_size = board_size
+        self.copy_observations = copy_observations
         self.total_squares = self.board_size * self.board_size
         
-        self.knight_moves = np.array([
-            [-2, -1], [-2, 1], [-1, -2], [-1, 2],
-            [1, -2], [1, 2], [2, -1], [2, 1]
-        ])
+        self.knight_moves = np.array(KNIGHT_MOVES)
         
         self.action_space = spaces.Discrete(8)
 
+        # Tabelas bitboard pré-calculadas para este tamanho de tabuleiro
+        self._attack_masks = knight_attack_masks(self.board_size)
+        self._legal_moves = knight_legal_moves(self.board_size)
+
         # Representação de estado com 3 canais (posição atual, visitados, movimentos válidos)
         self.observation_space = spaces.Box(
             low=0, high=1, 
             shape=(self.board_size, self.board_size, 3), 
             dtype=np.float32
         )
+
+        # Buffer de observação pré-alocado, atualizado incrementalmente a cada step
+        self._obs = np.zeros((self.board_size, self.board_size, 3), dtype=np.float32)
+        self._obs_flat = self._obs.reshape(self.total_squares, 3)
+        self._obs_view = self._obs.view()
+        self._obs_view.setflags(write=False)
+        self._valid_targets = ()
+
+        # Máscara pública de ações válidas, calculada uma vez por transição
+        self.action_mask = np.zeros(8, dtype=bool)
         
         self.reset()
 
-    def reset(self):
+    def reset(self, return_info=False):
         """
         Reseta o ambiente para um novo episódio.
+        Com return_info=True retorna (observação, {'action_mask': máscara}).
         """
         self.board = np.zeros((self.board_size, self.board_size), dtype=np.int8)
         
@@ -47,25 +68,62 @@ class KnightTourEnv(gym.Env):
         
         self.path = [self.current_pos]
         self.visited_count = 1
-        
+        self._square = self.current_pos[0] * self.board_size + self.current_pos[1]
+        # Bitmask de casas ocupadas (visitadas + posição atual)
+        self.visited_bits = 1 << self._square
+
+        self._rebuild_observation()
+        if return_info:
+            return self._get_observation(), {'action_mask': self.action_mask}
         return self._get_observation()
 
-    def _get_observation(self):
-        pos_channel = np.zeros((self.board_size, self.board_size), dtype=np.float32)
-        pos_channel[self.current_pos] = 1.0
+    def set_state(self, board):
+        """
+        Define o estado a partir de um tabuleiro 2D (0 = livre, 1 = visitado,
+        2 = cavalo), como o enviado pela interface web.
+        """
+        board = np.asarray(board)
+        knight = np.argwhere(board == 2)
+        if len(knight) != 1:
+            raise ValueError("O tabuleiro deve conter exatamente uma posição do cavalo (valor 2)")
 
-        visited_channel = (self.board == 1).astype(np.float32)
-        
-        valid_moves_channel = self._get_valid_moves_board()
+        self.board = np.zeros((self.board_size, self.board_size), dtype=np.int8)
+        self.board[board == 1] = 1
+        self.current_pos = tuple(int(x) for x in knight[0])
+        self.board[self.current_pos] = 2
+
+        self.path = [self.current_pos]
+        self.visited_count = int(np.count_nonzero(self.board))
+        self._square = self.current_pos[0] * self.board_size + self.current_pos[1]
+        self.visited_bits = board_to_bits(self.board)
+
+        self._rebuild_observation()
+        return self._get_observation()
 
-        return np.stack([pos_channel, visited_channel, valid_moves_channel], axis=-1)
+    def _rebuild_observation(self):
+        """ Recalcula o buffer de observação inteiro (usado em reset/set_state). """
+        self._obs.fill(0.0)
+        self._obs[self.current_pos + (0,)] = 1.0
+        self._obs[:, :, 1] = self.board == 1
+        self._update_valid_moves(self._legal_moves_bits())
+        self._obs_flat[self._valid_targets, 2] = 1.0
+
+    def _update_valid_moves(self, legal):
+        """ Atualiza a máscara de ações e as casas de destino dos movimentos legais. """
+        # Arrays da tabela são somente leitura e compartilhados entre ambientes
+        self.action_mask, self._valid_targets = self._legal_moves[self._square][legal]
+
+    def _get_observation(self):
+        if self.copy_observations:
+            return self._obs.copy()
+        return self._obs_view
 
     def step(self, action):
         """
         Executa uma ação no ambiente.
         """
         move = self.knight_moves[action]
-        new_pos = (self.current_pos[0] + move[0], self.current_pos[1] + move[1])
+        new_pos = (int(self.current_pos[0] + move[0]), int(self.current_pos[1] + move[1]))
 
         done = False
         info = {}
@@ -80,9 +138,22 @@ class KnightTourEnv(gym.Env):
             #reward = 1.0 + (self.visited_count / self.total_squares)
             reward = 1.0 + (self.visited_count / self.total_squares) * 5.0
             
+            old_square = self._square
             self.board[self.current_pos] = 1
             self.current_pos = new_pos
             self.board[self.current_pos] = 2
+            self._square = new_pos[0] * self.board_size + new_pos[1]
+            self.visited_bits |= 1 << self._square
+
+            # Atualiza apenas as casas do buffer de observação que mudaram
+            legal = self._legal_moves_bits()
+            obs = self._obs_flat
+            obs[old_square, 0] = 0.0
+            obs[old_square, 1] = 1.0
+            obs[self._valid_targets, 2] = 0.0
+            obs[self._square, 0] = 1.0
+            self._update_valid_moves(legal)
+            obs[self._valid_targets, 2] = 1.0
             
             self.path.append(self.current_pos)
             self.visited_count += 1
@@ -92,12 +163,13 @@ class KnightTourEnv(gym.Env):
                 reward = -1.0 * (self.total_squares - self.visited_count)
                 done = True
                 info['status'] = 'win'
-            elif not self._has_valid_moves():
+            elif not legal:
                 # Penalidade por ficar preso sem movimentos válidos
                 reward = -10.0
                 done = True
                 info['status'] = 'stuck'
 
+        info['action_mask'] = self.action_mask
         return self._get_observation(), reward, done, info
 
     def _is_valid_move(self, pos):
@@ -107,30 +179,24 @@ class KnightTourEnv(gym.Env):
         if not (0 <= row < self.board_size and 0 <= col < self.board_size):
             return False
         # Verifica se a casa já foi visitada
-        if self.board[row, col] != 0: # Não pode ir para casa visitada ou atual
+        if (self.visited_bits >> (row * self.board_size + col)) & 1: # Não pode ir para casa visitada ou atual
             return False
         return True
 
+    def _legal_moves_bits(self):
+        """ Bitmask das casas livres alcançáveis a partir da posição atual. """
+        return self._attack_masks[self._square] & ~self.visited_bits
+
     def _get_valid_moves_mask(self):
-        mask = np.zeros(8, dtype=bool)
-        for i, move in enumerate(self.knight_moves):
-            new_pos = (self.current_pos[0] + move[0], self.current_pos[1] + move[1])
-            if self._is_valid_move(new_pos):
-                mask[i] = True
-        return mask
+        """ Mantido por compatibilidade: use o atributo público action_mask. """
+        return self.action_mask
 
     def _get_valid_moves_board(self):
-        board = np.zeros((self.board_size, self.board_size), dtype=np.float32)
-        valid_actions = self.knight_moves[self._get_valid_moves_mask()]
-        
-        for move in valid_actions:
-            pos = (self.current_pos[0] + move[0], self.current_pos[1] + move[1])
-            board[pos] = 1.0
-        return board
+        return self._obs[:, :, 2].copy()
         
     def _has_valid_moves(self):
         """ Verifica se existem movimentos válidos a partir da posição atual. """
-        return self._get_valid_moves_mask().any()
+        return self.action_mask.any()
 
     def render(self, mode='console'):
         """ Renderiza o estado atual do ambiente. """
@@ -0,0 +1,192 @@
+"""
+Log de métricas de treinamento com escrita em lote.
+
+As linhas por episódio ficam em memória e são gravadas de uma vez a cada
+`flush_every` episódios (ou `flush_interval` segundos) em dois formatos:
+- o CSV legado (logs/training_log.csv), para compatibilidade;
+- um diretório colunar (logs/training_log.columns/) com um arquivo binário
+  por coluna, só de append, e um schema.json versionado. Carregar milhões de
+  episódios é um np.fromfile por coluna.
+
+Métricas agregadas (ex.: tempos por fase da instrumentação) vão para um
+arquivo JSON lines à parte (logs/training_log.metrics.jsonl), uma linha por resumo.
+"""
+
+import csv
+import json
+import os
+import time
+
+import numpy as np
+
+SCHEMA_VERSION = 1
+
+# (coluna, dtype) na ordem do CSV legado
+LOG_COLUMNS = (
+    ('Episode', '<i8'),
+    ('Score', '<i4'),
+    ('Max_Visited', '<i4'),
+    ('Avg_Reward', '<f4'),
+    ('Invalid_Moves', '<i4'),
+    ('Epsilon', '<f4'),
+    ('Win', '<i1'),
+)
+
+# Formatação das colunas de ponto flutuante no CSV (mesma do train.py original)
+CSV_FORMATS = {'Avg_Reward': '{:.2f}', 'Epsilon': '{:.4f}'}
+
+
+def columns_dir_for(csv_path):
+    """ Diretório colunar correspondente a um CSV de log. """
+    return os.path.splitext(csv_path)[0] + '.columns'
+
+
+def metrics_path_for(csv_path):
+    """ Arquivo JSON lines de métricas agregadas correspondente a um CSV de log. """
+    return os.path.splitext(csv_path)[0] + '.metrics.jsonl'
+
+
+def _read_csv_columns(csv_path):
+    with open(csv_path, newline='') as f:
+        rows = list(csv.DictReader(f))
+    return {
+        name: np.array([row[name] for row in rows], dtype=np.float64).astype(dtype)
+        for name, dtype in LOG_COLUMNS
+    }
+
+
+class TrainingLogger:
+    """ Logger de episódios com buffer em memória e flush em lote (CSV + colunar). """
+
+    def __init__(self, csv_path='logs/training_log.csv', flush_every=100, flush_interval=5.0):
+        self.csv_path = csv_path
+        self.columns_dir = columns_dir_for(csv_path)
+        self.metrics_path = metrics_path_for(csv_path)
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self._rows = []
+        self._last_flush = time.time()
+
+        os.makedirs(os.path.dirname(csv_path) or '.', exist_ok=True)
+        if not os.path.exists(csv_path):
+            with open(csv_path, 'w', newline='') as f:
+                csv.writer(f).writerow([name for name, _ in LOG_COLUMNS])
+        self._init_columns()
+
+    def _column_path(self, name):
+        return os.path.join(self.columns_dir, f'{name}.bin')
+
+    def _init_columns(self):
+        schema_path = os.path.join(self.columns_dir, 'schema.json')
+        if os.path.exists(schema_path):
+            with open(schema_path) as f:
+                schema = json.load(f)
+            if schema['version'] != SCHEMA_VERSION:
+                raise ValueError(f"Schema do log colunar v{schema['version']} incompatível "
+                                 f"(esperado v{SCHEMA_VERSION}): {self.columns_dir}")
+            return
+
+        # Primeiro uso: converte o CSV existente para manter os dois formatos alinhados
+        os.makedirs(self.columns_dir, exist_ok=True)
+        existing = _read_csv_columns(self.csv_path)
+        for name, dtype in LOG_COLUMNS:
+            existing[name].astype(dtype).tofile(self._column_path(name))
+
+        schema = {
+            'version': SCHEMA_VERSION,
+            'columns': [{'name': name, 'dtype': dtype} for name, dtype in LOG_COLUMNS],
+        }
+        with open(schema_path + '.tmp', 'w') as f:
+            json.dump(schema, f, indent=2)
+        os.replace(schema_path + '.tmp', schema_path)
+
+    def log(self, episode, score, max_visited, avg_reward, invalid_moves, epsilon, win):
+        """ Registra um episódio (gravado no próximo flush). """
+        self._rows.append((episode, score, max_visited, avg_reward, invalid_moves, epsilon, win))
+        if len(self._rows) >= self.flush_every or time.time() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """ Grava as linhas pendentes: um append no CSV e um append por coluna. """
+        self._last_flush = time.time()
+        if not self._rows:
+            return
+
+        formats = [CSV_FORMATS.get(name, '{}') for name, _ in LOG_COLUMNS]
+        with open(self.csv_path, 'a', newline='') as f:
+            csv.writer(f).writerows([fmt.format(value) for fmt, value in zip(formats, row)]
+                                    for row in self._rows)
+
+        for (name, dtype), values in zip(LOG_COLUMNS, zip(*self._rows)):
+            with open(self._column_path(name), 'ab') as f:
+                np.asarray(values, dtype=dtype).tofile(f)
+
+        self._rows = []
+
+    def log_metrics(self, episode, metrics):
+        """ Acrescenta uma linha de métricas agregadas (dicionário plano) para o episódio. """
+        with open(self.metrics_path, 'a') as f:
+            f.write(json.dumps({'episode': episode, **metrics}) + '\n')
+
+    def state(self):
+        """ Posição atual dos arquivos (após flush), para truncar ao retomar um checkpoint. """
+        self.flush()
+        name, dtype = LOG_COLUMNS[0]
+        rows = os.path.getsize(self._column_path(name)) // np.dtype(dtype).itemsize
+        metrics_size = os.path.getsize(self.metrics_path) if os.path.exists(self.metrics_path) else 0
+        return {'csv_size': os.path.getsize(self.csv_path), 'rows': rows, 'metrics_size': metrics_size}
+
+    def truncate(self, state):
+        """ Descarta o que foi escrito depois de state() (episódios que serão repetidos). """
+        self._rows = []
+        with open(self.csv_path, 'r+') as f:
+            f.truncate(state['csv_size'])
+        for name, dtype in LOG_COLUMNS:
+            with open(self._column_path(name), 'r+b') as f:
+                f.truncate(state['rows'] * np.dtype(dtype).itemsize)
+        if os.path.exists(self.metrics_path):
+            with open(self.metrics_path, 'r+') as f:
+                f.truncate(state.get('metrics_size', 0))
+
+    def close(self):
+        self.flush()
+
+
+def load_training_log(csv_path='logs/training_log.csv'):
+    """
+    Carrega o log como {coluna: array}. Usa o formato colunar quando existir
+    (milissegundos mesmo para milhões de episódios), senão o CSV.
+    """
+    columns_dir = columns_dir_for(csv_path)
+    schema_path = os.path.join(columns_dir, 'schema.json')
+    if not os.path.exists(schema_path):
+        return _read_csv_columns(csv_path)
+
+    with open(schema_path) as f:
+        schema = json.load(f)
+    if schema['version'] != SCHEMA_VERSION:
+        raise ValueError(f"Schema do log colunar v{schema['version']} incompatível (esperado v{SCHEMA_VERSION})")
+
+    columns = {
+        column['name']: np.fromfile(os.path.join(columns_dir, f"{column['name']}.bin"), dtype=column['dtype'])
+        for column in schema['columns']
+    }
+    # Um flush interrompido pode deixar colunas com tamanhos diferentes
+    rows = min(len(values) for values in columns.values())
+    return {name: values[:rows] for name, values in columns.items()}
+
+
+def load_metrics(csv_path='logs/training_log.csv'):
+    """ Linhas de métricas agregadas gravadas por log_metrics(), como lista de dicionários. """
+    metrics_path = metrics_path_for(csv_path)
+    if not os.path.exists(metrics_path):
+        return []
+    with open(metrics_path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def load_training_log_df(csv_path='logs/training_log.csv'):
+    """ load_training_log() como DataFrame do pandas, com as colunas do CSV legado. """
+    import pandas as pd
+
+    return pd.DataFrame(load_training_log(csv_path))
@@ -0,0 +1,187 @@
+"""
+Backend de inferência em NumPy puro para a rede do DQNAgent.
+
+Os pesos exportados (arquivo .npz) são lidos sem importar o TensorFlow, e o
+forward pass (convoluções 3x3 com padding 'same', ReLU e camadas densas)
+reproduz os Q-valores do modelo Keras dentro da tolerância de float32.
+
+O .npz guarda o sha256 do .weights.h5 de origem: se o .h5 for sobrescrito
+por um novo treino, o .npz antigo deixa de ser usado.
+"""
+
+import os
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from eval_cache import file_sha256
+
+
+def npz_path_for(weights_path):
+    """ Caminho do .npz exportado correspondente a um arquivo de pesos .weights.h5/.h5. """
+    for suffix in ('.weights.h5', '.h5'):
+        if weights_path.endswith(suffix):
+            return weights_path[:-len(suffix)] + '.npz'
+    return weights_path + '.npz'
+
+
+def save_weights_npz(weights, path, state_shape, source_sha256=None):
+    """
+    Salva a lista de pesos de model.get_weights() (kernel, bias, kernel, bias...)
+    em um arquivo .npz, com o sha256 do arquivo de pesos de origem se informado.
+    """
+    arrays = {f'w{i}': np.asarray(w, dtype=np.float32) for i, w in enumerate(weights)}
+    if source_sha256 is not None:
+        arrays['source_sha256'] = np.asarray(source_sha256)
+    np.savez(path, state_shape=np.asarray(state_shape), **arrays)
+
+
+def fresh_npz_path(weights_path):
+    """
+    O .npz exportado de weights_path, se existir e corresponder aos pesos
+    atuais (mesmo sha256; exportações sem hash valem se não forem mais antigas
+    que o .h5), senão None. Sem o .h5, o .npz é usado como está.
+    """
+    npz_path = npz_path_for(weights_path)
+    if not os.path.exists(npz_path):
+        return None
+    if not os.path.exists(weights_path):
+        return npz_path
+
+    with np.load(npz_path) as data:
+        source_sha256 = str(data['source_sha256']) if 'source_sha256' in data.files else None
+    if source_sha256 is not None:
+        return npz_path if source_sha256 == file_sha256(weights_path) else None
+    return npz_path if os.path.getmtime(npz_path) >= os.path.getmtime(weights_path) else None
+
+
+def _conv2d_same(x, kernel, bias):
+    """ Convolução 2D com padding 'same' para kernels ímpares, em NHWC. """
+    kh, kw, in_channels, out_channels = kernel.shape
+    padded = np.pad(x, ((0, 0), (kh // 2, kh // 2), (kw // 2, kw // 2), (0, 0)))
+    # (N, H, W, C, kh, kw) -> (N*H*W, C*kh*kw)
+    windows = sliding_window_view(padded, (kh, kw), axis=(1, 2))
+    n, h, w = windows.shape[:3]
+    patches = windows.reshape(n * h * w, in_channels * kh * kw)
+    flat_kernel = kernel.transpose(2, 0, 1, 3).reshape(in_channels * kh * kw, out_channels)
+    return (patches @ flat_kernel + bias).reshape(n, h, w, out_channels)
+
+
+def random_valid_actions(masks, rng=np.random):
+    """
+    Uma ação válida aleatória por linha de masks (N, A); linhas sem ação
+    válida recebem uma ação qualquer. rng: np.random ou um Generator.
+    """
+    masks = np.asarray(masks, dtype=bool)
+    # Pontuações válidas em [0, 1) e inválidas em [-2, -1): argmax sorteia entre as válidas
+    scores = rng.random(masks.shape) - 2.0 * ~masks
+    return np.argmax(scores, axis=1)
+
+
+def epsilon_greedy(policy, states, masks, epsilon, rng=np.random):
+    """
+    Ações epsilon-greedy em lote para qualquer política com q_values():
+    com probabilidade epsilon uma ação válida aleatória, senão o argmax
+    mascarado (um único forward pass para os estados não explorados).
+    """
+    masks = np.asarray(masks, dtype=bool)
+    n = len(masks)
+    actions = np.zeros(n, dtype=np.int64)
+    explore = rng.random(n) < epsilon if epsilon > 0 else np.zeros(n, dtype=bool)
+
+    exploit = ~explore
+    if exploit.any():
+        states = np.asarray(states, dtype=np.float32)
+        actions[exploit] = np.argmax(policy.q_values(states[exploit], masks[exploit]), axis=1)
+    if explore.any():
+        actions[explore] = random_valid_actions(masks[explore], rng)
+    return actions
+
+
+class GreedyPolicyMixin:
+    """
+    Interface de inferência comum (q_values, act, act_batch) das políticas.
+    As classes implementam _forward(states) -> Q-valores (N, A) e definem
+    state_shape e epsilon (exploração padrão de act_batch).
+    """
+
+    def q_values(self, states, valid_moves_mask=None):
+        """
+        Q-valores para um estado ou um batch (N, ...). Se a máscara for
+        informada, ações inválidas recebem -infinito.
+        """
+        states = np.asarray(states, dtype=np.float32)
+        single = states.ndim == len(self.state_shape)
+        if single:
+            states = states[None]
+
+        act_values = self._forward(states)
+
+        if valid_moves_mask is not None:
+            act_values = np.where(valid_moves_mask, act_values, -np.inf)
+
+        return act_values[0] if single else act_values
+
+    def act(self, state, valid_moves_mask):
+        """ Melhor ação válida para um estado. """
+        return np.argmax(self.q_values(state, valid_moves_mask))
+
+    def act_batch(self, states, valid_moves_masks, epsilon=None):
+        """
+        Ações epsilon-greedy para N estados (epsilon padrão: self.epsilon).
+        Retorna um array (N,).
+        """
+        epsilon = self.epsilon if epsilon is None else epsilon
+        return epsilon_greedy(self, states, valid_moves_masks, epsilon)
+
+
+class NumpyPolicy(GreedyPolicyMixin):
+    """
+    Política gulosa (epsilon = 0) com a mesma interface de inferência do
+    DQNAgent: q_values(), act() e act_batch().
+    """
+
+    def __init__(self, weights, state_shape):
+        self.weights = [np.asarray(w, dtype=np.float32) for w in weights]
+        self.state_shape = tuple(int(x) for x in state_shape)
+        self.action_size = self.weights[-1].shape[-1]
+        self.epsilon = 0.0
+
+    @classmethod
+    def load(cls, path):
+        """ Carrega uma política a partir de um .npz exportado. """
+        with np.load(path) as data:
+            num_weights = len([key for key in data.files if key.startswith('w')])
+            weights = [data[f'w{i}'] for i in range(num_weights)]
+            state_shape = data['state_shape']
+        return cls(weights, state_shape)
+
+    def _forward(self, states):
+        x = states
+        pairs = list(zip(self.weights[0::2], self.weights[1::2]))
+        for i, (kernel, bias) in enumerate(pairs):
+            last = i == len(pairs) - 1
+            if kernel.ndim == 4:
+                x = _conv2d_same(x, kernel, bias)
+            else:
+                x = x.reshape(len(x), -1) @ kernel + bias
+            if not last:
+                x = np.maximum(x, 0.0)
+        return x
+
+
+def load_policy(weights_path, state_shape, action_size):
+    """
+    Carrega a política de inferência para um arquivo de pesos: usa o .npz
+    exportado (sem TensorFlow) quando corresponder aos pesos atuais, senão
+    DQNAgent.for_inference.
+    """
+    npz_path = fresh_npz_path(weights_path)
+    if npz_path is not None:
+        return NumpyPolicy.load(npz_path)
+    if os.path.exists(npz_path_for(weights_path)):
+        print(f"⚠️  {npz_path_for(weights_path)} não corresponde a {weights_path}; usando os pesos .h5")
+
+    from dqn_agent import DQNAgent
+
+    return DQNAgent.for_inference(weights_path, state_shape, action_size)
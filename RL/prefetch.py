@@ -0,0 +1,80 @@
+"""
+Pipeline de prefetch de minibatches para o treinamento.
+
+Uma thread em segundo plano sorteia os próximos minibatches da memória de
+replay (incluindo augmentação, se ativa) enquanto o loop principal avança o
+ambiente, deixando-os em uma fila limitada para o passo de treinamento.
+"""
+
+import queue
+import threading
+import time
+
+
+class BatchPrefetcher:
+    """
+    Produz minibatches com sample_fn() em uma thread e os entrega por get().
+
+    A fila tem no máximo `depth` minibatches: um batch pode ter sido sorteado
+    até `depth` passos de gradiente antes de ser usado. O tempo em que cada
+    lado ficou parado é acumulado em producer_stall (fila cheia) e
+    consumer_stall (fila vazia), em segundos.
+    """
+
+    def __init__(self, sample_fn, depth=4):
+        self.sample_fn = sample_fn
+        self.depth = depth
+        self.producer_stall = 0.0
+        self.consumer_stall = 0.0
+        self.batches = 0
+
+        self._queue = queue.Queue(maxsize=depth)
+        self._stop = threading.Event()
+        self._error = None
+        self._thread = threading.Thread(target=self._run, name='batch-prefetcher', daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _run(self):
+        try:
+            while not self._stop.is_set():
+                batch = self.sample_fn()
+                start = time.perf_counter()
+                while not self._stop.is_set():
+                    try:
+                        self._queue.put(batch, timeout=0.1)
+                        break
+                    except queue.Full:
+                        continue
+                self.producer_stall += time.perf_counter() - start
+        except Exception as error:
+            self._error = error
+
+    def get(self):
+        """ Próximo minibatch; bloqueia (contando como parada do consumidor) se a fila estiver vazia. """
+        start = time.perf_counter()
+        while True:
+            try:
+                batch = self._queue.get(timeout=0.1)
+                break
+            except queue.Empty:
+                if self._error is not None:
+                    raise RuntimeError("Falha na thread de prefetch") from self._error
+        self.consumer_stall += time.perf_counter() - start
+        self.batches += 1
+        return batch
+
+    def stats(self):
+        """ Tempos de parada acumulados e número de minibatches consumidos. """
+        return {
+            'batches': self.batches,
+            'producer_stall': self.producer_stall,
+            'consumer_stall': self.consumer_stall,
+            'queue_size': self._queue.qsize(),
+        }
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join(timeout=1)
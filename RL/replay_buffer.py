@@ -0,0 +1,158 @@
+import threading
+
+import numpy as np
+
+from bitboard import MAX_UINT64_BOARD_SIZE, encode_observations, decode_observations
+
+
+class ReplayBuffer:
+    """
+    Memória de replay com arrays NumPy contíguos pré-alocados (buffer circular).
+
+    Inserções são escritas O(1) na posição `head`, e a amostragem de um
+    minibatch é um único sorteio de índices seguido de indexação vetorizada.
+    Inserção e amostragem seguram um lock, permitindo amostrar em outra thread.
+    """
+
+    # Arrays que compõem o conteúdo da memória (usados em snapshot/restore)
+    FIELDS = ('states', 'actions', 'rewards', 'next_states', 'dones', 'next_masks')
+
+    def __init__(self, capacity, state_shape, action_size=8, seed=None):
+        self.capacity = int(capacity)
+        self.state_shape = tuple(state_shape)
+        self.action_size = action_size
+
+        self.head = 0
+        self.size = 0
+        self.rng = np.random.default_rng(seed)
+        self.lock = threading.Lock()
+        self._allocate()
+
+    def _allocate(self):
+        self.states = np.zeros((self.capacity,) + self.state_shape, dtype=np.float32)
+        self.actions = np.zeros(self.capacity, dtype=np.int32)
+        self.rewards = np.zeros(self.capacity, dtype=np.float32)
+        self.next_states = np.zeros((self.capacity,) + self.state_shape, dtype=np.float32)
+        self.dones = np.zeros(self.capacity, dtype=bool)
+        # Máscara de ações válidas no próximo estado (todas válidas se não informada)
+        self.next_masks = np.ones((self.capacity, self.action_size), dtype=bool)
+
+    def __len__(self):
+        return self.size
+
+    def add(self, state, action, reward, next_state, done, next_mask=None):
+        """ Armazena uma transição, sobrescrevendo a mais antiga quando cheio. """
+        with self.lock:
+            i = self.head
+            self.states[i] = state
+            self.actions[i] = action
+            self.rewards[i] = reward
+            self.next_states[i] = next_state
+            self.dones[i] = done
+            self.next_masks[i] = True if next_mask is None else next_mask
+
+            self.head = (i + 1) % self.capacity
+            self.size = min(self.size + 1, self.capacity)
+
+    def snapshot(self):
+        """
+        Cópia consistente do conteúdo: ({campo: array com as `size` primeiras
+        linhas}, head, size).
+        """
+        with self.lock:
+            arrays = {field: getattr(self, field)[:self.size].copy() for field in self.FIELDS}
+            return arrays, self.head, self.size
+
+    def restore(self, arrays, head, size):
+        """ Restaura o conteúdo salvo por snapshot() (arrays podem ser memory-mapped). """
+        if size > self.capacity:
+            raise ValueError(f"Snapshot com {size} transições não cabe na capacidade {self.capacity}")
+        with self.lock:
+            for field in self.FIELDS:
+                getattr(self, field)[:size] = arrays[field][:size]
+            self.head = head % self.capacity
+            self.size = size
+
+    def sample_indices(self, batch_size):
+        """ Sorteia índices (com reposição) entre as transições armazenadas. """
+        return self.rng.integers(0, self.size, size=batch_size)
+
+    def sample(self, batch_size):
+        """
+        Retorna um minibatch (states, actions, rewards, next_states, dones, next_masks).
+        """
+        with self.lock:
+            return self._gather(self.sample_indices(batch_size))
+
+    def _gather(self, idx):
+        return (
+            self.states[idx],
+            self.actions[idx],
+            self.rewards[idx],
+            self.next_states[idx],
+            self.dones[idx],
+            self.next_masks[idx],
+        )
+
+
+class CompactReplayBuffer(ReplayBuffer):
+    """
+    Memória de replay compacta para tabuleiros de até 8x8.
+
+    Cada estado é guardado como (índice da casa do cavalo, bitmask uint64 de
+    casas ocupadas), ~29 bytes por transição em vez de ~1.5 KB no 8x8. As
+    observações de 3 canais e a máscara do próximo estado são reconstruídas
+    de forma vetorizada apenas para os minibatches sorteados.
+    """
+
+    FIELDS = ('positions', 'visited_bits', 'actions', 'rewards',
+              'next_positions', 'next_visited_bits', 'dones')
+
+    def __init__(self, capacity, state_shape, action_size=8, seed=None):
+        self.board_size = state_shape[0]
+        if self.board_size > MAX_UINT64_BOARD_SIZE:
+            raise ValueError(f"Memória compacta suporta no máximo {MAX_UINT64_BOARD_SIZE}x{MAX_UINT64_BOARD_SIZE}")
+        super().__init__(capacity, state_shape, action_size, seed)
+
+    def _allocate(self):
+        self.positions = np.zeros(self.capacity, dtype=np.int16)
+        self.visited_bits = np.zeros(self.capacity, dtype=np.uint64)
+        self.actions = np.zeros(self.capacity, dtype=np.int32)
+        self.rewards = np.zeros(self.capacity, dtype=np.float32)
+        self.next_positions = np.zeros(self.capacity, dtype=np.int16)
+        self.next_visited_bits = np.zeros(self.capacity, dtype=np.uint64)
+        self.dones = np.zeros(self.capacity, dtype=bool)
+
+    def add(self, state, action, reward, next_state, done, next_mask=None):
+        """
+        Armazena uma transição. A máscara do próximo estado não é guardada:
+        ela é derivada do bitmask na amostragem.
+        """
+        positions, bits = encode_observations(np.stack([state, next_state]))
+
+        with self.lock:
+            i = self.head
+            self.positions[i] = positions[0]
+            self.visited_bits[i] = bits[0]
+            self.actions[i] = action
+            self.rewards[i] = reward
+            self.next_positions[i] = positions[1]
+            self.next_visited_bits[i] = bits[1]
+            self.dones[i] = done
+
+            self.head = (i + 1) % self.capacity
+            self.size = min(self.size + 1, self.capacity)
+
+    def _gather(self, idx):
+        states, _ = decode_observations(self.positions[idx], self.visited_bits[idx], self.board_size)
+        next_states, next_masks = decode_observations(
+            self.next_positions[idx], self.next_visited_bits[idx], self.board_size
+        )
+        return (
+            states,
+            self.actions[idx],
+            self.rewards[idx],
+            next_states,
+            self.dones[idx],
+            next_masks,
+        )
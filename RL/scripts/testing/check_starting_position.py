@@ -6,9 +6,8 @@ Script para verificar qual posição inicial o modelo DQN usa e testá-la
 import os
 os.environ['CUDA_VISIBLE_DEVICES'] = '-1'  # Força CPU
 
-from dqn_agent import DQNAgent
 from knight_env import KnightTourEnv
-import numpy as np
+from evaluation import evaluate_checkpoints
 
 def test_model_starting_position():
     """Testa qual posição inicial o modelo usa"""
@@ -18,21 +17,16 @@ def test_model_starting_position():
     
     # Carrega o modelo configurado
     env = KnightTourEnv(board_size=5)
-    agent = DQNAgent(env.observation_space.shape, env.action_space.n)
-    
     model_path = 'models/knight_tour_dqn_b5_e5200.h5'
-    try:
-        agent.load(model_path)
-        agent.epsilon = 0.0
-        print(f"✅ Modelo carregado: {model_path}")
-    except Exception as e:
-        print(f"❌ Erro ao carregar modelo: {e}")
+    if not os.path.exists(model_path):
+        print(f"❌ Modelo não encontrado: {model_path}")
         return
+    print(f"✅ Modelo encontrado: {model_path}")
     
     print(f"\n📍 POSIÇÃO INICIAL NO AMBIENTE:")
     
     # Testa ambiente padrão
-    state = env.reset()
+    env.reset()
     print(f"   Posição: {env.current_pos}")
     print(f"   Coordenadas: Linha {env.current_pos[0]}, Coluna {env.current_pos[1]}")
     print(f"   No tabuleiro 5x5: Centro ({env.board_size//2}, {env.board_size//2})")
@@ -58,37 +52,18 @@ def test_model_starting_position():
     
     # Testa se o modelo consegue vencer a partir da posição inicial padrão
     num_tests = 5
-    wins = 0
-    
-    for test in range(num_tests):
-        state = env.reset()
-        done = False
-        moves = []
-        steps = 0
-        max_steps = 100
-        
-        while not done and steps < max_steps:
-            valid_moves_mask = env._get_valid_moves_mask()
-            if not valid_moves_mask.any():
-                break
-            
-            action = agent.act(state, valid_moves_mask)
-            move = env.knight_moves[action]
-            moves.append({
-                'step': steps + 1,
-                'from': env.current_pos,
-                'move': move,
-                'to': (env.current_pos[0] + move[0], env.current_pos[1] + move[1])
-            })
-            
-            state, reward, done, info = env.step(action)
-            steps += 1
-        
-        if env.visited_count == 25:
-            wins += 1
-            print(f"   Teste {test + 1}: ✅ VITÓRIA em {steps} movimentos")
+    start = (env.current_pos[0], env.current_pos[1])
+    result = evaluate_checkpoints([model_path], 5, start_positions=[start],
+                                  games_per_start=num_tests, max_steps=100)[0]
+    wins = result['wins']
+    
+    # Política determinística: as repetições são a mesma partida (campo 'count')
+    for test, game in enumerate(result['games']):
+        repeticoes = f" (x{game['count']})" if game['count'] > 1 else ""
+        if game['win']:
+            print(f"   Teste {test + 1}{repeticoes}: ✅ VITÓRIA em {game['steps']} movimentos")
         else:
-            print(f"   Teste {test + 1}: ❌ Falhou - visitou {env.visited_count}/25")
+            print(f"   Teste {test + 1}{repeticoes}: ❌ Falhou - visitou {game['visited']}/25")
     
     print(f"\n📊 RESULTADOS:")
     print(f"   Taxa de vitória: {wins}/{num_tests} ({wins/num_tests*100:.1f}%)")
@@ -100,9 +75,9 @@ def test_model_starting_position():
     else:
         print(f"\n⚠️  O modelo pode ter problema na posição inicial atual")
         print(f"   Vamos testar outras posições...")
-        test_different_starting_positions(agent)
+        test_different_starting_positions(model_path)
 
-def test_different_starting_positions(agent):
+def test_different_starting_positions(model_path):
     """Testa o modelo em diferentes posições iniciais"""
     print(f"\n🔄 TESTANDO DIFERENTES POSIÇÕES INICIAIS:")
     
@@ -116,47 +91,17 @@ def test_different_starting_positions(agent):
         (3, 3),  # Próximo ao canto oposto
     ]
     
-    results = []
+    # Todas as posições (3 partidas em cada) em um único lote
+    result = evaluate_checkpoints([model_path], 5, start_positions=positions_to_test,
+                                  games_per_start=3, max_steps=100)[0]
     
+    per_start = {entry['start']: entry for entry in result['per_start']}
+    
+    results = []
     for pos in positions_to_test:
-        env = KnightTourEnv(board_size=5)
-        
-        # Força a posição inicial
-        env.reset()
-        env.current_pos = pos
-        env.board = np.zeros((5, 5), dtype=np.int8)
-        env.board[pos] = 2
-        env.visited_count = 1
-        env.path = [pos]
-        
-        # Testa 3 vezes nesta posição
-        wins = 0
-        for _ in range(3):
-            env.current_pos = pos
-            env.board = np.zeros((5, 5), dtype=np.int8)
-            env.board[pos] = 2
-            env.visited_count = 1
-            env.path = [pos]
-            
-            state = env._get_observation()
-            done = False
-            steps = 0
-            
-            while not done and steps < 100:
-                valid_moves_mask = env._get_valid_moves_mask()
-                if not valid_moves_mask.any():
-                    break
-                
-                action = agent.act(state, valid_moves_mask)
-                state, reward, done, info = env.step(action)
-                steps += 1
-            
-            if env.visited_count == 25:
-                wins += 1
-        
-        win_rate = wins / 3
+        wins, win_rate = per_start[pos]['wins'], per_start[pos]['win_rate']
         results.append((pos, win_rate, wins))
-        print(f"   Posição {pos}: {wins}/3 vitórias ({win_rate*100:.1f}%)")
+        print(f"   Posição {pos}: {wins}/{per_start[pos]['games']} vitórias ({win_rate*100:.1f}%)")
     
     # Encontra a melhor posição
     best_pos, best_rate, best_wins = max(results, key=lambda x: x[1])
@@ -6,58 +6,19 @@ Script rápido para testar os melhores modelos DQN do Knight Tour
 import os
 os.environ['CUDA_VISIBLE_DEVICES'] = '-1'  # Força CPU
 
-import numpy as np
-from dqn_agent import DQNAgent
-from knight_env import KnightTourEnv
-import pandas as pd
+from evaluation import evaluate_checkpoints, checkpoint_episode
 
 def quick_test_model(model_path, episode_num, num_tests=20):
     """Testa rapidamente um modelo específico"""
-    env = KnightTourEnv(board_size=5)
-    agent = DQNAgent(env.observation_space.shape, env.action_space.n)
-    
     try:
-        agent.load(model_path)
-        agent.epsilon = 0.0  # Sem exploração
+        result = evaluate_checkpoints([model_path], 5, games_per_start=num_tests,
+                                      max_steps=1000, workers=1)[0]
     except Exception as e:
         print(f"❌ Erro ao carregar {model_path}: {e}")
         return None
     
-    wins = 0
-    scores = []
-    
-    for i in range(num_tests):
-        state = env.reset()
-        done = False
-        steps = 0
-        max_steps = 1000
-        
-        while not done and steps < max_steps:
-            valid_moves = env._get_valid_moves_mask()
-            if not valid_moves.any():
-                break
-            
-            action = agent.act(state, valid_moves)
-            state, reward, done, info = env.step(action)
-            steps += 1
-        
-        scores.append(env.visited_count)
-        if env.visited_count == 25:  # 5x5 board
-            wins += 1
-    
-    win_rate = wins / num_tests
-    avg_score = np.mean(scores)
-    
-    return {
-        'episode': episode_num,
-        'model_path': model_path,
-        'win_rate': win_rate,
-        'wins': wins,
-        'total_tests': num_tests,
-        'avg_score': avg_score,
-        'max_score': max(scores),
-        'min_score': min(scores)
-    }
+    result['episode'] = episode_num
+    return result
 
 def main():
     print("🎯 TESTE RÁPIDO DOS MELHORES MODELOS")
@@ -72,21 +33,25 @@ def main():
         'models/knight_tour_dqn_b5_e6500.h5',  # Último modelo
     ]
     
-    results = []
-    
-    for i, model_path in enumerate(best_models, 1):
-        if not os.path.exists(model_path):
+    existing_models = []
+    for model_path in best_models:
+        if os.path.exists(model_path):
+            existing_models.append(model_path)
+        else:
             print(f"⚠️  Modelo não encontrado: {model_path}")
+    
+    # Avalia todos os modelos em paralelo (um processo por modelo); um erro não derruba os demais
+    evaluated = evaluate_checkpoints(existing_models, 5, games_per_start=30, max_steps=1000, errors='return')
+    
+    results = []
+    for i, result in enumerate(evaluated, 1):
+        if 'error' in result:
+            print(f"\n[{i}/{len(evaluated)}] ❌ Erro ao carregar {result['model_path']}: {result['error']}")
             continue
-        
-        episode_num = int(model_path.split('_e')[1].split('.')[0])
-        print(f"\n[{i}/{len(best_models)}] Testando episódio {episode_num}...")
-        
-        result = quick_test_model(model_path, episode_num, num_tests=30)
-        if result:
-            results.append(result)
-            print(f"   ✅ {result['win_rate']:.1%} vitórias ({result['wins']}/{result['total_tests']}), "
-                  f"Score médio: {result['avg_score']:.1f}")
+        results.append(result)
+        print(f"\n[{i}/{len(evaluated)}] Episódio {checkpoint_episode(result['model_path'])}: "
+              f"✅ {result['win_rate']:.1%} vitórias ({result['wins']}/{result['total_tests']}), "
+              f"Score médio: {result['avg_score']:.1f}")
     
     # Ordena por taxa de vitória
     results.sort(key=lambda x: x['win_rate'], reverse=True)
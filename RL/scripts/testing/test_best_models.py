@@ -1,17 +1,14 @@
 import pandas as pd
-import numpy as np
-from dqn_agent import DQNAgent
-from knight_env import KnightTourEnv
+from metrics_logger import load_training_log_df
+from evaluation import evaluate_checkpoints, list_checkpoints
+from eval_cache import DEFAULT_CACHE_PATH
 import os
 import matplotlib.pyplot as plt
 import seaborn as sns
 from collections import defaultdict
-import json
 
 # Força uso da CPU para evitar problemas de GPU/CUDA
 os.environ['CUDA_VISIBLE_DEVICES'] = '-1'
-import tensorflow as tf
-tf.config.set_visible_devices([], 'GPU')
 
 class BestModelsTester:
     """
@@ -22,14 +19,11 @@ class BestModelsTester:
         self.board_size = board_size
         self.csv_path = csv_path
         self.models_dir = models_dir
-        self.env = KnightTourEnv(board_size=board_size)
-        self.state_shape = self.env.observation_space.shape
-        self.action_size = self.env.action_space.n
         
     def load_training_data(self):
         """Carrega os dados de treinamento"""
         print("📊 Carregando dados de treinamento...")
-        self.df = pd.read_csv(self.csv_path)
+        self.df = load_training_log_df(self.csv_path)
         print(f"✅ Dados carregados: {len(self.df)} episódios")
         return self.df
     
@@ -81,22 +75,7 @@ class BestModelsTester:
         """Lista os modelos disponíveis"""
         print(f"\n📁 Verificando modelos disponíveis em {self.models_dir}...")
         
-        model_files = []
-        if os.path.exists(self.models_dir):
-            for file in os.listdir(self.models_dir):
-                if file.endswith('.h5'):
-                    # Extrai o número do episódio do nome do arquivo
-                    try:
-                        episode_num = int(file.split('_e')[1].split('.')[0])
-                        model_files.append({
-                            'filename': file,
-                            'episode': episode_num,
-                            'path': os.path.join(self.models_dir, file)
-                        })
-                    except:
-                        print(f"⚠️  Formato de nome não reconhecido: {file}")
-        
-        self.available_models = sorted(model_files, key=lambda x: x['episode'])
+        self.available_models = list_checkpoints(self.models_dir)
         print(f"✅ Encontrados {len(self.available_models)} modelos")
         
         return self.available_models
@@ -159,89 +138,42 @@ class BestModelsTester:
         if verbose:
             print(f"🧪 Testando modelo do episódio {episode_num} ({num_tests} testes)...")
         
-        # Carrega o agente e o modelo
-        agent = DQNAgent(self.state_shape, self.action_size)
-        
         try:
-            agent.load(model_path)
+            results = evaluate_checkpoints([model_path], self.board_size, games_per_start=num_tests, workers=1)[0]
         except Exception as e:
             print(f"❌ Erro ao carregar modelo {model_path}: {e}")
             return None
         
-        # Desativa exploração para teste
-        agent.epsilon = 0.0
-        
-        results = {
-            'episode': episode_num,
-            'model_path': model_path,
-            'wins': 0,
-            'total_tests': num_tests,
-            'scores': [],
-            'visited_counts': [],
-            'game_lengths': [],
-            'stuck_games': 0,
-            'win_rate': 0.0
-        }
-        
-        for test_num in range(num_tests):
-            state = self.env.reset()
-            done = False
-            steps = 0
-            max_steps = 1000  # Previne loops infinitos
-            
-            while not done and steps < max_steps:
-                valid_moves_mask = self.env._get_valid_moves_mask()
-                
-                if not valid_moves_mask.any():
-                    # Sem movimentos válidos - jogo travado
-                    results['stuck_games'] += 1
-                    break
-                
-                action = agent.act(state, valid_moves_mask)
-                next_state, reward, done, info = self.env.step(action)
-                state = next_state
-                steps += 1
-            
-            # Registra resultados do jogo
-            results['scores'].append(self.env.visited_count)
-            results['visited_counts'].append(self.env.visited_count)
-            results['game_lengths'].append(steps)
-            
-            if self.env.visited_count == self.env.total_squares:
-                results['wins'] += 1
-        
-        # Calcula estatísticas finais
-        results['win_rate'] = results['wins'] / num_tests
-        results['avg_score'] = np.mean(results['scores'])
-        results['max_score'] = np.max(results['scores'])
-        results['std_score'] = np.std(results['scores'])
-        results['avg_game_length'] = np.mean(results['game_lengths'])
+        results['episode'] = episode_num
         
         if verbose:
             print(f"   ✅ Resultados: {results['win_rate']:.1%} vitórias "
-                  f"({results['wins']}/{num_tests}), "
+                  f"({results['wins']}/{results['total_tests']}, {results['games_played']} partidas jogadas), "
                   f"Score médio: {results['avg_score']:.1f}")
         
         return results
     
-    def test_all_selected_models(self, num_tests=50, save_results=True):
-        """Testa todos os modelos selecionados"""
+    def test_all_selected_models(self, num_tests=50, use_cache=True):
+        """
+        Testa todos os modelos selecionados (em paralelo, um processo por modelo).
+        Com use_cache=True, modelos já avaliados vêm do cache de avaliações.
+        """
         print(f"\n🚀 Iniciando testes de robustez ({num_tests} testes por modelo)...")
         
-        self.test_results = []
-        
-        for i, model in enumerate(self.selected_models, 1):
-            print(f"\n[{i}/{len(self.selected_models)}] Testando episódio {model['episode']}...")
-            
-            result = self.test_model_robustness(
-                model['path'], 
-                model['episode'], 
-                num_tests=num_tests,
-                verbose=True
-            )
-            
-            if result:
-                self.test_results.append(result)
+        cache_path = DEFAULT_CACHE_PATH if use_cache else None
+        self.test_results = evaluate_checkpoints(
+            [model['path'] for model in self.selected_models],
+            self.board_size,
+            games_per_start=num_tests,
+            cache_path=cache_path
+        )
+        
+        for i, (model, result) in enumerate(zip(self.selected_models, self.test_results), 1):
+            result['episode'] = model['episode']
+            print(f"[{i}/{len(self.selected_models)}] Episódio {model['episode']}: "
+                  f"{result['win_rate']:.1%} vitórias ({result['wins']}/{result['total_tests']}, "
+                  f"{result['games_played']} partidas jogadas), "
+                  f"Score médio: {result['avg_score']:.1f}")
         
         # Ordena resultados por taxa de vitória
         self.test_results = sorted(self.test_results, key=lambda x: x['win_rate'], reverse=True)
@@ -258,40 +190,11 @@ class BestModelsTester:
                   f"{result['avg_score']:>11.1f} {result['max_score']:>10.0f} "
                   f"{result['stuck_games']:>14}")
         
-        if save_results:
-            self.save_test_results()
+        if cache_path:
+            print(f"\n💾 Resultados no cache de avaliações: {cache_path}")
         
         return self.test_results
     
-    def save_test_results(self, filename='test_results.json'):
-        """Salva os resultados dos testes"""
-        results_path = os.path.join(self.models_dir, filename)
-        
-        # Prepara dados para serialização JSON
-        serializable_results = []
-        for result in self.test_results:
-            clean_result = result.copy()
-            # Converte arrays numpy e tipos numpy para tipos Python nativos
-            for key in ['scores', 'visited_counts', 'game_lengths']:
-                if key in clean_result:
-                    clean_result[key] = [int(x) for x in clean_result[key]]
-            
-            # Converte outros valores numpy para tipos Python nativos
-            for key in ['wins', 'total_tests', 'stuck_games', 'episode', 'max_score']:
-                if key in clean_result:
-                    clean_result[key] = int(clean_result[key])
-            
-            for key in ['win_rate', 'avg_score', 'std_score', 'avg_game_length']:
-                if key in clean_result:
-                    clean_result[key] = float(clean_result[key])
-            
-            serializable_results.append(clean_result)
-        
-        with open(results_path, 'w') as f:
-            json.dump(serializable_results, f, indent=2)
-        
-        print(f"\n💾 Resultados salvos em: {results_path}")
-    
     def plot_analysis(self, save_plots=True):
         """Cria visualizações da análise"""
         print("\n📊 Gerando visualizações...")
@@ -7,14 +7,12 @@ Baseado na ideia original proposta pelo usuário
 import os
 os.environ['CUDA_VISIBLE_DEVICES'] = '-1'  # Força CPU
 
-from dqn_agent import DQNAgent
-from knight_env import KnightTourEnv
-import numpy as np
-import pandas as pd
+from metrics_logger import load_training_log_df
+from evaluation import evaluate_checkpoints, list_checkpoints
 
 def load_training_data():
     """Carrega e analisa os dados de treinamento"""
-    df = pd.read_csv('logs/training_log.csv')
+    df = load_training_log_df('logs/training_log.csv')
     print(f"📊 Dados carregados: {len(df)} episódios")
     
     # Encontra os ranges com mais vitórias
@@ -53,23 +51,7 @@ def load_training_data():
 
 def get_available_models():
     """Lista modelos disponíveis"""
-    models = []
-    models_dir = 'models/'
-    
-    if os.path.exists(models_dir):
-        for file in os.listdir(models_dir):
-            if file.endswith('.h5'):
-                try:
-                    episode_num = int(file.split('_e')[1].split('.')[0])
-                    models.append({
-                        'filename': file,
-                        'episode': episode_num,
-                        'path': os.path.join(models_dir, file)
-                    })
-                except:
-                    continue
-    
-    return sorted(models, key=lambda x: x['episode'])
+    return list_checkpoints('models/')
 
 def select_winner_models(best_ranges, available_models):
     """
@@ -109,79 +91,40 @@ def select_winner_models(best_ranges, available_models):
     
     return selected_models
 
+def _validation_result(result, episode_num):
+    """Converte o resultado de evaluation.evaluate_checkpoints para o formato deste script"""
+    return {
+        'episode': episode_num,
+        'model_path': result['model_path'],
+        'vitorias': result['wins'],
+        'total_episodios': result['total_tests'],
+        'taxa_vitoria': result['win_rate'],
+        'score_medio': result['avg_score'],
+        'score_std': result['std_score'],
+        'score_min': result['min_score'],
+        'score_max': result['max_score'],
+        'game_details': [
+            {'test': teste, 'result': 'WIN' if game['win'] else 'LOSS', 'start': game['start'],
+             'count': game['count'], 'score': game['visited'], 'steps': game['steps']}
+            for teste, game in enumerate(result['games'])
+        ]
+    }
+
 def test_model_robustness(model_path, episode_num, num_tests=20):
     """
     Testa se o modelo realmente é bom ou apenas teve sorte
     Implementação baseada na ideia original do usuário
     """
-    env = KnightTourEnv(board_size=5)
-    state_shape = env.observation_space.shape
-    action_size = env.action_space.n
-    
-    # Carrega o agente
-    agent = DQNAgent(state_shape, action_size)
+    print(f"🧪 Testando modelo episódio {episode_num} ({num_tests} testes)...")
     
     try:
-        agent.load(model_path)
-        agent.epsilon = 0.0  # Sem exploração - modo teste
+        result = evaluate_checkpoints([model_path], 5, games_per_start=num_tests,
+                                      max_steps=1000, workers=1)[0]
     except Exception as e:
         print(f"❌ Erro ao carregar {model_path}: {e}")
         return None
     
-    vitorias = 0
-    total_episodios = num_tests
-    scores = []
-    game_details = []
-    
-    print(f"🧪 Testando modelo episódio {episode_num} ({total_episodios} testes)...")
-    
-    for teste in range(total_episodios):
-        state = env.reset()
-        done = False
-        steps = 0
-        max_steps = 1000  # Evita loops infinitos
-        
-        while not done and steps < max_steps:
-            valid_moves_mask = env._get_valid_moves_mask()
-            
-            if not valid_moves_mask.any():
-                # Travou - sem movimentos válidos
-                break
-            
-            action = agent.act(state, valid_moves_mask)
-            next_state, reward, done, info = env.step(action)
-            state = next_state
-            steps += 1
-        
-        # Verifica se conseguiu completar o tour
-        final_score = env.visited_count
-        scores.append(final_score)
-        
-        if env.visited_count == env.total_squares:  # 25 para board 5x5
-            vitorias += 1
-            game_details.append({'test': teste, 'result': 'WIN', 'score': final_score, 'steps': steps})
-        else:
-            game_details.append({'test': teste, 'result': 'LOSS', 'score': final_score, 'steps': steps})
-    
-    # Calcula estatísticas
-    taxa_vitoria = vitorias / total_episodios
-    score_medio = np.mean(scores)
-    score_std = np.std(scores)
-    
-    result = {
-        'episode': episode_num,
-        'model_path': model_path,
-        'vitorias': vitorias,
-        'total_episodios': total_episodios,
-        'taxa_vitoria': taxa_vitoria,
-        'score_medio': score_medio,
-        'score_std': score_std,
-        'score_min': min(scores),
-        'score_max': max(scores),
-        'game_details': game_details
-    }
-    
-    return result
+    return _validation_result(result, episode_num)
 
 def main():
     """Função principal - implementa a ideia do usuário"""
@@ -206,20 +149,27 @@ def main():
     
     resultados = {}
     
-    for i, model in enumerate(modelos_vencedores, 1):
-        print(f"\n[{i}/{len(modelos_vencedores)}] ", end="")
-        
-        result = test_model_robustness(
-            model['path'], 
-            model['episode'], 
-            num_tests=20  # Teste rápido mas significativo
-        )
+    # Todos os modelos de uma vez, em paralelo (um processo por modelo)
+    avaliacoes = evaluate_checkpoints(
+        [model['path'] for model in modelos_vencedores],
+        5,
+        games_per_start=20,  # Teste rápido mas significativo
+        max_steps=1000,
+        errors='return'  # Um modelo com erro não derruba os demais
+    )
+    
+    for i, (model, avaliacao) in enumerate(zip(modelos_vencedores, avaliacoes), 1):
+        if 'error' in avaliacao:
+            print(f"\n[{i}/{len(modelos_vencedores)}] ❌ Erro ao carregar {model['path']}: {avaliacao['error']}")
+            continue
+        print(f"\n[{i}/{len(modelos_vencedores)}] 🧪 Modelo episódio {model['episode']} "
+              f"({avaliacao['total_tests']} testes, {avaliacao['games_played']} partidas jogadas)")
         
-        if result:
-            resultados[model['path']] = result
-            print(f"   ✅ {result['taxa_vitoria']:.1%} vitórias "
-                  f"({result['vitorias']}/{result['total_episodios']}), "
-                  f"Score médio: {result['score_medio']:.1f}")
+        result = _validation_result(avaliacao, model['episode'])
+        resultados[model['path']] = result
+        print(f"   ✅ {result['taxa_vitoria']:.1%} vitórias "
+              f"({result['vitorias']}/{result['total_episodios']}), "
+              f"Score médio: {result['score_medio']:.1f}")
     
     # 5. Exibe resultados finais
     print(f"\n🏆 RESULTADOS FINAIS - VALIDAÇÃO DE ROBUSTEZ")
@@ -42,11 +42,16 @@ def list_models(board_size=None):
             print(f"   Descrição: {info['description']}")
             print(f"   Ação: Treinar modelo para {size_key}")
 
-def test_model(board_size, model_file=None, num_tests=10):
-    """Testa um modelo específico"""
-    import numpy as np
-    from dqn_agent import DQNAgent
-    from knight_env import KnightTourEnv
+def test_model(board_size, model_file=None, num_tests=10, starts=None, sequential=None,
+               threshold=None, max_games=1000):
+    """
+    Testa um modelo específico (starts: 'all', 'symmetric' ou 'center'; padrão 'all').
+    Com sequential ('wilson', 'clopper-pearson' ou 'sprt') joga lotes de
+    num_tests partidas e para quando a taxa de vitória fica decidida em relação
+    a threshold (%) ou, sem threshold, ao melhor modelo configurado — nesse
+    caso nas casas iniciais em que ele foi medido (o centro).
+    """
+    from evaluation import evaluate_checkpoints, evaluate_sequential
     
     print(f"🧪 TESTANDO MODELO - TABULEIRO {board_size}x{board_size}")
     print("=" * 50)
@@ -64,58 +69,68 @@ def test_model(board_size, model_file=None, num_tests=10):
             return
     
     print(f"📁 Modelo: {os.path.basename(model_path)}")
-    print(f"🎯 Testes: {num_tests}")
+    if starts is None and not (sequential and threshold is None):
+        starts = 'all'
+    if sequential:
+        print(f"🎯 Testes: lotes de {num_tests} até decidir ({sequential}, casas iniciais: "
+              f"{starts or 'as do melhor modelo'})")
+    else:
+        print(f"🎯 Testes: {num_tests} por casa inicial ({starts})")
     
-    # Configura ambiente e agente
-    env = KnightTourEnv(board_size=board_size)
-    agent = DQNAgent(env.observation_space.shape, env.action_space.n, epsilon=0.0)
+    # Força CPU
+    os.environ['CUDA_VISIBLE_DEVICES'] = '-1'
+    
+    print(f"\n🚀 Executando testes...")
     
     try:
-        # Força CPU
-        import os as os_env
-        os_env.environ['CUDA_VISIBLE_DEVICES'] = '-1'
-        
-        agent.load(model_path)
-        print(f"✅ Modelo carregado com sucesso")
+        if sequential:
+            result = evaluate_sequential([model_path], board_size,
+                                         threshold=None if threshold is None else threshold / 100,
+                                         method=sequential, batch_size=num_tests, min_games=num_tests,
+                                         max_games=max_games, start_positions=starts,
+                                         max_steps=board_size * board_size * 3, workers=1)[0]
+        else:
+            result = evaluate_checkpoints([model_path], board_size, start_positions=starts,
+                                          games_per_start=num_tests, max_steps=board_size * board_size * 3, workers=1)[0]
     except Exception as e:
-        print(f"❌ Erro ao carregar modelo: {e}")
+        print(f"❌ Erro ao avaliar modelo: {e}")
         return
     
-    # Executa testes
-    wins = 0
+    wins = result['wins']
     total_moves = []
     
-    print(f"\n🚀 Executando testes...")
-    
-    for test in range(num_tests):
-        state = env.reset()
-        done = False
-        moves = 0
-        max_moves = board_size * board_size * 3
-        
-        while not done and moves < max_moves:
-            valid_moves_mask = env._get_valid_moves_mask()
-            if not valid_moves_mask.any():
-                break
-            
-            action = agent.act(state, valid_moves_mask)
-            state, reward, done, info = env.step(action)
-            moves += 1
-        
-        win = (env.visited_count == board_size * board_size)
-        if win:
-            wins += 1
-            total_moves.append(moves)
+    if sequential:
+        decisions = {'above': '⬆️  ACIMA', 'below': '⬇️  ABAIXO', 'undecided': '❔ INDEFINIDO'}
+        if result['exact']:
+            detail = f"taxa exata {result['win_rate']:.1%}, todas as casas jogadas"
+        elif 'llr' in result:
+            detail = f"LLR {result['llr']:.2f}"
+        else:
+            detail = f"IC [{result['interval'][0]:.1%}, {result['interval'][1]:.1%}]"
+        print(f"   Decisão: {decisions[result['decision']]} de {result['threshold']:.1%} ({detail})")
+        if result['exact']:
+            print(f"   Partidas jogadas: {result['games_played']} (uma por casa inicial)")
+        else:
+            print(f"   Partidas usadas: {result['games_used']} ({result['games_played']} jogadas)")
+    
+    # Uma linha por partida distinta; com política determinística cada casa
+    # inicial é jogada uma vez e vale por todas as repetições (x count)
+    for game in result['games']:
+        if game['win']:
+            total_moves.extend([game['steps']] * game['count'])
+        if sequential:
+            continue
         
-        print(f"   Teste {test + 1:2d}: {'✅ WIN' if win else '❌ LOSE'} "
-              f"({env.visited_count}/{board_size * board_size} casas, {moves} movimentos)")
+        print(f"   Início {game['start']} x{game['count']}: {'✅ WIN' if game['win'] else '❌ LOSE'} "
+              f"({game['visited']}/{board_size * board_size} casas, {game['steps']} movimentos)")
     
     # Resultados
-    win_rate = wins / num_tests
+    total_tests = result['total_tests']
+    win_rate = result['win_rate']
     avg_moves = sum(total_moves) / len(total_moves) if total_moves else 0
     
     print(f"\n📊 RESULTADOS:")
-    print(f"   Taxa de vitória: {wins}/{num_tests} ({win_rate:.1%})")
+    print(f"   Taxa de vitória: {wins}/{total_tests} ({win_rate:.1%}, {result['games_played']} partidas jogadas)")
     if total_moves:
         print(f"   Movimentos médios: {avg_moves:.1f}")
         print(f"   Melhor: {min(total_moves)} movimentos")
@@ -137,10 +152,31 @@ def test_model(board_size, model_file=None, num_tests=10):
         'model_path': model_path,
         'win_rate': win_rate,
         'avg_moves': avg_moves,
-        'total_tests': num_tests,
+        'total_tests': total_tests,
         'wins': wins
     }
 
+def export_model(board_size, model_file=None):
+    """Exporta os pesos de um modelo para .npz (inferência sem TensorFlow)"""
+    from dqn_agent import DQNAgent
+    from knight_env import KnightTourEnv
+    
+    if model_file:
+        model_path = f"models/{board_size}x{board_size}/{model_file}"
+    else:
+        model_path = model_config.get_model_path(board_size)
+    
+    if not model_path or not os.path.exists(model_path):
+        print(f"❌ Modelo não encontrado para {board_size}x{board_size}")
+        return
+    
+    env = KnightTourEnv(board_size=board_size)
+    agent = DQNAgent.for_inference(model_path, env.observation_space.shape, env.action_space.n)
+    npz_path = agent.export_numpy(weights_path=model_path)
+    
+    print(f"✅ Pesos exportados: {npz_path}")
+    return npz_path
+
 def set_best_model(board_size, model_file, win_rate=None, avg_moves=None):
     """Define um modelo como melhor para um tamanho"""
     
@@ -153,7 +189,8 @@ def set_best_model(board_size, model_file, win_rate=None, avg_moves=None):
     # Se não foram fornecidos win_rate e avg_moves, executa teste
     if win_rate is None or avg_moves is None:
         print("🧪 Testando modelo para obter estatísticas...")
-        results = test_model(board_size, model_file, num_tests=20)
+        # A configuração registra o centro como posição inicial
+        results = test_model(board_size, model_file, num_tests=20, starts='center')
         if not results:
             return
         
@@ -207,7 +244,15 @@ def main():
     test_parser = subparsers.add_parser('test', help='Testa um modelo')
     test_parser.add_argument('size', type=int, help='Tamanho do tabuleiro')
     test_parser.add_argument('--model', help='Arquivo do modelo (opcional)')
-    test_parser.add_argument('--tests', type=int, default=10, help='Número de testes')
+    test_parser.add_argument('--tests', type=int, default=10, help='Número de testes por casa inicial')
+    test_parser.add_argument('--starts', choices=['all', 'symmetric', 'center'],
+                             help='Casas iniciais: todas, uma por simetria ou só o centro (padrão: todas; '
+                                  'no modo sequencial sem --threshold, as do melhor modelo)')
+    test_parser.add_argument('--sequential', choices=['wilson', 'clopper-pearson', 'sprt'],
+                             help='Para antecipadamente quando a taxa de vitória estiver decidida')
+    test_parser.add_argument('--threshold', type=float,
+                             help='Limiar de taxa de vitória (%%) do modo sequencial (padrão: melhor modelo)')
+    test_parser.add_argument('--max-games', type=int, default=1000, help='Máximo de partidas no modo sequencial')
     
     # Comando set-best
     set_parser = subparsers.add_parser('set-best', help='Define melhor modelo')
@@ -216,6 +261,11 @@ def main():
     set_parser.add_argument('--win-rate', type=float, help='Taxa de vitória (%)')
     set_parser.add_argument('--avg-moves', type=int, help='Movimentos médios')
     
+    # Comando export
+    export_parser = subparsers.add_parser('export', help='Exporta pesos para .npz (inferência em NumPy)')
+    export_parser.add_argument('size', type=int, help='Tamanho do tabuleiro')
+    export_parser.add_argument('--model', help='Arquivo do modelo (opcional)')
+    
     # Comando train
     train_parser = subparsers.add_parser('train', help='Treina novo modelo')
     train_parser.add_argument('size', type=int, help='Tamanho do tabuleiro')
@@ -234,11 +284,14 @@ def main():
         list_models(args.size)
     
     elif args.command == 'test':
-        test_model(args.size, args.model, args.tests)
+        test_model(args.size, args.model, args.tests, args.starts, args.sequential, args.threshold, args.max_games)
     
     elif args.command == 'set-best':
         set_best_model(args.size, args.model, args.win_rate, args.avg_moves)
     
+    elif args.command == 'export':
+        export_model(args.size, args.model)
+    
     elif args.command == 'train':
         train_new_model(args.size, args.episodes)
     
@@ -7,8 +7,147 @@ Monitora logs de treinamento em tempo real e mostra estatísticas
 import pandas as pd
 import matplotlib.pyplot as plt
 import os
+import csv
 import time
 import argparse
+from collections import deque
+
+# Nomes de colunas do CSV do train.py -> nomes usados pelo monitor
+COLUMN_ALIASES = {
+    'max_visited': 'visited_count',
+    'avg_reward': 'reward',
+}
+
+def canonical_column(name):
+    """Normaliza um nome de coluna (sem diferenciar maiúsculas) para o nome usado no monitor"""
+    name = name.strip().lower()
+    return COLUMN_ALIASES.get(name, name)
+
+class LogTailer:
+    """
+    Lê apenas os bytes acrescentados a um CSV desde a última leitura.
+
+    Guarda o offset do arquivo e a última linha incompleta (ainda sendo
+    escrita). Se o arquivo for trocado (inode diferente), encolher ou tiver
+    os bytes já lidos reescritos (ex.: train.py --resume trunca o log e ele
+    volta a crescer antes da próxima leitura), volta ao início e sinaliza a
+    rotação em `rotated`. Linhas com número de campos diferente do cabeçalho
+    são descartadas e contadas em `skipped`.
+    """
+
+    # Bytes finais já lidos comparados a cada leitura para detectar reescrita
+    FINGERPRINT_BYTES = 64
+
+    def __init__(self, path):
+        self.path = path
+        self.offset = 0
+        self.inode = None
+        self.columns = None
+        self.rotated = False
+        self.skipped = 0
+        self._partial = b''
+        self._fingerprint = b''
+
+    def _reset(self):
+        self.offset = 0
+        self.columns = None
+        self._partial = b''
+        self._fingerprint = b''
+
+    def _rewritten(self, f, stat):
+        """O arquivo não é mais uma continuação do que já foi lido"""
+        if stat.st_ino != self.inode or stat.st_size < self.offset:
+            return True
+        f.seek(self.offset - len(self._fingerprint))
+        return f.read(len(self._fingerprint)) != self._fingerprint
+
+    def read_new_rows(self):
+        """Retorna as linhas completas novas como dicionários {coluna: valor}"""
+        self.rotated = False
+        with open(self.path, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            if self.inode is not None and self._rewritten(f, stat):
+                self._reset()
+                self.rotated = True
+            self.inode = stat.st_ino
+
+            if stat.st_size == self.offset:
+                return []
+
+            f.seek(self.offset)
+            data = f.read(stat.st_size - self.offset)
+        self.offset += len(data)
+        self._fingerprint = (self._fingerprint + data)[-self.FINGERPRINT_BYTES:]
+
+        lines = (self._partial + data).split(b'\n')
+        self._partial = lines.pop()  # Vazio se o último byte foi '\n'
+
+        rows = []
+        for values in csv.reader(line.decode('utf-8', errors='replace').rstrip('\r')
+                                 for line in lines if line.strip()):
+            if self.columns is None:
+                self.columns = [canonical_column(name) for name in values]
+                continue
+            if len(values) != len(self.columns):
+                self.skipped += 1
+                continue
+            rows.append(dict(zip(self.columns, values)))
+        return rows
+
+class TrainingStats:
+    """Agregados do treinamento atualizados em O(1) por linha"""
+
+    def __init__(self, recent_window=100):
+        self.skipped = 0
+        self.episodes = 0
+        self.total_wins = 0
+        self.best_reward = float('-inf')
+        self.best_visited = 0
+        self.visited_sum = 0
+        self.recent_wins = deque(maxlen=recent_window)
+        self.recent_win_sum = 0
+        self.last = None
+
+    def update(self, row):
+        episode = int(row['episode'])
+        reward = float(row['reward'])
+        visited = int(row['visited_count'])
+        win = int(float(row['win']))
+        epsilon = float(row['epsilon'])
+
+        self.episodes += 1
+        self.total_wins += win
+        self.best_reward = max(self.best_reward, reward)
+        self.best_visited = max(self.best_visited, visited)
+        self.visited_sum += visited
+
+        if len(self.recent_wins) == self.recent_wins.maxlen:
+            self.recent_win_sum -= self.recent_wins[0]
+        self.recent_wins.append(win)
+        self.recent_win_sum += win
+
+        self.last = {'episode': episode, 'reward': reward, 'visited_count': visited,
+                     'win': win, 'epsilon': epsilon}
+
+    def update_rows(self, rows):
+        """Aplica update() a cada linha, descartando (e contando em skipped) as malformadas"""
+        for row in rows:
+            try:
+                self.update(row)
+            except (KeyError, TypeError, ValueError):
+                self.skipped += 1
+
+    @property
+    def recent_win_rate(self):
+        return self.recent_win_sum / len(self.recent_wins) if self.recent_wins else 0.0
+
+    @property
+    def mean_visited(self):
+        return self.visited_sum / self.episodes if self.episodes else 0.0
+
+    @property
+    def win_rate(self):
+        return self.total_wins / self.episodes if self.episodes else 0.0
 
 def monitor_training_progress(board_size, log_file=None, refresh_interval=10):
     """
@@ -44,74 +183,66 @@ def monitor_training_progress(board_size, log_file=None, refresh_interval=10):
     print("   Pressione Ctrl+C para parar")
     print("-" * 60)
     
-    last_episode = 0
+    tailer = LogTailer(log_file)
+    stats = TrainingStats()
+    total_squares = board_size * board_size
     
     try:
         while True:
             try:
-                # Lê o arquivo de log
-                df = pd.read_csv(log_file)
+                # Lê apenas as linhas acrescentadas desde a última verificação
+                new_rows = tailer.read_new_rows()
+                if tailer.rotated:
+                    print(f"\n🔄 Log reiniciado/rotacionado, recomeçando as estatísticas")
+                    stats = TrainingStats()
                 
-                if len(df) > last_episode:
-                    # Novos episódios desde a última verificação
-                    new_data = df.iloc[last_episode:]
-                    
-                    # Estatísticas atuais
-                    current_episode = df.iloc[-1]['episode']
-                    current_reward = df.iloc[-1]['reward']
-                    current_visited = df.iloc[-1]['visited_count']
-                    current_win = df.iloc[-1]['win']
-                    current_epsilon = df.iloc[-1]['epsilon']
-                    
-                    # Melhores resultados até agora
-                    best_reward = df['reward'].max()
-                    best_visited = df['visited_count'].max()
-                    total_wins = df['win'].sum()
-                    
-                    # Taxa de vitória nos últimos 100
-                    recent_data = df.tail(100)
-                    recent_win_rate = recent_data['win'].mean()
+                stats.update_rows(new_rows)
+                
+                if new_rows:
+                    current = stats.last
                     
                     # Taxa de progresso (casas visitadas)
-                    total_squares = board_size * board_size
-                    progress_rate = (best_visited / total_squares) * 100
+                    progress_rate = (stats.best_visited / total_squares) * 100
                     
-                    print(f"\r🎯 Ep {current_episode:5d} | "
-                          f"Atual: R={current_reward:6.1f} V={current_visited:2d} | "
-                          f"Melhor: R={best_reward:6.1f} V={best_visited:2d} | "
+                    print(f"\r🎯 Ep {current['episode']:5d} | "
+                          f"Atual: R={current['reward']:6.1f} V={current['visited_count']:2d} | "
+                          f"Melhor: R={stats.best_reward:6.1f} V={stats.best_visited:2d} | "
                           f"Progresso: {progress_rate:5.1f}% | "
-                          f"Wins: {total_wins} | "
-                          f"Taxa: {recent_win_rate:.1%} | "
-                          f"ε: {current_epsilon:.3f}", end="")
-                    
-                    last_episode = len(df)
+                          f"Wins: {stats.total_wins} | "
+                          f"Taxa: {stats.recent_win_rate:.1%} | "
+                          f"ε: {current['epsilon']:.3f}", end="")
+                elif stats.last is None:
+                    print(f"\r⏳ Aguardando dados...", end="")
                 
                 time.sleep(refresh_interval)
                 
             except FileNotFoundError:
                 print(f"\r⏳ Aguardando arquivo de log...", end="")
                 time.sleep(refresh_interval)
-            except pd.errors.EmptyDataError:
-                print(f"\r⏳ Aguardando dados...", end="")
-                time.sleep(refresh_interval)
                 
     except KeyboardInterrupt:
         print(f"\n\n📊 RESUMO FINAL:")
         
         try:
-            df = pd.read_csv(log_file)
+            stats.update_rows(tailer.read_new_rows())
+            
+            if stats.last is None:
+                print("   Nenhum episódio registrado")
+                return
             
-            print(f"   Total de episódios: {len(df)}")
-            print(f"   Melhor recompensa: {df['reward'].max():.1f}")
-            print(f"   Máximo visitado: {df['visited_count'].max()}/{board_size*board_size}")
-            print(f"   Total de vitórias: {df['win'].sum()}")
-            print(f"   Taxa de vitória geral: {df['win'].mean():.1%}")
+            print(f"   Total de episódios: {stats.episodes}")
+            print(f"   Melhor recompensa: {stats.best_reward:.1f}")
+            print(f"   Máximo visitado: {stats.best_visited}/{total_squares}")
+            print(f"   Média de casas visitadas: {stats.mean_visited:.1f}/{total_squares}")
+            print(f"   Total de vitórias: {stats.total_wins}")
+            print(f"   Taxa de vitória geral: {stats.win_rate:.1%}")
             
-            if len(df) >= 100:
-                recent_win_rate = df.tail(100)['win'].mean()
-                print(f"   Taxa últimos 100: {recent_win_rate:.1%}")
+            if stats.episodes >= 100:
+                print(f"   Taxa últimos 100: {stats.recent_win_rate:.1%}")
             
-            print(f"   Epsilon final: {df.iloc[-1]['epsilon']:.3f}")
+            print(f"   Epsilon final: {stats.last['epsilon']:.3f}")
+            if stats.skipped or tailer.skipped:
+                print(f"   Linhas malformadas ignoradas: {stats.skipped + tailer.skipped}")
             
         except Exception as e:
             print(f"   Erro ao gerar resumo: {e}")
@@ -128,7 +259,7 @@ def plot_training_progress(board_size, log_file=None):
         log_files.sort()
         log_file = os.path.join(logs_dir, log_files[-1])
     
-    df = pd.read_csv(log_file)
+    df = pd.read_csv(log_file).rename(columns=canonical_column)
     
     # Cria gráfico com subplots
     fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(15, 10))
@@ -184,7 +315,7 @@ def main():
     monitor_parser = subparsers.add_parser('monitor', help='Monitora treinamento em tempo real')
     monitor_parser.add_argument('size', type=int, help='Tamanho do tabuleiro')
     monitor_parser.add_argument('--log', help='Arquivo de log específico')
-    monitor_parser.add_argument('--interval', type=int, default=10, help='Intervalo de atualização (s)')
+    monitor_parser.add_argument('--interval', type=float, default=10, help='Intervalo de atualização (s)')
     
     # Comando plot
     plot_parser = subparsers.add_parser('plot', help='Gera gráfico do progresso')
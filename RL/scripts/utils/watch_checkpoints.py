@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Observador de Checkpoints
+Avalia cada knight_tour_dqn_b{N}_e{E}.weights.h5 assim que o train.py termina
+de gravá-lo e mantém um ranking ao vivo dos checkpoints
+"""
+
+import argparse
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from evaluation import evaluate_checkpoints
+from model_config import model_config, update_best_model
+
+CHECKPOINT_PATTERN = r'knight_tour_dqn_b{size}_e(\d+)\.weights\.h5$'
+
+class CheckpointScanner:
+    """
+    Encontra checkpoints novos por polling de mtime/tamanho.
+
+    Um arquivo só é liberado quando mtime e tamanho ficam iguais entre duas
+    varreduras seguidas (o train.py pode estar no meio da gravação).
+    """
+
+    def __init__(self, models_dir, board_size):
+        self.models_dir = models_dir
+        self.pattern = re.compile(CHECKPOINT_PATTERN.format(size=board_size))
+        self.seen = set()
+        self._pending = {}  # caminho -> (mtime, tamanho) da última varredura
+
+    def scan(self):
+        """Retorna [(episódio, caminho)] dos checkpoints novos e estáveis"""
+        ready = []
+        try:
+            entries = list(os.scandir(self.models_dir))
+        except FileNotFoundError:
+            return ready
+
+        for entry in entries:
+            match = self.pattern.match(entry.name)
+            if not match or entry.path in self.seen:
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+
+            signature = (stat.st_mtime_ns, stat.st_size)
+            if self._pending.get(entry.path) == signature and stat.st_size > 0:
+                del self._pending[entry.path]
+                self.seen.add(entry.path)
+                ready.append((int(match.group(1)), entry.path))
+            else:
+                self._pending[entry.path] = signature
+
+        return sorted(ready)
+
+    @property
+    def has_pending(self):
+        """Há arquivos vistos mas ainda não estáveis"""
+        return bool(self._pending)
+
+def print_leaderboard(results, top=10):
+    """Imprime o ranking dos checkpoints avaliados"""
+    ranking = sorted(results.values(), key=lambda r: (r['win_rate'], r['avg_score']), reverse=True)
+
+    print(f"\n🏆 RANKING ({len(ranking)} checkpoints avaliados) - {datetime.now().strftime('%H:%M:%S')}")
+    print("-" * 70)
+    print(f"{'#':>3} {'Episódio':>8} {'Taxa Vitória':>12} {'Vitórias':>11} {'Score Médio':>12} {'Partidas':>9}")
+    print("-" * 70)
+    for i, result in enumerate(ranking[:top], 1):
+        print(f"{i:>3} {result['episode']:>8} {result['win_rate']:>11.1%} "
+              f"{result['wins']:>5}/{result['total_tests']:<5} {result['avg_score']:>12.1f} "
+              f"{result['games_played']:>9}")
+
+    return ranking
+
+def maybe_promote(board_size, best, starts, games_per_start=1):
+    """
+    Promove o melhor checkpoint se superar o modelo configurado atualmente.
+    A configuração é validada a partir do centro: se o ranking usa outras
+    casas iniciais, o líder é reavaliado só no centro antes da comparação.
+    """
+    info = model_config.BEST_MODELS.get(model_config.get_board_size_key(board_size), {})
+    incumbent_file = info.get('model_file')
+    incumbent_rate = info.get('win_rate')
+    model_file = os.path.basename(best['model_path'])
+
+    if model_file == incumbent_file:
+        return
+
+    if starts != 'center':
+        best = dict(evaluate_checkpoints([best['model_path']], board_size, start_positions='center',
+                                         games_per_start=games_per_start, workers=1)[0],
+                    episode=best['episode'])
+    win_rate = round(best['win_rate'] * 100, 1)
+    if incumbent_rate is not None and win_rate <= incumbent_rate:
+        return
+
+    win_lengths = [game['steps'] for game in best['games'] if game['win']]
+    avg_moves = int(sum(win_lengths) / len(win_lengths)) if win_lengths else int(best['avg_game_length'])
+
+    print(f"\n🥇 Novo melhor modelo: episódio {best['episode']} "
+          f"({win_rate}% > {incumbent_rate if incumbent_rate is not None else '-'}%)")
+    update_best_model(
+        board_size,
+        model_file=model_file,
+        win_rate=win_rate,
+        validation=f"Validated with {win_rate}% win rate ({best['total_tests']} games from the center)",
+        avg_moves=avg_moves,
+        starting_position=(board_size // 2, board_size // 2),  # Centro
+        training_range=f"Watcher - episódio {best['episode']}"
+    )
+
+def watch_checkpoints(board_size, models_dir=None, interval=10.0, workers=None, starts='all',
+                      games_per_start=1, top=10, promote=False, once=False):
+    """
+    Observa models/NxN e avalia os checkpoints novos em segundo plano
+
+    Args:
+        board_size: Tamanho do tabuleiro
+        models_dir: Diretório dos checkpoints (padrão: models/NxN)
+        interval: Intervalo entre varreduras em segundos
+        workers: Processos de avaliação (padrão: metade dos núcleos)
+        starts: Casas iniciais ('all', 'symmetric' ou 'center')
+        games_per_start: Partidas por casa inicial
+        top: Linhas do ranking
+        promote: Atualiza o melhor modelo via model_config.update_best_model
+        once: Avalia o que já existe e sai
+    """
+    models_dir = models_dir or f"models/{board_size}x{board_size}"
+    workers = workers or max(1, (os.cpu_count() or 2) // 2)
+
+    print(f"👀 OBSERVADOR DE CHECKPOINTS - {board_size}x{board_size}")
+    print("=" * 60)
+    print(f"📁 Diretório: {models_dir}")
+    print(f"⚙️  {workers} processo(s) de avaliação, casas iniciais: {starts}")
+    print(f"🔄 Varrendo a cada {interval} segundos")
+    print("   Pressione Ctrl+C para parar")
+
+    # Avaliação com prioridade baixa: os núcleos ficam primeiro para o treinamento
+    if hasattr(os, 'nice'):
+        os.nice(10)
+
+    scanner = CheckpointScanner(models_dir, board_size)
+    queue = []
+    results = {}
+    executor = ThreadPoolExecutor(max_workers=1)
+    running = None  # (future, caminhos em avaliação)
+
+    try:
+        while True:
+            for episode, path in scanner.scan():
+                print(f"\n📥 Novo checkpoint: episódio {episode}")
+                queue.append(path)
+
+            if running is not None and running[0].done():
+                future, paths = running
+                running = None
+                try:
+                    for result in future.result():
+                        if 'error' in result:
+                            print(f"\n❌ Erro ao avaliar o episódio {result['episode']}: {result['error']}")
+                            continue
+                        results[result['model_path']] = result
+                except Exception as e:
+                    print(f"\n❌ Erro ao avaliar {len(paths)} checkpoint(s): {e}")
+                else:
+                    ranking = print_leaderboard(results, top)
+                    if promote and ranking:
+                        maybe_promote(board_size, ranking[0], starts, games_per_start)
+
+            if running is None and queue:
+                paths, queue = queue, []
+                print(f"\n🧪 Avaliando {len(paths)} checkpoint(s)...")
+                future = executor.submit(evaluate_checkpoints, paths, board_size, start_positions=starts,
+                                         games_per_start=games_per_start, workers=workers, errors='return')
+                running = (future, paths)
+
+            if once and running is None and not queue and not scanner.has_pending:
+                break
+
+            time.sleep(interval)
+
+    except KeyboardInterrupt:
+        print(f"\n\n⏹️  Observador encerrado")
+        if results:
+            print_leaderboard(results, top)
+
+    finally:
+        # cancel_futures só existe a partir do Python 3.9
+        if running is not None:
+            running[0].cancel()
+        executor.shutdown(wait=False)
+
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description='Observador de checkpoints do Knight\'s Tour')
+    parser.add_argument('size', type=int, help='Tamanho do tabuleiro')
+    parser.add_argument('--dir', help='Diretório dos checkpoints (padrão: models/NxN)')
+    parser.add_argument('--interval', type=float, default=10, help='Intervalo entre varreduras (s)')
+    parser.add_argument('--workers', type=int, help='Processos de avaliação (padrão: metade dos núcleos)')
+    parser.add_argument('--starts', choices=['all', 'symmetric', 'center'], default='all',
+                        help='Casas iniciais da avaliação')
+    parser.add_argument('--games', type=int, default=1, help='Partidas por casa inicial')
+    parser.add_argument('--top', type=int, default=10, help='Linhas do ranking')
+    parser.add_argument('--promote', action='store_true',
+                        help='Promove o melhor checkpoint quando superar o modelo configurado')
+    parser.add_argument('--once', action='store_true', help='Avalia os checkpoints existentes e sai')
+
+    args = parser.parse_args()
+    watch_checkpoints(args.size, args.dir, args.interval, args.workers, args.starts,
+                      args.games, args.top, args.promote, args.once)
+
+if __name__ == "__main__":
+    main()
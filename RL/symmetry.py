@@ -0,0 +1,140 @@
+"""
+Simetrias diedrais do tabuleiro (4 rotações x reflexão) para o Passeio do Cavalo.
+
+O problema é invariante às 8 simetrias do tabuleiro quadrado, e os índices de
+ação de KNIGHT_MOVES se permutam de forma previsível sob cada uma. Este módulo
+pré-calcula essas permutações e oferece:
+- augmentação de minibatches de replay (8x mais dados sem custo de ambiente);
+- forma canônica de um estado, usada como chave de caches de inferência.
+"""
+
+from collections import OrderedDict
+from functools import lru_cache
+
+import numpy as np
+
+from bitboard import KNIGHT_MOVES
+
+NUM_SYMMETRIES = 8
+
+
+def transform_boards(boards, transform, axes=(0, 1)):
+    """
+    Aplica a simetria `transform` (0-7) a arrays de tabuleiro: k = transform % 4
+    rotações de 90° e, se transform >= 4, uma reflexão horizontal em seguida.
+    """
+    result = np.rot90(boards, transform % 4, axes=axes)
+    if transform >= 4:
+        result = np.flip(result, axis=axes[1])
+    return result
+
+
+@lru_cache(maxsize=None)
+def action_permutations():
+    """
+    Tabela (8, 8): action_permutations()[t, a] é o índice da ação que
+    corresponde à ação `a` depois de aplicar a simetria `t` ao tabuleiro.
+    """
+    size = 5
+    center = size // 2
+    moves = {move: i for i, move in enumerate(KNIGHT_MOVES)}
+    table = np.zeros((NUM_SYMMETRIES, len(KNIGHT_MOVES)), dtype=np.int64)
+
+    for t in range(NUM_SYMMETRIES):
+        for a, (dr, dc) in enumerate(KNIGHT_MOVES):
+            board = np.zeros((size, size), dtype=np.int8)
+            board[center + dr, center + dc] = 1
+            row, col = np.argwhere(transform_boards(board, t))[0]
+            table[t, a] = moves[(int(row) - center, int(col) - center)]
+
+    table.setflags(write=False)
+    return table
+
+
+def augment_batch(states, actions, rewards, next_states, dones, next_masks, rng=None):
+    """
+    Aplica uma simetria aleatória a cada transição de um minibatch, permutando
+    ações e máscaras de acordo. Estados no formato (N, S, S, C).
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    perms = action_permutations()
+    transforms = rng.integers(0, NUM_SYMMETRIES, size=len(actions))
+
+    states = states.copy()
+    next_states = next_states.copy()
+    actions = actions.copy()
+    next_masks = next_masks.copy()
+
+    for t in range(1, NUM_SYMMETRIES):
+        idx = np.flatnonzero(transforms == t)
+        if len(idx) == 0:
+            continue
+        states[idx] = transform_boards(states[idx], t, axes=(1, 2))
+        next_states[idx] = transform_boards(next_states[idx], t, axes=(1, 2))
+        actions[idx] = perms[t][actions[idx]]
+        permuted_masks = np.zeros_like(next_masks[idx])
+        permuted_masks[:, perms[t]] = next_masks[idx]
+        next_masks[idx] = permuted_masks
+
+    return states, actions, rewards, next_states, dones, next_masks
+
+
+def canonical_form(board):
+    """
+    Forma canônica de um tabuleiro (S, S) ou observação (S, S, C) sob as 8
+    simetrias. Retorna (chave em bytes, simetria t que leva o estado à forma canônica).
+    """
+    board = np.ascontiguousarray(board)
+    best_key, best_t = None, 0
+    for t in range(NUM_SYMMETRIES):
+        key = np.ascontiguousarray(transform_boards(board, t)).tobytes()
+        if best_key is None or key < best_key:
+            best_key, best_t = key, t
+    return best_key, best_t
+
+
+class SymmetricQCache:
+    """
+    Cache LRU de Q-valores de uma política indexado pela forma canônica do
+    estado: as 8 orientações de uma posição compartilham a mesma entrada.
+
+    Só é exato para políticas equivariantes (ex.: treinadas com
+    augment_symmetries=True); com canonicalize=False a chave é o próprio estado.
+    """
+
+    def __init__(self, policy, maxsize=100000, canonicalize=True):
+        self.policy = policy
+        self.maxsize = maxsize
+        self.canonicalize = canonicalize
+        self._cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def q_values(self, state, valid_moves_mask=None):
+        """ Q-valores (mascarados, se a máscara for informada) para um estado. """
+        state = np.asarray(state, dtype=np.float32)
+        if self.canonicalize:
+            key, t = canonical_form(state)
+        else:
+            key, t = state.tobytes(), 0
+
+        q_canonical = self._cache.get(key)
+        if q_canonical is None:
+            self.misses += 1
+            q_canonical = self.policy.q_values(transform_boards(state, t))
+            self._cache[key] = q_canonical
+            if len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+        else:
+            self.hits += 1
+            self._cache.move_to_end(key)
+
+        # Volta para a orientação original: ação a corresponde à ação perms[t, a] canônica
+        act_values = q_canonical[action_permutations()[t]]
+        if valid_moves_mask is not None:
+            act_values = np.where(valid_moves_mask, act_values, -np.inf)
+        return act_values
+
+    def act(self, state, valid_moves_mask):
+        """ Melhor ação válida para um estado. """
+        return np.argmax(self.q_values(state, valid_moves_mask))
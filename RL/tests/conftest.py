@@ -0,0 +1,48 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# Os módulos do projeto ficam na raiz de RL/ (sem pacote)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from knight_env import KnightTourEnv  # noqa: E402
+
+
+@pytest.fixture
+def write_model():
+    """
+    Cria checkpoints reais: a rede do DQN com pesos aleatórios (semente) salva
+    em .weights.h5 e exportada para o .npz correspondente, que load_policy usa.
+    """
+    tf = pytest.importorskip('tensorflow')
+    from dqn_agent import InferencePolicy
+
+    def write(models_dir, episode, seed, board_size=5):
+        tf.keras.utils.set_random_seed(seed)
+        policy = InferencePolicy((board_size, board_size, 3), 8)
+        path = os.path.join(models_dir, f'knight_tour_dqn_b{board_size}_e{episode}.weights.h5')
+        policy.model.save_weights(path)
+        policy.export_numpy(weights_path=path)
+        return path
+
+    return write
+
+
+@pytest.fixture
+def make_transitions():
+    """ Transições reais (s, a, r, s', done, máscara de s') com ações aleatórias. """
+    def make(count, seed=0, board_size=5):
+        rng = np.random.default_rng(seed)
+        env = KnightTourEnv(board_size=board_size)
+        state = env.reset()
+        transitions = []
+        while len(transitions) < count:
+            action = int(rng.integers(0, 8))
+            next_state, reward, done, info = env.step(action)
+            transitions.append((state, action, reward, next_state, done, info['action_mask']))
+            state = env.reset() if done else next_state
+        return transitions
+
+    return make
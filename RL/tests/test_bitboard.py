@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+
+from bitboard import (bits_to_board, board_to_bits, count_legal_moves, decode_observations,
+                      encode_observations, knight_attack_masks, knight_legal_moves, knight_move_table,
+                      legal_actions_mask)
+from knight_env import KnightTourEnv
+
+
+def _trajectory(board_size, steps, seed):
+    """ Observações e máscaras de um episódio com movimentos válidos aleatórios. """
+    rng = np.random.default_rng(seed)
+    env = KnightTourEnv(board_size=board_size)
+    obs, info = env.reset(return_info=True)
+    observations, masks, states = [obs], [info['action_mask']], [(env._square, env.visited_bits)]
+    for _ in range(steps):
+        valid = np.flatnonzero(env.action_mask)
+        if len(valid) == 0:
+            break
+        obs, _, done, info = env.step(rng.choice(valid))
+        observations.append(obs)
+        masks.append(info['action_mask'])
+        states.append((env._square, env.visited_bits))
+        if done:
+            break
+    return np.array(observations), np.array(masks), states
+
+
+@pytest.mark.parametrize('board_size', [5, 6, 8])
+def test_board_bits_round_trip(board_size):
+    rng = np.random.default_rng(board_size)
+    board = rng.integers(0, 3, size=(board_size, board_size))
+    bits = board_to_bits(board)
+    np.testing.assert_array_equal(bits_to_board(bits, board_size), board != 0)
+    assert board_to_bits(bits_to_board(bits, board_size)) == bits
+
+
+@pytest.mark.parametrize('board_size', [5, 8])
+def test_encode_decode_observations_round_trip(board_size):
+    observations, masks, _ = _trajectory(board_size, steps=30, seed=0)
+    positions, bits = encode_observations(observations)
+    decoded, decoded_masks = decode_observations(positions, bits, board_size)
+    np.testing.assert_array_equal(decoded, observations)
+    np.testing.assert_array_equal(decoded_masks, masks)
+
+
+def test_legal_moves_match_env():
+    board_size = 6
+    _, masks, states = _trajectory(board_size, steps=30, seed=1)
+    for mask, (square, visited) in zip(masks, states):
+        np.testing.assert_array_equal(legal_actions_mask(square, visited, board_size), mask)
+        assert count_legal_moves(square, visited, board_size) == mask.sum()
+
+
+def test_attack_masks_corner_and_center():
+    masks = knight_attack_masks(5)
+    assert bin(masks[0]).count('1') == 2
+    assert bin(masks[12]).count('1') == 8
+
+
+@pytest.mark.parametrize('board_size', [5, 8])
+def test_legal_move_table_matches_move_geometry(board_size):
+    """ A consulta pelo AND-NOT dá a mesma máscara e destinos que testar movimento a movimento. """
+    rng = np.random.default_rng(board_size)
+    table = knight_move_table(board_size)
+    lookup = knight_legal_moves(board_size)
+    attacks = knight_attack_masks(board_size)
+    for _ in range(200):
+        square = int(rng.integers(board_size * board_size))
+        visited = board_to_bits(rng.random((board_size, board_size)) < 0.5) | (1 << square)
+        mask, destinations = lookup[square][attacks[square] & ~visited]
+
+        expected = np.array([target >= 0 and not (visited >> int(target)) & 1 for target in table[square]])
+        np.testing.assert_array_equal(mask, expected)
+        np.testing.assert_array_equal(destinations, table[square][expected])
+        assert not mask.flags.writeable
+
+
+def test_encode_rejects_large_boards():
+    with pytest.raises(ValueError):
+        encode_observations(np.zeros((1, 9, 9, 3), dtype=np.float32))
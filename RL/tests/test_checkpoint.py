@@ -0,0 +1,97 @@
+import os
+import random
+
+import numpy as np
+import pytest
+
+tf = pytest.importorskip('tensorflow')
+
+from checkpoint import (CheckpointWriter, capture_checkpoint, latest_checkpoint, load_checkpoint,
+                        restore_checkpoint)
+from dqn_agent import DQNAgent, _optimizer_variables
+from knight_env import KnightTourEnv
+
+STATE_SHAPE = (5, 5, 3)
+
+
+def _trained_agent(steps=3):
+    """ Agente com memória preenchida e alguns passos de gradiente (otimizador com estado). """
+    tf.keras.utils.set_random_seed(0)
+    agent = DQNAgent(STATE_SHAPE, 8, memory_size=500)
+    env = KnightTourEnv(board_size=5)
+    state = env.reset()
+    for _ in range(100):
+        action = random.randrange(8)
+        next_state, reward, done, info = env.step(action)
+        agent.remember(state, action, reward, next_state, done, info['action_mask'])
+        state = env.reset() if done else next_state
+    for _ in range(steps):
+        agent.train_on_batch(agent.sample_batch(16))
+    agent.epsilon = 0.42
+    return agent
+
+
+def _assert_arrays_equal(expected, actual):
+    assert len(expected) == len(actual)
+    for e, a in zip(expected, actual):
+        np.testing.assert_array_equal(np.asarray(a), np.asarray(e))
+
+
+def test_checkpoint_round_trip(tmp_path):
+    agent = _trained_agent()
+    writer = CheckpointWriter(str(tmp_path), keep=2)
+    writer.submit(capture_checkpoint(agent, episode=7, counters={'env_steps': 123}))
+    writer.close()
+
+    path = latest_checkpoint(str(tmp_path))
+    assert path == writer.last_path
+    assert os.path.basename(path) == 'ckpt_e0000007'
+
+    tf.keras.utils.set_random_seed(1)
+    restored = DQNAgent(STATE_SHAPE, 8, memory_size=500)
+    state = restore_checkpoint(restored, load_checkpoint(path))
+
+    assert state['episode'] == 7
+    assert state['env_steps'] == 123
+    assert restored.epsilon == pytest.approx(0.42)
+    _assert_arrays_equal(agent.model.get_weights(), restored.model.get_weights())
+    _assert_arrays_equal(agent.target_model.get_weights(), restored.target_model.get_weights())
+    _assert_arrays_equal(_optimizer_variables(agent.model.optimizer),
+                         _optimizer_variables(restored.model.optimizer))
+    for field in agent.memory.FIELDS:
+        np.testing.assert_array_equal(getattr(restored.memory, field), getattr(agent.memory, field))
+
+    # Retomado, o treinamento continua exatamente igual ao original
+    for _ in range(2):
+        expected_loss = agent.train_on_batch(agent.sample_batch(16))
+        loss = restored.train_on_batch(restored.sample_batch(16))
+        assert float(loss) == pytest.approx(float(expected_loss), rel=1e-6)
+    _assert_arrays_equal(agent.model.get_weights(), restored.model.get_weights())
+
+
+class _LegacyOptimizer:
+    """ Otimizador do Keras < 2.11, em que variables é um método. """
+
+    def __init__(self, optimizer):
+        self._optimizer = optimizer
+
+    def variables(self):
+        return self._optimizer.variables
+
+
+def test_optimizer_variables_property_or_method():
+    optimizer = _trained_agent(steps=1).model.optimizer
+    expected = _optimizer_variables(optimizer)
+    assert len(expected) > 0
+    assert _optimizer_variables(_LegacyOptimizer(optimizer)) == expected
+
+
+def test_writer_keeps_only_recent_checkpoints(tmp_path):
+    agent = _trained_agent(steps=1)
+    writer = CheckpointWriter(str(tmp_path), keep=2)
+    for episode in (1, 2, 3):
+        writer.submit(capture_checkpoint(agent, episode, include_replay=False))
+    writer.close()
+
+    assert sorted(d for d in os.listdir(tmp_path) if d.startswith('ckpt_e')) == ['ckpt_e0000002', 'ckpt_e0000003']
+    assert load_checkpoint(latest_checkpoint(str(tmp_path)))['replay'] is None
@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from distributed import SharedCompactReplayBuffer, SharedReplayBuffer, data_allowance, train_distributed
+from replay_buffer import CompactReplayBuffer, ReplayBuffer
+
+
+def test_data_allowance():
+    # Warm-up mais train_every por update, incluindo o próximo
+    assert data_allowance(0, 1000, 4, 1) == 1004
+    assert data_allowance(10, 1000, 4, 2) == 1000 + 6 * 4
+    assert data_allowance(10, 1000, 4, 1, max_data_ratio=2) == 1000 + 11 * 8
+
+
+@pytest.mark.parametrize('shared_cls, local_cls', [
+    (SharedReplayBuffer, ReplayBuffer),
+    (SharedCompactReplayBuffer, CompactReplayBuffer),
+])
+def test_shared_buffer_matches_local_buffer(shared_cls, local_cls, make_transitions):
+    transitions = make_transitions(150, seed=2)
+    shared = shared_cls(100, (5, 5, 3))
+    local = local_cls(100, (5, 5, 3))
+    try:
+        for transition in transitions:
+            local.add(*transition)
+        # Os atores escrevem em lote
+        for start in range(0, len(transitions), 16):
+            chunk = transitions[start:start + 16]
+            shared.add_batch(*(np.array(values) for values in zip(*chunk)))
+
+        assert (shared.head, len(shared), shared.total_added) == (local.head, len(local), 150)
+        idx = np.arange(100)
+        for expected, actual in zip(local._gather(idx), shared._gather(idx)):
+            np.testing.assert_array_equal(actual, expected)
+    finally:
+        shared.close()
+
+
+def _agent(replay_storage='dense'):
+    tf = pytest.importorskip('tensorflow')
+    from dqn_agent import DQNAgent
+
+    tf.keras.utils.set_random_seed(0)
+    return DQNAgent((5, 5, 3), 8, memory_size=5000, replay_storage=replay_storage)
+
+
+@pytest.mark.parametrize('replay_storage', ['dense', 'compact'])
+def test_two_actors_smoke(replay_storage):
+    agent = _agent(replay_storage)
+    logged = []
+    gradient_steps = train_distributed(
+        agent, num_actors=2, episodes=40, batch_size=16, board_size=5, memory_size=5000,
+        train_every=4, gradient_steps_per_update=1, learning_starts=32, target_update=20,
+        weight_sync=10, envs_per_actor=4, max_steps=30, max_data_ratio=1,
+        log_writer=lambda *row: logged.append(row),
+    )
+
+    assert [row[0] for row in logged] == list(range(40))
+    assert gradient_steps > 0
+    assert agent.epsilon < 1.0
+
+
+def test_dead_actors_stop_the_learner():
+    agent = _agent()
+    # Tabuleiro 6x6 com uma rede 5x5: os atores falham no primeiro passo
+    with pytest.raises(RuntimeError, match="código 1"):
+        train_distributed(agent, num_actors=2, episodes=10, batch_size=16, board_size=6, memory_size=1000,
+                          train_every=4, gradient_steps_per_update=1, learning_starts=32, target_update=20,
+                          envs_per_actor=2, max_steps=30)
@@ -0,0 +1,132 @@
+import numpy as np
+import pytest
+
+tf = pytest.importorskip('tensorflow')
+
+from dqn_agent import DQNAgent
+
+STATE_SHAPE = (5, 5, 3)
+GAMMA = 0.9
+
+
+def _agent(double_dqn):
+    tf.keras.utils.set_random_seed(0)
+    agent = DQNAgent(STATE_SHAPE, 8, gamma=GAMMA, double_dqn=double_dqn)
+    # Target diferente da rede online para separar DQN de Double DQN
+    rng = np.random.default_rng(1)
+    agent.target_model.set_weights([w + rng.normal(0, 0.1, w.shape).astype(w.dtype)
+                                    for w in agent.model.get_weights()])
+    return agent
+
+
+def _batch():
+    """ Minibatch montado à mão: máscaras parciais, uma linha sem ações legais e um terminal. """
+    rng = np.random.default_rng(0)
+    states = rng.random((6,) + STATE_SHAPE).astype(np.float32)
+    next_states = rng.random((6,) + STATE_SHAPE).astype(np.float32)
+    actions = np.array([0, 3, 7, 1, 5, 2], dtype=np.int32)
+    rewards = np.array([1.0, -2.0, 1.5, -10.0, 2.0, 0.5], dtype=np.float32)
+    dones = np.array([0, 0, 0, 1, 0, 0], dtype=np.float32)
+    next_masks = np.array([
+        [1, 0, 0, 0, 0, 0, 0, 0],
+        [0, 1, 1, 0, 0, 0, 0, 0],
+        [1, 1, 1, 1, 1, 1, 1, 1],
+        [0, 0, 1, 0, 0, 0, 0, 1],
+        [0, 0, 0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 0, 1, 0, 1, 0],
+    ], dtype=bool)
+    return states, actions, rewards, next_states, dones, next_masks
+
+
+def _expected_loss(agent, batch):
+    states, actions, rewards, next_states, dones, next_masks = batch
+    q = agent.model(states).numpy()
+    next_target = agent.target_model(next_states).numpy()
+    next_online = agent.model(next_states).numpy()
+
+    next_values = np.zeros(len(actions), dtype=np.float32)
+    for i, mask in enumerate(next_masks):
+        legal = np.flatnonzero(mask)
+        if len(legal) == 0:
+            continue
+        if agent.double_dqn:
+            next_values[i] = next_target[i, legal[np.argmax(next_online[i, legal])]]
+        else:
+            next_values[i] = next_target[i, legal].max()
+
+    td_targets = rewards + GAMMA * next_values * (1.0 - dones)
+    errors = td_targets - q[np.arange(len(actions)), actions]
+    # Os demais alvos são os próprios Q-valores: só a ação tomada contribui para a MSE
+    return np.sum(errors ** 2) / q.size
+
+
+@pytest.mark.parametrize('double_dqn', [False, True])
+def test_td_targets_use_legal_next_actions(double_dqn):
+    agent = _agent(double_dqn)
+    batch = _batch()
+    expected = _expected_loss(agent, batch)
+    loss = float(agent.train_on_batch(batch))
+    assert loss == pytest.approx(expected, rel=1e-5)
+
+
+@pytest.mark.parametrize('double_dqn', [False, True])
+def test_masking_changes_the_target(double_dqn):
+    """ Com a ação de maior Q-valor fora da máscara, o agente deve usar a melhor ação legal. """
+    agent = _agent(double_dqn)
+    states, actions, rewards, next_states, dones, _ = _batch()
+    # Ação que o alvo escolheria sem máscara: máximo da target (DQN) ou da online (Double DQN)
+    greedy_net = agent.model if double_dqn else agent.target_model
+    greedy = greedy_net(next_states).numpy().argmax(axis=1)
+    next_masks = np.ones((len(actions), 8), dtype=bool)
+    next_masks[np.arange(len(actions)), greedy] = False
+    dones = np.zeros_like(dones)
+
+    masked = (states, actions, rewards, next_states, dones, next_masks)
+    unmasked = (states, actions, rewards, next_states, dones, np.ones_like(next_masks))
+    expected = _expected_loss(agent, masked)
+    assert expected != pytest.approx(_expected_loss(agent, unmasked), rel=1e-3)
+
+    loss = float(agent.train_on_batch(masked))
+    assert loss == pytest.approx(expected, rel=1e-5)
+
+
+def test_predict_fn_matches_model_predict():
+    agent = _agent(double_dqn=False)
+    states, *_ = _batch()
+    expected = agent.model.predict(states, verbose=0)
+
+    np.testing.assert_allclose(agent._predict_fn(states).numpy(), expected, rtol=1e-5, atol=1e-6)
+    np.testing.assert_allclose(agent.q_values(states), expected, rtol=1e-5, atol=1e-6)
+    # Estado único e batch de tamanho diferente reutilizam a mesma assinatura
+    np.testing.assert_allclose(agent.q_values(states[0]), expected[0], rtol=1e-5, atol=1e-6)
+    np.testing.assert_allclose(agent.q_values(states[:3]), expected[:3], rtol=1e-5, atol=1e-6)
+    assert agent._predict_fn.experimental_get_tracing_count() == 1
+
+    mask = np.array([0, 1, 0, 0, 1, 0, 1, 0], dtype=bool)
+    masked = agent.q_values(states[0], mask)
+    assert np.isneginf(masked[~mask]).all()
+    agent.epsilon = 0.0
+    assert agent.act(states[0], mask) == np.flatnonzero(mask)[np.argmax(expected[0][mask])]
+
+
+def test_act_batch_is_greedy_and_respects_the_mask():
+    agent = _agent(double_dqn=False)
+    rng = np.random.default_rng(2)
+    states = rng.random((64,) + STATE_SHAPE).astype(np.float32)
+    q = agent.model(states).numpy()
+    greedy = q.argmax(axis=1)
+    masks = rng.random((64, 8)) < 0.5
+    masks[np.arange(64), (greedy + 1) % 8] = True
+    masks[np.arange(64), greedy] = False  # O argmax sem máscara é sempre ilegal
+
+    expected = np.argmax(np.where(masks, q, -np.inf), axis=1)
+    np.testing.assert_array_equal(agent.act_batch(states, masks, epsilon=0.0), expected)
+    agent.epsilon = 0.0
+    np.testing.assert_array_equal(agent.act_batch(states, masks), expected)
+    assert [agent.act(s, m) for s, m in zip(states[:8], masks[:8])] == list(expected[:8])
+
+    # Exploração total: ações aleatórias, mas sempre legais
+    np.random.seed(0)
+    for epsilon in (0.5, 1.0):
+        actions = agent.act_batch(states, masks, epsilon=epsilon)
+        assert masks[np.arange(64), actions].all()
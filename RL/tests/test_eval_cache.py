@@ -0,0 +1,103 @@
+import os
+import shutil
+
+import numpy as np
+import pytest
+
+import evaluation
+from eval_cache import EvalCache, file_sha256, protocol_key
+from evaluation import evaluate_checkpoints, start_squares
+
+BOARD_SIZE = 5
+
+
+@pytest.fixture
+def models(tmp_path, write_model):
+    models_dir = tmp_path / 'models'
+    models_dir.mkdir()
+    return [write_model(str(models_dir), episode, seed) for seed, episode in enumerate((100, 200))]
+
+
+def _no_play(task):
+    raise AssertionError(f"{task['model_path']} deveria vir do cache")
+
+
+def test_cache_hit_returns_same_result(models, tmp_path, monkeypatch):
+    cache_path = str(tmp_path / 'c.sqlite')
+    first = evaluate_checkpoints(models, BOARD_SIZE, workers=1, cache_path=cache_path)
+
+    monkeypatch.setattr(evaluation, '_evaluate_task', _no_play)
+    # epsilon=0 (int) e 0.0 compartilham a mesma chave
+    second = evaluate_checkpoints(models, BOARD_SIZE, epsilon=0, workers=1, cache_path=cache_path)
+    assert second == first
+
+
+def test_cache_is_keyed_by_content(models, tmp_path, monkeypatch):
+    cache_path = str(tmp_path / 'c.sqlite')
+    first = evaluate_checkpoints(models[:1], BOARD_SIZE, workers=1, cache_path=cache_path)[0]
+
+    # Mesmo conteúdo com outro nome: o resultado vem do cache
+    copy = os.path.join(os.path.dirname(models[0]), 'renamed.weights.h5')
+    shutil.copy(models[0], copy)
+    shutil.copy(models[0][:-len('.weights.h5')] + '.npz', copy[:-len('.weights.h5')] + '.npz')
+    monkeypatch.setattr(evaluation, '_evaluate_task', _no_play)
+    renamed = evaluate_checkpoints([copy], BOARD_SIZE, workers=1, cache_path=cache_path)[0]
+    assert renamed['games'] == first['games']
+
+    # Outro protocolo não reaproveita a entrada
+    with pytest.raises(AssertionError):
+        evaluate_checkpoints(models[:1], BOARD_SIZE, start_positions='center', workers=1, cache_path=cache_path)
+
+
+def test_stale_npz_result_is_not_reused(models, tmp_path, write_model):
+    cache_path = str(tmp_path / 'c.sqlite')
+    npz_path = models[0][:-len('.weights.h5')] + '.npz'
+    stale_npz = open(npz_path, 'rb').read()
+    stale = evaluate_checkpoints(models[:1], BOARD_SIZE, workers=1, cache_path=cache_path)[0]
+
+    # Um novo treino sobrescreve o .h5 (outros pesos) e deixa o .npz antigo no lugar
+    write_model(os.path.dirname(models[0]), 100, seed=42)
+    fresh = evaluate_checkpoints(models[:1], BOARD_SIZE, workers=1, cache_path=None)[0]
+    assert fresh['games'] != stale['games']
+    with open(npz_path, 'wb') as f:
+        f.write(stale_npz)
+
+    result = evaluate_checkpoints(models[:1], BOARD_SIZE, workers=1, cache_path=cache_path)[0]
+    assert evaluation.policy_source(models[0]) == models[0]
+    assert result['games'] == fresh['games']
+
+
+def test_seeded_stochastic_results_are_cached(models, tmp_path, monkeypatch):
+    cache_path = str(tmp_path / 'c.sqlite')
+    kwargs = dict(start_positions='center', games_per_start=8, epsilon=0.3, workers=1, seed=7)
+    first = evaluate_checkpoints(models, BOARD_SIZE, cache_path=None, **kwargs)
+    # A semente de cada modelo vem do conteúdo, não da posição na lista
+    reordered = evaluate_checkpoints(models[::-1], BOARD_SIZE, cache_path=cache_path, **kwargs)
+    assert reordered[::-1] == first
+
+    monkeypatch.setattr(evaluation, '_evaluate_task', _no_play)
+    assert evaluate_checkpoints(models, BOARD_SIZE, cache_path=cache_path, **kwargs) == first
+
+    # Sem seed, avaliações estocásticas não usam o cache
+    with pytest.raises(AssertionError):
+        evaluate_checkpoints(models, BOARD_SIZE, cache_path=cache_path, **dict(kwargs, seed=None))
+
+
+def test_protocol_key_normalizes_numbers():
+    starts = start_squares(BOARD_SIZE, 'center')
+    numpy_starts = [((np.int64(r), np.int64(c)), np.int64(w)) for (r, c), w in starts]
+    assert protocol_key(5, starts, 1, 0, 100, None) == protocol_key(np.int64(5), numpy_starts, 1, 0.0,
+                                                                      np.int64(100), None)
+    assert protocol_key(5, starts, 1, 0.0, None, None) != protocol_key(5, starts, 2, 0.0, None, None)
+
+
+def test_eval_cache_round_trip(models, tmp_path):
+    cache = EvalCache(str(tmp_path / 'c.sqlite'))
+    sha = file_sha256(models[0])
+    params = protocol_key(5, start_squares(5, 'center'), 1, 0.0, None, None)
+    games = [{'start': (2, 2), 'visited': 7, 'steps': 6, 'win': False, 'count': 1}]
+
+    assert cache.get(sha, 5, params) is None
+    cache.put(sha, 5, params, models[0], games)
+    assert cache.get(sha, 5, params) == games
+    cache.close()
@@ -0,0 +1,108 @@
+import numpy as np
+import pytest
+
+from evaluation import evaluate_checkpoints, list_checkpoints, start_squares
+from knight_env import KnightTourEnv
+from numpy_policy import NumpyPolicy
+
+BOARD_SIZE = 5
+
+
+@pytest.fixture
+def models(tmp_path, write_model):
+    return [write_model(str(tmp_path), episode, seed) for seed, episode in enumerate((100, 200, 300))]
+
+
+def _serial_game(policy, start):
+    """ Partida gulosa de referência no KnightTourEnv, um passo por vez. """
+    env = KnightTourEnv(board_size=BOARD_SIZE)
+    board = np.zeros((BOARD_SIZE, BOARD_SIZE), dtype=np.int8)
+    board[start] = 2
+    state = env.set_state(board)
+    steps, done, info = 0, not env.action_mask.any(), {}
+    while not done:
+        state, _, done, info = env.step(policy.act(state, env.action_mask))
+        steps += 1
+    return env.visited_count, steps, info.get('status') == 'win'
+
+
+def test_list_checkpoints_sorted_by_episode(models, tmp_path):
+    found = list_checkpoints(str(tmp_path))
+    assert [model['episode'] for model in found] == [100, 200, 300]
+    assert [model['path'] for model in found] == models
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_matches_serial_play(models, workers):
+    results = evaluate_checkpoints(models, BOARD_SIZE, start_positions='all', workers=workers, cache_path=None)
+
+    assert [result['model_path'] for result in results] == models
+    for path, result in zip(models, results):
+        policy = NumpyPolicy.load(path[:-len('.weights.h5')] + '.npz')
+        assert result['total_tests'] == BOARD_SIZE * BOARD_SIZE
+        for game in result['games']:
+            assert (game['visited'], game['steps'], game['win']) == _serial_game(policy, game['start'])
+        assert result['wins'] == sum(game['win'] for game in result['games'])
+        assert result['avg_score'] == pytest.approx(np.mean([game['visited'] for game in result['games']]))
+
+
+@pytest.mark.parametrize('board_size', [5, 6, 8])
+def test_start_sets_cover_the_board(board_size):
+    squares = board_size * board_size
+    assert start_squares(board_size, 'center') == [((board_size // 2, board_size // 2), 1)]
+    assert sorted(pos for pos, _ in start_squares(board_size, 'all')) == \
+        [(r, c) for r in range(board_size) for c in range(board_size)]
+    # Uma casa por órbita, com pesos somando N²
+    symmetric = start_squares(board_size, 'symmetric')
+    assert sum(weight for _, weight in symmetric) == squares
+    assert len(symmetric) == {5: 6, 6: 6, 8: 10}[board_size]
+    with pytest.raises(ValueError):
+        start_squares(board_size, 'corners')
+
+
+def test_deterministic_games_are_played_once(models):
+    result = evaluate_checkpoints(models[:1], BOARD_SIZE, start_positions='all', games_per_start=4,
+                                  workers=1, cache_path=None)[0]
+    single = evaluate_checkpoints(models[:1], BOARD_SIZE, start_positions='all', workers=1, cache_path=None)[0]
+
+    assert result['games_played'] == BOARD_SIZE * BOARD_SIZE
+    assert result['total_tests'] == 4 * BOARD_SIZE * BOARD_SIZE
+    assert result['wins'] == 4 * single['wins']
+    assert result['win_rate'] == single['win_rate']
+    assert len(result['scores']) == result['total_tests']
+    assert all(entry['games'] == 4 for entry in result['per_start'])
+
+
+def test_symmetric_starts_are_weighted(models):
+    result = evaluate_checkpoints(models[:1], BOARD_SIZE, start_positions='symmetric', workers=1,
+                                  cache_path=None)[0]
+    assert result['games_played'] == len(start_squares(BOARD_SIZE, 'symmetric'))
+    assert result['total_tests'] == BOARD_SIZE * BOARD_SIZE
+
+
+def test_stochastic_games_are_repeated(models):
+    result = evaluate_checkpoints(models[:1], BOARD_SIZE, start_positions='center', games_per_start=10,
+                                  epsilon=0.5, workers=1, seed=0, cache_path=None)[0]
+    assert result['games_played'] == result['total_tests'] == 10
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_failing_models_are_isolated(models, tmp_path, workers):
+    corrupt = str(tmp_path / 'knight_tour_dqn_b5_e400.weights.h5')
+    with open(corrupt, 'wb') as f:
+        f.write(b'not a weights file')
+    missing = str(tmp_path / 'knight_tour_dqn_b5_e500.weights.h5')
+    paths = [models[0], corrupt, missing, models[1]]
+
+    results = evaluate_checkpoints(paths, BOARD_SIZE, start_positions='center', workers=workers,
+                                   cache_path=str(tmp_path / 'cache.sqlite'), errors='return')
+
+    assert [result['model_path'] for result in results] == paths
+    assert [result['episode'] for result in results] == [100, 400, 500, 200]
+    assert 'error' in results[1] and 'error' in results[2]
+    assert 'FileNotFoundError' in results[2]['error']
+    for good in (results[0], results[3]):
+        assert 'error' not in good and good['total_tests'] == 1
+
+    with pytest.raises(FileNotFoundError):
+        evaluate_checkpoints(paths, BOARD_SIZE, start_positions='center', workers=workers, cache_path=None)
@@ -0,0 +1,60 @@
+import time
+
+import pytest
+
+from instrumentation import PhaseTimers, flatten_report, format_report
+
+
+def test_disabled_timers_record_nothing():
+    timers = PhaseTimers(enabled=False)
+    with timers.phase('env_step'):
+        time.sleep(0.001)
+    with timers.phase('train_step'):
+        pass
+    timers.incr('env_steps', 5)
+
+    # O mesmo context manager vazio para qualquer fase
+    assert timers.phase('env_step') is timers.phase('sample')
+    report = timers.report()
+    assert report['phases'] == {}
+    assert report['rates'] == {}
+
+
+def test_enabled_timers_record_per_phase():
+    timers = PhaseTimers(enabled=True)
+    for _ in range(3):
+        with timers.phase('env_step'):
+            time.sleep(0.002)
+    with timers.phase('train_step'):
+        time.sleep(0.01)
+    timers.incr('env_steps', 3)
+    timers.incr('gradient_steps')
+
+    report = timers.report()
+    phases = report['phases']
+    assert set(phases) == {'env_step', 'train_step'}
+    assert phases['env_step']['count'] == 3
+    assert phases['train_step']['count'] == 1
+    assert phases['env_step']['mean_ms'] >= 2.0
+    assert phases['train_step']['total_s'] >= 0.01
+    assert phases['env_step']['p50_ms'] <= phases['env_step']['p99_ms']
+    assert 0 < phases['train_step']['share'] <= 1
+    assert report['rates']['env_steps'] == pytest.approx(3 * report['rates']['gradient_steps'])
+
+    flat = flatten_report(report)
+    assert flat['env_step.count'] == 3 and 'env_steps_per_sec' in flat
+    assert format_report(report)[0].startswith('⏱️  Fases')
+
+    # Nova janela: nada da anterior é reportado
+    assert timers.report()['phases'] == {}
+    with timers.phase('env_step'):
+        pass
+    assert timers.report()['phases']['env_step']['count'] == 1
+
+
+def test_exceptions_still_record_the_phase():
+    timers = PhaseTimers()
+    with pytest.raises(ValueError):
+        with timers.phase('sample'):
+            raise ValueError
+    assert timers.report()['phases']['sample']['count'] == 1
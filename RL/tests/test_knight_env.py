@@ -0,0 +1,124 @@
+import numpy as np
+import pytest
+
+from bitboard import KNIGHT_MOVES
+from knight_env import KnightTourEnv
+
+BOARD_SIZE = 5
+
+
+def _reference_observation(env):
+    """ Observação recalculada do zero a partir de board/current_pos. """
+    obs = np.zeros((env.board_size, env.board_size, 3), dtype=np.float32)
+    obs[env.current_pos + (0,)] = 1.0
+    obs[:, :, 1] = env.board == 1
+    for dr, dc in KNIGHT_MOVES:
+        r, c = env.current_pos[0] + dr, env.current_pos[1] + dc
+        if 0 <= r < env.board_size and 0 <= c < env.board_size and env.board[r, c] == 0:
+            obs[r, c, 2] = 1.0
+    return obs
+
+
+@pytest.mark.parametrize('board_size', [5, 6])
+def test_incremental_observation_matches_rebuild(board_size):
+    """ Ações aleatórias cobrem movimentos válidos, inválidos e finais de episódio. """
+    rng = np.random.default_rng(board_size)
+    env = KnightTourEnv(board_size=board_size)
+    obs = env.reset()
+    episodes = 0
+    for _ in range(500):
+        np.testing.assert_array_equal(obs, _reference_observation(env))
+        obs, _, done, _ = env.step(int(rng.integers(0, 8)))
+        if done:
+            np.testing.assert_array_equal(obs, _reference_observation(env))
+            episodes += 1
+            obs = env.reset()
+    assert episodes > 0
+
+
+def test_invalid_move_leaves_state_unchanged():
+    env = KnightTourEnv(board_size=BOARD_SIZE)
+    env.step(0)  # (2, 2) -> (0, 1)
+    before = env._get_observation()
+    board, path = env.board.copy(), list(env.path)
+
+    # (0, 1) + (-2, -1) sai do tabuleiro; depois, voltar ao centro visitado
+    for action in (0, 7):
+        obs, reward, done, info = env.step(action)
+        assert reward == -2.0
+        assert not done
+        assert info['status'] == 'invalid_move'
+        np.testing.assert_array_equal(obs, before)
+        np.testing.assert_array_equal(env.board, board)
+        assert env.path == path and env.visited_count == 2
+
+
+def test_win_and_stuck_observations():
+    env = KnightTourEnv(board_size=BOARD_SIZE)
+
+    # Última casa livre a um movimento do cavalo: vitória
+    board = np.ones((BOARD_SIZE, BOARD_SIZE), dtype=np.int8)
+    board[0, 0] = 2
+    board[1, 2] = 0
+    env.set_state(board)
+    obs, reward, done, info = env.step(KNIGHT_MOVES.index((1, 2)))
+    assert done and info['status'] == 'win'
+    assert reward == 0.0
+    assert env.visited_count == BOARD_SIZE * BOARD_SIZE
+    np.testing.assert_array_equal(obs, _reference_observation(env))
+    assert not obs[:, :, 2].any()
+
+    # Casa livre sem saída depois do movimento: preso
+    board[1, 2] = 0
+    board[4, 4] = 0
+    env.set_state(board)
+    obs, reward, done, info = env.step(KNIGHT_MOVES.index((1, 2)))
+    assert done and info['status'] == 'stuck'
+    assert reward == -10.0
+    np.testing.assert_array_equal(obs, _reference_observation(env))
+
+
+def test_observation_view_without_copies():
+    env = KnightTourEnv(board_size=BOARD_SIZE, copy_observations=False)
+    obs = env.reset()
+    assert not obs.flags.writeable
+    env.step(0)
+    # A visão acompanha o buffer interno
+    np.testing.assert_array_equal(obs, _reference_observation(env))
+
+
+def _legal_actions(env):
+    """ Máscara de referência: destino dentro do tabuleiro e ainda livre. """
+    mask = np.zeros(len(KNIGHT_MOVES), dtype=bool)
+    for action, (dr, dc) in enumerate(KNIGHT_MOVES):
+        r, c = env.current_pos[0] + dr, env.current_pos[1] + dc
+        mask[action] = 0 <= r < env.board_size and 0 <= c < env.board_size and env.board[r, c] == 0
+    return mask
+
+
+@pytest.mark.parametrize('board_size', [5, 8])
+def test_info_action_mask_matches_legal_moves(board_size):
+    rng = np.random.default_rng(0)
+    env = KnightTourEnv(board_size=board_size)
+    _, info = env.reset(return_info=True)
+    for _ in range(300):
+        np.testing.assert_array_equal(info['action_mask'], _legal_actions(env))
+        assert info['action_mask'] is env.action_mask
+        assert not info['action_mask'].flags.writeable
+        np.testing.assert_array_equal(env._get_valid_moves_mask(), info['action_mask'])
+
+        _, _, done, info = env.step(int(rng.integers(0, 8)))
+        np.testing.assert_array_equal(info['action_mask'], _legal_actions(env))
+        if done:
+            _, info = env.reset(return_info=True)
+
+
+def test_set_state_refreshes_action_mask():
+    env = KnightTourEnv(board_size=BOARD_SIZE)
+    board = np.zeros((BOARD_SIZE, BOARD_SIZE), dtype=np.int8)
+    board[0, 0] = 2
+    board[1, 2] = 1
+    env.set_state(board)
+    expected = np.zeros(len(KNIGHT_MOVES), dtype=bool)
+    expected[KNIGHT_MOVES.index((2, 1))] = True
+    np.testing.assert_array_equal(env.action_mask, expected)
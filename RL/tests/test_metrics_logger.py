@@ -0,0 +1,77 @@
+import csv
+import os
+
+import numpy as np
+
+from metrics_logger import (LOG_COLUMNS, TrainingLogger, columns_dir_for, load_metrics,
+                            load_training_log)
+
+
+def _log_episodes(logger, episodes):
+    for episode in episodes:
+        logger.log(episode, episode % 7, 10 + episode % 5, episode * 0.5, episode % 3,
+                   1.0 / episode, int(episode % 4 == 0))
+
+
+def _read_csv(path):
+    with open(path, newline='') as f:
+        return list(csv.DictReader(f))
+
+
+def test_csv_and_columns_agree(tmp_path):
+    csv_path = str(tmp_path / 'training_log.csv')
+    logger = TrainingLogger(csv_path, flush_every=4, flush_interval=3600)
+    _log_episodes(logger, range(1, 11))
+    logger.close()
+
+    rows = _read_csv(csv_path)
+    columns = load_training_log(csv_path)
+    assert [name for name, _ in LOG_COLUMNS] == list(rows[0])
+    assert len(rows) == 10
+    # O CSV arredonda Avg_Reward/Epsilon; as colunas guardam o valor completo
+    for name, _ in LOG_COLUMNS:
+        np.testing.assert_allclose(columns[name], [float(row[name]) for row in rows], atol=1e-4)
+
+
+def test_existing_csv_is_converted(tmp_path):
+    csv_path = str(tmp_path / 'training_log.csv')
+    logger = TrainingLogger(csv_path, flush_every=1)
+    _log_episodes(logger, range(1, 4))
+    logger.close()
+
+    # Sem o diretório colunar, o próximo logger reconstrói as colunas a partir do CSV
+    for name in os.listdir(columns_dir_for(csv_path)):
+        os.remove(os.path.join(columns_dir_for(csv_path), name))
+    os.rmdir(columns_dir_for(csv_path))
+    TrainingLogger(csv_path).close()
+
+    np.testing.assert_array_equal(load_training_log(csv_path)['Episode'], [1, 2, 3])
+
+
+def test_truncate_on_resume(tmp_path):
+    csv_path = str(tmp_path / 'training_log.csv')
+    logger = TrainingLogger(csv_path, flush_every=100, flush_interval=3600)
+    _log_episodes(logger, range(1, 6))
+    logger.log_metrics(5, {'train_step_ms': 1.0})
+    state = logger.state()
+
+    # Episódios depois do checkpoint, parte ainda no buffer
+    _log_episodes(logger, range(6, 9))
+    logger.log_metrics(8, {'train_step_ms': 2.0})
+    logger.flush()
+    _log_episodes(logger, range(9, 11))
+    logger.close()
+
+    # Ao retomar do checkpoint, tudo depois de state() é descartado e os episódios se repetem
+    resumed = TrainingLogger(csv_path, flush_every=100, flush_interval=3600)
+    resumed.truncate(state)
+    _log_episodes(resumed, range(6, 8))
+    resumed.close()
+
+    expected = [1, 2, 3, 4, 5, 6, 7]
+    assert [int(row['Episode']) for row in _read_csv(csv_path)] == expected
+    columns = load_training_log(csv_path)
+    for name, _ in LOG_COLUMNS:
+        assert len(columns[name]) == len(expected)
+    np.testing.assert_array_equal(columns['Episode'], expected)
+    assert [m['episode'] for m in load_metrics(csv_path)] == [5]
@@ -0,0 +1,105 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                'scripts', 'utils'))
+
+import pytest
+
+pytest.importorskip('pandas')
+pytest.importorskip('matplotlib')
+
+from metrics_logger import TrainingLogger
+from monitor_training import LogTailer, TrainingStats
+
+
+def _log_episodes(logger, episodes):
+    for episode in episodes:
+        logger.log(episode, episode % 7, 10 + episode % 5, episode * 0.5, episode % 3,
+                   1.0 / episode, int(episode % 4 == 0))
+    logger.flush()
+
+
+def _episodes(rows):
+    return [int(row['episode']) for row in rows]
+
+
+def test_append_reads_only_new_complete_rows(tmp_path):
+    csv_path = str(tmp_path / 'training_log.csv')
+    logger = TrainingLogger(csv_path, flush_every=1000, flush_interval=3600)
+    tailer = LogTailer(csv_path)
+    assert tailer.read_new_rows() == []
+
+    _log_episodes(logger, range(1, 4))
+    rows = tailer.read_new_rows()
+    assert _episodes(rows) == [1, 2, 3]
+    assert rows[0]['visited_count'] == '11' and 'reward' in rows[0]
+
+    # Linha ainda sendo escrita só aparece quando completa
+    with open(csv_path, 'a') as f:
+        f.write('4,4,14,2.00,1,')
+    assert tailer.read_new_rows() == []
+    with open(csv_path, 'a') as f:
+        f.write('0.2500,1\n')
+    assert _episodes(tailer.read_new_rows()) == [4]
+    assert not tailer.rotated
+
+
+def test_rotation_to_new_file_restarts_from_header(tmp_path):
+    csv_path = str(tmp_path / 'training_log.csv')
+    logger = TrainingLogger(csv_path, flush_every=1000, flush_interval=3600)
+    _log_episodes(logger, range(1, 6))
+    tailer = LogTailer(csv_path)
+    assert _episodes(tailer.read_new_rows()) == [1, 2, 3, 4, 5]
+
+    os.rename(csv_path, csv_path + '.old')
+    with open(csv_path, 'w') as f:
+        f.write('Episode,Score,Max_Visited,Avg_Reward,Invalid_Moves,Epsilon,Win\n')
+        f.write('1,0,9,0.50,0,1.0000,0\n')
+
+    assert _episodes(tailer.read_new_rows()) == [1]
+    assert tailer.rotated
+
+
+def test_truncate_then_regrow_past_old_offset_is_detected(tmp_path):
+    csv_path = str(tmp_path / 'training_log.csv')
+    logger = TrainingLogger(csv_path, flush_every=1000, flush_interval=3600)
+    _log_episodes(logger, range(1, 11))
+    state = logger.state()
+    _log_episodes(logger, range(11, 21))
+
+    tailer = LogTailer(csv_path)
+    assert _episodes(tailer.read_new_rows()) == list(range(1, 21))
+
+    # --resume: trunca no checkpoint e repete os episódios com outros valores,
+    # crescendo além do offset antigo antes da próxima leitura
+    logger.truncate(state)
+    for episode in range(11, 31):
+        logger.log(episode, 1, 25, 100.0, 0, 0.05, 1)
+    logger.flush()
+
+    rows = tailer.read_new_rows()
+    assert tailer.rotated
+    assert _episodes(rows) == list(range(1, 31))
+    assert all(row['win'] == '1' for row in rows[10:])
+    assert tailer.skipped == 0
+
+
+def test_malformed_rows_are_skipped(tmp_path):
+    csv_path = str(tmp_path / 'training_log.csv')
+    with open(csv_path, 'w') as f:
+        f.write('Episode,Score,Max_Visited,Avg_Reward,Invalid_Moves,Epsilon,Win\n')
+        f.write('1,0,9,0.50,0,1.0000,0\n')
+        f.write('.50,0,1.0000,0\n')
+        f.write('2,0,abc,0.50,0,1.0000,1\n')
+        f.write('3,0,12,0.75,0,0.9000,1\n')
+
+    tailer = LogTailer(csv_path)
+    stats = TrainingStats()
+    stats.update_rows(tailer.read_new_rows())
+
+    assert tailer.skipped == 1
+    assert stats.skipped == 1
+    assert stats.episodes == 2
+    assert stats.total_wins == 1
+    assert stats.last['episode'] == 3
@@ -0,0 +1,64 @@
+import os
+
+import numpy as np
+import pytest
+
+from numpy_policy import NumpyPolicy, fresh_npz_path, load_policy, npz_path_for, save_weights_npz
+
+tf = pytest.importorskip('tensorflow')
+
+from dqn_agent import DQNAgent, InferencePolicy  # noqa: E402
+
+STATE_SHAPE = (5, 5, 3)
+
+
+def _saved_agent(path, seed):
+    tf.keras.utils.set_random_seed(seed)
+    agent = DQNAgent(STATE_SHAPE, 8)
+    agent.save(path)
+    return agent
+
+
+def test_numpy_forward_matches_keras(tmp_path):
+    path = str(tmp_path / 'knight_tour_dqn_b5_e1.weights.h5')
+    agent = _saved_agent(path, seed=0)
+    policy = NumpyPolicy.load(agent.export_numpy(weights_path=path))
+
+    states = np.random.default_rng(0).random((32,) + STATE_SHAPE).astype(np.float32)
+    expected = agent.model.predict(states, verbose=0)
+    np.testing.assert_allclose(policy.q_values(states), expected, rtol=1e-5, atol=1e-5)
+
+
+def test_stale_npz_is_not_served(tmp_path):
+    path = str(tmp_path / 'knight_tour_dqn_b5_final.weights.h5')
+    _saved_agent(path, seed=0).export_numpy(weights_path=path)
+    assert fresh_npz_path(path) == npz_path_for(path)
+    assert isinstance(load_policy(path, STATE_SHAPE, 8), NumpyPolicy)
+
+    # Um novo treino sobrescreve o .h5; o .npz antigo não pode mais ser usado
+    new_agent = _saved_agent(path, seed=1)
+    assert fresh_npz_path(path) is None
+    policy = load_policy(path, STATE_SHAPE, 8)
+    assert isinstance(policy, InferencePolicy)
+    state = np.random.default_rng(1).random(STATE_SHAPE).astype(np.float32)
+    np.testing.assert_allclose(policy.q_values(state), new_agent.q_values(state), rtol=1e-6)
+
+
+def test_legacy_npz_uses_modification_time(tmp_path):
+    path = str(tmp_path / 'knight_tour_dqn_b5_e1.weights.h5')
+    agent = _saved_agent(path, seed=0)
+    npz_path = npz_path_for(path)
+    # Exportação sem o sha256 da origem
+    save_weights_npz(agent.model.get_weights(), npz_path, STATE_SHAPE)
+    assert fresh_npz_path(path) == npz_path
+
+    mtime = os.path.getmtime(path)
+    os.utime(npz_path, (mtime - 10, mtime - 10))
+    assert fresh_npz_path(path) is None
+
+
+def test_npz_without_weights_file(tmp_path):
+    path = str(tmp_path / 'knight_tour_dqn_b5_e1.weights.h5')
+    _saved_agent(path, seed=0).export_numpy(weights_path=path)
+    os.remove(path)
+    assert isinstance(load_policy(path, STATE_SHAPE, 8), NumpyPolicy)
@@ -0,0 +1,70 @@
+import itertools
+import time
+
+import numpy as np
+import pytest
+
+from prefetch import BatchPrefetcher
+from replay_buffer import ReplayBuffer
+
+
+def _wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condição não atingida a tempo"
+        time.sleep(0.01)
+
+
+def test_returns_batches_in_order_with_bounded_queue():
+    counter = itertools.count()
+    prefetcher = BatchPrefetcher(lambda: next(counter), depth=3).start()
+    try:
+        # Sem consumo o produtor enche a fila e para
+        _wait_until(lambda: prefetcher.stats()['queue_size'] == 3)
+        time.sleep(0.2)
+        assert prefetcher.stats()['queue_size'] == 3
+
+        assert [prefetcher.get() for _ in range(10)] == list(range(10))
+        assert prefetcher.stats()['batches'] == 10
+    finally:
+        prefetcher.stop()
+    assert not prefetcher._thread.is_alive()
+    assert prefetcher.producer_stall > 0
+
+
+def test_replay_batches_through_the_queue(make_transitions):
+    buffer = ReplayBuffer(capacity=100, state_shape=(5, 5, 3), seed=0)
+    for transition in make_transitions(50):
+        buffer.add(*transition)
+
+    prefetcher = BatchPrefetcher(lambda: buffer.sample(16), depth=2).start()
+    try:
+        for _ in range(5):
+            states, actions, rewards, next_states, dones, next_masks = prefetcher.get()
+            assert states.shape == next_states.shape == (16, 5, 5, 3)
+            assert actions.shape == rewards.shape == dones.shape == (16,)
+            assert next_masks.shape == (16, 8) and next_masks.dtype == np.bool_
+    finally:
+        prefetcher.stop()
+    assert not prefetcher._thread.is_alive()
+
+
+def test_stop_with_a_busy_producer():
+    prefetcher = BatchPrefetcher(lambda: time.sleep(0.05) or 'batch', depth=1).start()
+    assert prefetcher.get() == 'batch'
+    start = time.perf_counter()
+    prefetcher.stop()
+    assert time.perf_counter() - start < 1.0
+    assert not prefetcher._thread.is_alive()
+
+
+def test_producer_error_is_raised_by_get():
+    def failing():
+        raise ValueError("memória vazia")
+
+    prefetcher = BatchPrefetcher(failing, depth=2).start()
+    with pytest.raises(RuntimeError) as info:
+        prefetcher.get()
+    assert isinstance(info.value.__cause__, ValueError)
+    prefetcher.stop()
+    assert not prefetcher._thread.is_alive()
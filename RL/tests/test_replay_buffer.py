@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from replay_buffer import CompactReplayBuffer, ReplayBuffer
+
+
+def test_ring_buffer_overwrites_oldest(make_transitions):
+    buffer = ReplayBuffer(capacity=5, state_shape=(5, 5, 3))
+    transitions = make_transitions(8)
+    for transition in transitions:
+        buffer.add(*transition)
+
+    assert len(buffer) == 5
+    assert buffer.head == 8 % 5
+    # As posições 0-2 foram sobrescritas pelas transições 5-7
+    expected = [transitions[i] for i in (5, 6, 7, 3, 4)]
+    np.testing.assert_array_equal(buffer.actions, [t[1] for t in expected])
+    np.testing.assert_array_equal(buffer.states, np.array([t[0] for t in expected]))
+
+
+def test_sample_shapes_and_contents(make_transitions):
+    buffer = ReplayBuffer(capacity=100, state_shape=(5, 5, 3), seed=0)
+    transitions = make_transitions(50)
+    for transition in transitions:
+        buffer.add(*transition)
+
+    idx = np.random.default_rng(0).integers(0, len(buffer), size=32)
+    buffer.rng = np.random.default_rng(0)
+    states, actions, rewards, next_states, dones, next_masks = buffer.sample(32)
+
+    assert states.shape == next_states.shape == (32, 5, 5, 3)
+    assert actions.shape == rewards.shape == dones.shape == (32,)
+    assert next_masks.shape == (32, 8)
+    for k, i in enumerate(idx):
+        state, action, reward, next_state, done, next_mask = transitions[i]
+        np.testing.assert_array_equal(states[k], state)
+        np.testing.assert_array_equal(next_states[k], next_state)
+        np.testing.assert_array_equal(next_masks[k], next_mask)
+        assert (actions[k], dones[k]) == (action, done)
+        assert rewards[k] == np.float32(reward)
+
+
+def test_snapshot_restore(make_transitions):
+    buffer = ReplayBuffer(capacity=10, state_shape=(5, 5, 3))
+    for transition in make_transitions(13):
+        buffer.add(*transition)
+
+    arrays, head, size = buffer.snapshot()
+    restored = ReplayBuffer(capacity=10, state_shape=(5, 5, 3))
+    restored.restore(arrays, head, size)
+
+    assert (restored.head, len(restored)) == (buffer.head, len(buffer))
+    for field in ReplayBuffer.FIELDS:
+        np.testing.assert_array_equal(getattr(restored, field), getattr(buffer, field))
+
+
+def test_compact_buffer_matches_dense_buffer(make_transitions):
+    """ A memória bit-packed devolve os mesmos minibatches da memória densa. """
+    transitions = make_transitions(200, seed=1)
+    dense = ReplayBuffer(capacity=128, state_shape=(5, 5, 3), seed=3)
+    compact = CompactReplayBuffer(capacity=128, state_shape=(5, 5, 3), seed=3)
+    for transition in transitions:
+        dense.add(*transition)
+        compact.add(*transition)
+
+    for expected, actual in zip(dense.sample(64), compact.sample(64)):
+        np.testing.assert_array_equal(actual, expected)
+
+
+def test_compact_buffer_rejects_large_boards():
+    with pytest.raises(ValueError):
+        CompactReplayBuffer(capacity=10, state_shape=(9, 9, 3))
@@ -0,0 +1,92 @@
+import math
+
+import pytest
+
+from evaluation import (clopper_pearson_interval, evaluate_checkpoints, evaluate_sequential,
+                        sequential_decision, sprt_llr, wilson_interval)
+
+BOARD_SIZE = 5
+
+
+@pytest.mark.parametrize('wins, n, expected', [
+    (0, 10, (0.0, 0.2775)),
+    (3, 10, (0.1078, 0.6032)),
+    (5, 10, (0.2366, 0.7634)),
+    (10, 10, (0.7225, 1.0)),
+])
+def test_wilson_interval(wins, n, expected):
+    assert wilson_interval(wins, n) == pytest.approx(expected, abs=1e-4)
+
+
+@pytest.mark.parametrize('wins, n, expected', [
+    (0, 10, (0.0, 0.3085)),
+    (3, 10, (0.0667, 0.6525)),
+    (5, 10, (0.1871, 0.8129)),
+    (10, 10, (0.6915, 1.0)),
+])
+def test_clopper_pearson_interval(wins, n, expected):
+    assert clopper_pearson_interval(wins, n) == pytest.approx(expected, abs=1e-4)
+
+
+def test_intervals_without_games():
+    assert wilson_interval(0, 0) == (0.0, 1.0)
+    assert clopper_pearson_interval(0, 0) == (0.0, 1.0)
+
+
+def test_sprt_llr():
+    # H1: p = 0.55 contra H0: p = 0.45
+    assert sprt_llr(0, 10, 0.5) == pytest.approx(10 * math.log(0.45 / 0.55))
+    assert sprt_llr(0, 10, 0.5) == pytest.approx(-2.0067, abs=1e-4)
+    assert sprt_llr(10, 10, 0.5) == pytest.approx(2.0067, abs=1e-4)
+    assert sprt_llr(5, 10, 0.5) == pytest.approx(0.0)
+
+
+@pytest.mark.parametrize('method', ['wilson', 'clopper-pearson', 'sprt'])
+def test_sequential_decision(method):
+    assert sequential_decision(0, 100, 0.5, method)[0] == 'below'
+    assert sequential_decision(100, 100, 0.5, method)[0] == 'above'
+    assert sequential_decision(5, 10, 0.5, method)[0] is None
+
+
+def test_early_stop_below_threshold(tmp_path, write_model):
+    model = write_model(str(tmp_path), 100, seed=0)
+    result = evaluate_sequential([model], BOARD_SIZE, threshold=0.99, batch_size=10, min_games=10,
+                                 workers=1, seed=0)[0]
+    assert result['decision'] == 'below'
+    assert not result['exact']
+    assert result['games_used'] < BOARD_SIZE * BOARD_SIZE
+    assert result['interval'][1] < 0.99
+
+
+def test_exact_rate_once_every_start_is_played(tmp_path, write_model):
+    model = write_model(str(tmp_path), 100, seed=0)
+    full = evaluate_checkpoints([model], BOARD_SIZE, start_positions='all', workers=1, cache_path=None)[0]
+    # Limiar igual à taxa real: o teste nunca decide e o sorteio acaba cobrindo todas as casas
+    result = evaluate_sequential([model], BOARD_SIZE, threshold=full['win_rate'], batch_size=50,
+                                 max_games=5000, workers=1, seed=0)[0]
+
+    assert result['exact']
+    assert result['win_rate'] == full['win_rate']
+    assert result['total_tests'] == BOARD_SIZE * BOARD_SIZE
+    assert result['games_played'] == BOARD_SIZE * BOARD_SIZE
+    assert 'games_used' not in result and 'interval' not in result
+
+
+def test_incumbent_threshold_uses_its_start_positions(tmp_path, write_model, monkeypatch):
+    from model_config import model_config
+
+    key = model_config.get_board_size_key(BOARD_SIZE)
+    monkeypatch.setitem(model_config.BEST_MODELS, key,
+                        {**model_config.BEST_MODELS.get(key, {}), 'win_rate': 50.0, 'starting_position': (2, 2)})
+    model = write_model(str(tmp_path), 100, seed=0)
+
+    result = evaluate_sequential([model], BOARD_SIZE, batch_size=10, workers=1, seed=0)[0]
+    assert result['threshold'] == 0.5
+    assert {game['start'] for game in result['games']} == {(2, 2)}
+    assert result['exact'] and result['games_played'] == 1
+
+    with pytest.raises(ValueError):
+        evaluate_sequential([model], BOARD_SIZE, start_positions='all', workers=1)
+    # Com limiar explícito qualquer conjunto de casas é aceito
+    assert evaluate_sequential([model], BOARD_SIZE, threshold=0.5, start_positions='all', batch_size=10,
+                               max_games=10, workers=1, seed=0)[0]['games_played'] > 1
@@ -0,0 +1,112 @@
+import numpy as np
+import pytest
+
+from bitboard import decode_observations, encode_observations, knight_move_table
+from knight_env import KnightTourEnv
+from symmetry import (NUM_SYMMETRIES, SymmetricQCache, action_permutations, augment_batch,
+                      transform_boards)
+
+
+def _random_board(board_size, moves, seed):
+    """ Tabuleiro 2D (0/1/2) depois de alguns movimentos válidos aleatórios. """
+    rng = np.random.default_rng(seed)
+    env = KnightTourEnv(board_size=board_size)
+    for _ in range(moves):
+        valid = np.flatnonzero(env.action_mask)
+        if len(valid) == 0:
+            break
+        env.step(rng.choice(valid))
+    return env.board.copy()
+
+
+class WarnsdorffPolicy:
+    """ Política equivariante: Q(a) = -(saídas livres a partir do destino da ação a). """
+
+    def q_values(self, state):
+        state = np.asarray(state)
+        board_size = state.shape[0]
+        flat = state.reshape(-1, 3)
+        occupied = (flat[:, 0] + flat[:, 1]) > 0
+        table = knight_move_table(board_size)
+        square = int(np.argmax(flat[:, 0]))
+        q = np.full(8, -100.0, dtype=np.float32)
+        for action, target in enumerate(table[square]):
+            if target >= 0:
+                exits = table[target][table[target] >= 0]
+                q[action] = -np.count_nonzero(~occupied[exits])
+        return q
+
+
+def test_action_permutations_are_permutations():
+    perms = action_permutations()
+    assert perms.shape == (NUM_SYMMETRIES, 8)
+    np.testing.assert_array_equal(perms[0], np.arange(8))
+    for t in range(NUM_SYMMETRIES):
+        np.testing.assert_array_equal(np.sort(perms[t]), np.arange(8))
+
+
+@pytest.mark.parametrize('t', range(NUM_SYMMETRIES))
+def test_permuted_action_commutes_with_step(t):
+    """ Passo com a ação a no original == passo com perms[t, a] no tabuleiro transformado. """
+    board_size = 5
+    perms = action_permutations()
+    board = _random_board(board_size, moves=4, seed=t)
+
+    env = KnightTourEnv(board_size=board_size)
+    env.set_state(board)
+    mask = env.action_mask.copy()
+
+    env_t = KnightTourEnv(board_size=board_size)
+    env_t.set_state(transform_boards(board, t))
+    np.testing.assert_array_equal(env_t.action_mask[perms[t]], mask)
+
+    for action in range(8):
+        env.set_state(board)
+        env_t.set_state(transform_boards(board, t))
+        obs, reward, done, _ = env.step(action)
+        obs_t, reward_t, done_t, _ = env_t.step(perms[t][action])
+        np.testing.assert_array_equal(obs_t, transform_boards(obs, t))
+        assert (reward_t, done_t) == (reward, done)
+
+
+def test_augment_batch_keeps_masks_consistent():
+    board_size = 5
+    boards = [_random_board(board_size, moves=3, seed=seed) for seed in range(16)]
+    env = KnightTourEnv(board_size=board_size)
+    states, next_states, actions, next_masks = [], [], [], []
+    for board in boards:
+        states.append(env.set_state(board))
+        action = int(np.flatnonzero(env.action_mask)[0])
+        next_state, _, _, info = env.step(action)
+        actions.append(action)
+        next_states.append(next_state)
+        next_masks.append(info['action_mask'])
+
+    batch = (np.array(states), np.array(actions), np.zeros(16, dtype=np.float32),
+             np.array(next_states), np.zeros(16, dtype=bool), np.array(next_masks))
+    aug_states, aug_actions, _, aug_next_states, _, aug_next_masks = augment_batch(
+        *batch, rng=np.random.default_rng(0))
+
+    # As máscaras permutadas batem com as derivadas dos próximos estados transformados
+    _, derived_masks = decode_observations(*encode_observations(aug_next_states), board_size)
+    np.testing.assert_array_equal(aug_next_masks, derived_masks)
+
+    # A ação permutada aplicada ao estado transformado leva ao próximo estado transformado
+    for state, action, next_state in zip(aug_states, aug_actions, aug_next_states):
+        env.set_state(state[:, :, 1] + 2 * state[:, :, 0])
+        np.testing.assert_array_equal(env.step(action)[0], next_state)
+
+
+def test_symmetric_cache_matches_equivariant_policy():
+    policy = WarnsdorffPolicy()
+    cache = SymmetricQCache(policy)
+    env = KnightTourEnv(board_size=5)
+    state = env.set_state(_random_board(5, moves=5, seed=1))
+
+    for t in range(NUM_SYMMETRIES):
+        transformed = np.ascontiguousarray(transform_boards(state, t))
+        np.testing.assert_array_equal(cache.q_values(transformed), policy.q_values(transformed))
+
+    # As 8 orientações compartilham uma única entrada do cache
+    assert cache.misses == 1
+    assert cache.hits == NUM_SYMMETRIES - 1
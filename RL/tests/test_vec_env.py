@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+from knight_env import KnightTourEnv
+from vec_env import STATUS_NAMES, VecKnightTourEnv
+
+
+@pytest.mark.parametrize('board_size', [5, 6])
+def test_step_matches_knight_env(board_size):
+    """ Cada tabuleiro do ambiente vetorizado se comporta como um KnightTourEnv. """
+    num_envs = 4
+    rng = np.random.default_rng(0)
+    vec = VecKnightTourEnv(num_envs, board_size=board_size)
+    envs = [KnightTourEnv(board_size=board_size) for _ in range(num_envs)]
+
+    obs, info = vec.reset(return_info=True)
+    for i, env in enumerate(envs):
+        env_obs, env_info = env.reset(return_info=True)
+        np.testing.assert_array_equal(obs[i], env_obs)
+        np.testing.assert_array_equal(info['action_mask'][i], env_info['action_mask'])
+
+    finished = 0
+    for _ in range(300):
+        # Mistura ações válidas e inválidas para cobrir todas as transições
+        actions = rng.integers(0, 8, size=num_envs)
+        obs, rewards, dones, info = vec.step(actions)
+        done_idx = list(np.flatnonzero(dones))
+
+        for i, env in enumerate(envs):
+            env_obs, env_reward, env_done, env_info = env.step(actions[i])
+            assert rewards[i] == pytest.approx(env_reward)
+            assert dones[i] == env_done
+            assert STATUS_NAMES[info['status'][i]] == env_info.get('status', 'moved')
+            assert info['visited_count'][i] == env.visited_count
+
+            if env_done:
+                k = done_idx.index(i)
+                np.testing.assert_array_equal(info['final_observation'][k], env_obs)
+                np.testing.assert_array_equal(info['final_action_mask'][k], env_info['action_mask'])
+                env_obs, env_info = env.reset(return_info=True)
+                finished += 1
+
+            np.testing.assert_array_equal(obs[i], env_obs)
+            np.testing.assert_array_equal(info['action_mask'][i], env_info['action_mask'])
+
+    assert finished > 0
+
+
+def test_truncation_is_not_terminal():
+    vec = VecKnightTourEnv(2, board_size=5, max_steps=3, auto_reset=False)
+    # Ação 0 a partir do centro vai para (0, 1); depois sai do tabuleiro (movimento inválido)
+    for _ in range(3):
+        _, _, dones, info = vec.step(np.zeros(2, dtype=np.int64))
+
+    assert dones.all()
+    assert info['truncated'].all()
+    assert (info['status'] == STATUS_NAMES.index('truncated')).all()
+
+
+@pytest.mark.parametrize('start_positions, expected', [
+    ([(0, 0), (0, 4), (4, 4)], [(0, 0), (0, 4), (4, 4)]),
+    ((1, 2), [(1, 2)] * 3),
+])
+def test_auto_reset_keeps_configured_starts(start_positions, expected):
+    rng = np.random.default_rng(0)
+    vec = VecKnightTourEnv(3, board_size=5)
+    obs, info = vec.reset(start_positions=start_positions, return_info=True)
+    np.testing.assert_array_equal(vec.current_positions, expected)
+    initial_obs = obs.copy()
+
+    finished = np.zeros(3, dtype=bool)
+    for _ in range(200):
+        legal = [rng.choice(np.flatnonzero(mask)) for mask in info['action_mask']]
+        obs, _, dones, info = vec.step(legal)
+        for i in np.flatnonzero(dones):
+            assert tuple(vec.current_positions[i]) == expected[i]
+            np.testing.assert_array_equal(obs[i], initial_obs[i])
+        finished |= dones
+    assert finished.all()
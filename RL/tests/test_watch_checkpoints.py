@@ -0,0 +1,38 @@
+import functools
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                'scripts', 'utils'))
+
+import watch_checkpoints  # noqa: E402
+from evaluation import evaluate_checkpoints  # noqa: E402
+
+BOARD_SIZE = 5
+
+
+def test_dropped_checkpoints_are_evaluated_and_ranked(tmp_path, write_model, monkeypatch, capsys):
+    models_dir = str(tmp_path / 'models')
+    os.makedirs(models_dir)
+    paths = [write_model(models_dir, episode, seed=episode) for episode in (100, 200)]
+    with open(os.path.join(models_dir, 'notes.txt'), 'w') as f:
+        f.write('não é checkpoint')
+
+    # Sem renice do processo de teste e com o cache num diretório temporário
+    monkeypatch.setattr(watch_checkpoints.os, 'nice', lambda increment: 0, raising=False)
+    monkeypatch.setattr(watch_checkpoints, 'evaluate_checkpoints',
+                        functools.partial(evaluate_checkpoints, cache_path=str(tmp_path / 'cache.sqlite')))
+
+    results = watch_checkpoints.watch_checkpoints(BOARD_SIZE, models_dir, interval=0.01, workers=1,
+                                                  starts='center', once=True)
+
+    assert sorted(results) == sorted(paths)
+    assert sorted(result['episode'] for result in results.values()) == [100, 200]
+    for result in results.values():
+        assert result['total_tests'] == 1
+        assert result['games'][0]['start'] == (BOARD_SIZE // 2, BOARD_SIZE // 2)
+
+    output = capsys.readouterr().out
+    assert 'RANKING (2 checkpoints avaliados)' in output
+    ranking = sorted(results.values(), key=lambda r: (r['win_rate'], r['avg_score']), reverse=True)
+    assert output.rindex(f" {ranking[0]['episode']:>8} ") < output.rindex(f" {ranking[1]['episode']:>8} ")
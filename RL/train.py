@@ -1,36 +1,130 @@
 import gym
 import numpy as np
-from dqn_agent import DQNAgent
 from knight_env import KnightTourEnv
+from prefetch import BatchPrefetcher
+from metrics_logger import TrainingLogger
+from instrumentation import PhaseTimers, format_report, flatten_report
+from checkpoint import CheckpointWriter, capture_checkpoint, latest_checkpoint, load_checkpoint, restore_checkpoint
 from tqdm import tqdm
-import csv
+import argparse
 import os
-import tensorflow as tf
-
-# --- Verificação da GPU ---
-print("=== Configuração da GPU ===")
-print(f"TensorFlow version: {tf.__version__}")
-print(f"GPUs disponíveis: {len(tf.config.list_physical_devices('GPU'))}")
-for gpu in tf.config.list_physical_devices('GPU'):
-    print(f"  - {gpu}")
-print("==========================\n")
 
 # --- Configurações ---
 BOARD_SIZE = 5
 EPISODES = 10000
 BATCH_SIZE = 64
-TARGET_UPDATE_FREQ = 10 # Atualizar a target network a cada 10 episódios
 MAX_STEPS_PER_EPISODE = 1000 # Aumentado
+# Agenda de aprendizado medida em passos do ambiente / passos de gradiente
+TRAIN_EVERY_N_STEPS = 4 # Treina a cada N passos do ambiente
+GRADIENT_STEPS_PER_UPDATE = 1 # Passos de gradiente por treino (razão update-to-data)
+LEARNING_STARTS = 1000 # Transições na memória antes do primeiro passo de gradiente
+TARGET_UPDATE_GRADIENT_STEPS = 250 # Atualizar a target network a cada N passos de gradiente
+MEMORY_SIZE = 50000 # Capacidade da memória de replay
+REPLAY_STORAGE = 'dense' # 'compact' guarda posição + bitmask (até 8x8), para memórias de milhões de transições
+LOSS = 'mse' # 'mse' ou 'huber'
+JIT_COMPILE = False # Compila o passo de treinamento com XLA
+DOUBLE_DQN = False # TD target no estilo Double DQN (ação pela rede online, valor pela target)
+AUGMENT_SYMMETRIES = False # Augmenta cada minibatch com as 8 simetrias do tabuleiro
+# Modo distribuído (--actors N): atores coletam em paralelo, este processo só treina
+ENVS_PER_ACTOR = 16 # Tabuleiros simultâneos em cada processo ator
+WEIGHT_SYNC_GRADIENT_STEPS = 50 # Publica os pesos para os atores a cada N passos de gradiente
+# Limite de quantas vezes os atores podem coletar além do que a agenda libera
+# para os passos de gradiente já dados (None = sem limite, 1 = mesma razão de um processo)
+MAX_DATA_RATIO = None
+PREFETCH_BATCHES = 0 # Minibatches sorteados em segundo plano (0 = sorteio síncrono)
+# Checkpoints completos (pesos, otimizador, epsilon, contadores, RNGs) para --resume
+CHECKPOINT_EVERY_EPISODES = 100
+CHECKPOINT_REPLAY = True # Inclui a memória de replay no checkpoint
+KEEP_CHECKPOINTS = 2 # Checkpoints completos mantidos em disco
+PROFILE_PHASES = False # Tempo por fase do loop no resumo de 100 episódios e no log de métricas
+
+def print_gpu_config():
+    # TensorFlow é importado só no processo que treina: os atores do modo
+    # distribuído (spawn) reimportam este módulo e não precisam dele
+    import tensorflow as tf
+
+    print("=== Configuração da GPU ===")
+    print(f"TensorFlow version: {tf.__version__}")
+    print(f"GPUs disponíveis: {len(tf.config.list_physical_devices('GPU'))}")
+    for gpu in tf.config.list_physical_devices('GPU'):
+        print(f"  - {gpu}")
+    print("==========================\n")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Treinamento DQN - Knight's Tour")
+    parser.add_argument('--train-every', type=int, default=TRAIN_EVERY_N_STEPS,
+                        help='Treina a cada N passos do ambiente')
+    parser.add_argument('--gradient-steps', type=int, default=GRADIENT_STEPS_PER_UPDATE,
+                        help='Passos de gradiente por treino')
+    parser.add_argument('--learning-starts', type=int, default=LEARNING_STARTS,
+                        help='Transições na memória antes de começar a treinar')
+    parser.add_argument('--target-update', type=int, default=TARGET_UPDATE_GRADIENT_STEPS,
+                        help='Atualiza a target network a cada N passos de gradiente')
+    parser.add_argument('--actors', type=int, default=0,
+                        help='Processos atores coletando experiência em paralelo (0 = treino em um processo)')
+    parser.add_argument('--max-data-ratio', type=float, default=MAX_DATA_RATIO,
+                        help='Modo distribuído: atores esperam ao coletar mais que N vezes o que a agenda '
+                             'libera para o aprendiz (padrão: sem limite)')
+    parser.add_argument('--prefetch', type=int, default=PREFETCH_BATCHES,
+                        help='Tamanho da fila de minibatches sorteados por uma thread em segundo plano (0 = desligado)')
+    parser.add_argument('--resume', action='store_true',
+                        help='Continua do último checkpoint completo em checkpoints/<tamanho>')
+    parser.add_argument('--profile', action='store_true', default=PROFILE_PHASES,
+                        help='Mede o tempo de cada fase do loop (act, env_step, sample, train_step...)')
+    args = parser.parse_args()
+
+    # Zero quebraria o módulo do agendamento e negativos desligariam treino/target sem aviso
+    for flag, value in (('--train-every', args.train_every), ('--gradient-steps', args.gradient_steps),
+                        ('--target-update', args.target_update)):
+        if value < 1:
+            parser.error(f"{flag} deve ser >= 1 (recebido {value})")
+    if args.learning_starts < 0:
+        parser.error(f"--learning-starts deve ser >= 0 (recebido {args.learning_starts})")
+    if args.max_data_ratio is not None and args.max_data_ratio < 1:
+        parser.error(f"--max-data-ratio deve ser >= 1 (recebido {args.max_data_ratio})")
+    if args.actors < 0:
+        parser.error(f"--actors deve ser >= 0 (recebido {args.actors})")
+
+    # O aprendiz do modo distribuído tem um loop próprio, sem estas opções
+    if args.actors > 0:
+        unsupported = [flag for flag, enabled in (('--resume', args.resume), ('--prefetch', args.prefetch > 0),
+                                                  ('--profile', args.profile)) if enabled]
+        if unsupported:
+            parser.error(f"{', '.join(unsupported)} ainda não suportado(s) no modo distribuído (--actors)")
+    return args
+
+def print_summary(e, last_100, total_squares):
+    """ Resumo de um grupo de 100 episódios. """
+    # Encontra o melhor episódio (prioriza vitórias, depois maior número de casas visitadas)
+    best_episode = max(last_100, key=lambda x: (x['win'], x['visited'], -x['episode']))
+
+    # Conta quantas vitórias houve no grupo
+    wins_in_group = sum(1 for ep in last_100 if ep['win'] == 1)
 
-# --- Criar pastas se não existirem ---
-os.makedirs('models', exist_ok=True)
-os.makedirs('logs', exist_ok=True)
+    print(f"\n[Resumo dos Episódios {e - 99} a {e+1}]")
+    print(f"Melhor Episódio: {best_episode['episode']} | Score: {best_episode['score']} | Max Visited: {best_episode['visited']}/{total_squares} | Win: {best_episode['win']} | Epsilon: {best_episode['epsilon']:.4f}")
+    print(f"Vitórias no grupo: {wins_in_group}/100 | Média de casas visitadas: {sum(ep['visited'] for ep in last_100)/len(last_100):.1f}")
 
-# Verificar se as pastas foram criadas
-print(f"Pasta 'models' existe: {os.path.exists('models')}")
-print(f"Pasta 'logs' existe: {os.path.exists('logs')}")
+def save_episode_model(agent, e):
+    model_path = f"models/{BOARD_SIZE}x{BOARD_SIZE}/knight_tour_dqn_b{BOARD_SIZE}_e{e+1}.weights.h5"
+    agent.save(model_path)
+    print(f"Modelo salvo em: {model_path}")
+    print(f"Arquivo do modelo existe: {os.path.exists(model_path)}")
 
 def main():
+    args = parse_args()
+
+    print_gpu_config()
+    from dqn_agent import DQNAgent
+
+    # --- Criar pastas se não existirem ---
+    os.makedirs('models', exist_ok=True)
+    os.makedirs('logs', exist_ok=True)
+
+    # Verificar se as pastas foram criadas
+    print(f"Pasta 'models' existe: {os.path.exists('models')}")
+    print(f"Pasta 'logs' existe: {os.path.exists('logs')}")
+
     # --- Inicialização ---
     env = KnightTourEnv(board_size=BOARD_SIZE)
     state_shape = env.observation_space.shape
@@ -44,48 +138,132 @@ def main():
     agent = DQNAgent(
         state_shape=state_shape, 
         action_size=action_size,
-        epsilon_decay=0.995 # Decaimento mais rápido
+        epsilon_decay=0.995, # Decaimento mais rápido
+        memory_size=MEMORY_SIZE,
+        replay_storage=REPLAY_STORAGE,
+        loss=LOSS,
+        jit_compile=JIT_COMPILE,
+        double_dqn=DOUBLE_DQN,
+        augment_symmetries=AUGMENT_SYMMETRIES
     )
 
-    # --- Logging ---
-    log_file = 'logs/training_log.csv'
-    log_header = ['Episode', 'Score', 'Max_Visited', 'Avg_Reward', 'Invalid_Moves', 'Epsilon', 'Win']
-    if not os.path.exists(log_file):
-        with open(log_file, 'w', newline='') as f:
-            writer = csv.writer(f)
-            writer.writerow(log_header)
+    print("=== Agenda de aprendizado ===")
+    print(f"Treino a cada {args.train_every} passos | {args.gradient_steps} passo(s) de gradiente por treino "
+          f"(update-to-data = {args.gradient_steps / args.train_every:.3f})")
+    print(f"Warm-up: {args.learning_starts} transições | Target network a cada {args.target_update} passos de gradiente")
+    print("=============================\n")
+
+    # Contadores globais da agenda
+    total_steps = 0
+    gradient_steps = 0
+    start_episode = 0
 
     # Lista para armazenar os últimos 100 episódios
     last_100 = []
 
+    # --- Logging ---
+    log_file = 'logs/training_log.csv'
+    # Linhas ficam em memória e são gravadas em lote (CSV legado + formato colunar)
+    logger = TrainingLogger(log_file)
+
+    # --- Checkpoints ---
+    checkpoint_dir = f'checkpoints/{BOARD_SIZE}x{BOARD_SIZE}'
+    if args.resume:
+        checkpoint_path = latest_checkpoint(checkpoint_dir)
+        if checkpoint_path is None:
+            raise SystemExit(f"Nenhum checkpoint encontrado em {checkpoint_dir}")
+
+        resumed = restore_checkpoint(agent, load_checkpoint(checkpoint_path))
+        start_episode = resumed['episode'] + 1
+        total_steps = resumed['total_steps']
+        gradient_steps = resumed['gradient_steps']
+        last_100 = resumed['last_100']
+        # Descarta linhas do log escritas depois do checkpoint (serão repetidas)
+        logger.truncate(resumed['log_state'])
+        print(f"🔁 Retomando de {checkpoint_path}: episódio {start_episode}, epsilon {agent.epsilon:.4f}, "
+              f"memória {len(agent.memory)}")
+
+    if args.actors > 0:
+        from distributed import train_distributed
+
+        print("⚠️  Modo distribuído: checkpoints completos (--resume) não são gravados; "
+              "os pesos são salvos a cada 100 episódios")
+        def on_summary(e, last_100, stats):
+            print_summary(e, last_100, env.total_squares)
+            print(f"Passos do ambiente: {stats['total_steps']} ({stats['steps_per_sec']:.0f}/s) | "
+                  f"Passos de gradiente: {stats['gradient_steps']} | Memória: {stats['memory']}")
+            save_episode_model(agent, e)
+
+        train_distributed(
+            agent, args.actors, EPISODES, BATCH_SIZE, BOARD_SIZE, MEMORY_SIZE,
+            args.train_every, args.gradient_steps, args.learning_starts, args.target_update,
+            weight_sync=WEIGHT_SYNC_GRADIENT_STEPS, envs_per_actor=ENVS_PER_ACTOR,
+            max_steps=MAX_STEPS_PER_EPISODE, max_data_ratio=args.max_data_ratio,
+            log_writer=logger.log, on_summary=on_summary
+        )
+        logger.close()
+        print("Treinamento concluído.")
+        agent.save(f"models/{BOARD_SIZE}x{BOARD_SIZE}/knight_tour_dqn_b{BOARD_SIZE}_final.weights.h5")
+        return
+
+    # Thread de prefetch, iniciada quando a memória atinge o warm-up
+    prefetcher = None
+    checkpoint_writer = CheckpointWriter(checkpoint_dir, keep=KEEP_CHECKPOINTS)
+    # Desligado, cada phase() custa apenas uma chamada de método
+    timers = PhaseTimers(enabled=args.profile)
+
     # --- Loop de Treinamento ---
-    for e in tqdm(range(EPISODES), desc="Training Progress"):
-        state = env.reset()
+    for e in tqdm(range(start_episode, EPISODES), desc="Training Progress", initial=start_episode, total=EPISODES):
+        state, info = env.reset(return_info=True)
         total_reward = 0
         invalid_move_count = 0
         
         for time in range(MAX_STEPS_PER_EPISODE):
-            valid_moves_mask = env._get_valid_moves_mask()
-            action = agent.act(state, valid_moves_mask)
+            valid_moves_mask = info['action_mask']
+            with timers.phase('act'):
+                action = agent.act(state, valid_moves_mask)
             
-            next_state, reward, done, info = env.step(action)
+            with timers.phase('env_step'):
+                next_state, reward, done, info = env.step(action)
             
             total_reward += reward
             if info.get('status') == 'invalid_move':
                 invalid_move_count += 1
                 
-            agent.remember(state, action, reward, next_state, done)
+            with timers.phase('remember'):
+                agent.remember(state, action, reward, next_state, done, info['action_mask'])
             state = next_state
+            total_steps += 1
+            timers.incr('env_steps')
+
+            # Treinamento do agente (replay) guiado por passos do ambiente
+            if (total_steps % args.train_every == 0
+                    and len(agent.memory) >= max(args.learning_starts, BATCH_SIZE)):
+                if args.prefetch > 0 and prefetcher is None:
+                    prefetcher = BatchPrefetcher(lambda: agent.sample_batch(BATCH_SIZE), depth=args.prefetch).start()
+
+                for _ in range(args.gradient_steps):
+                    if prefetcher is not None:
+                        with timers.phase('prefetch_wait'):
+                            batch = prefetcher.get()
+                    else:
+                        with timers.phase('sample'):
+                            batch = agent.sample_batch(BATCH_SIZE)
+                    with timers.phase('train_step'):
+                        agent.train_on_batch(batch)
+                    gradient_steps += 1
+                    timers.incr('gradient_steps')
+
+                    # Atualiza a target network periodicamente
+                    if gradient_steps % args.target_update == 0:
+                        with timers.phase('target_update'):
+                            agent.update_target_model()
             
             if done:
                 break
 
-        # Treinamento do agente (replay)
-        agent.replay(BATCH_SIZE)
-
-        # Atualiza a target network periodicamente
-        if e % TARGET_UPDATE_FREQ == 0:
-            agent.update_target_model()
+        # Epsilon decai uma vez por episódio, independente do número de passos de gradiente
+        agent.decay_epsilon()
 
         # Logging
         score = time + 1
@@ -98,13 +276,12 @@ def main():
             print(f"Arquivo de log: {log_file}")
             print(f"Arquivo existe: {os.path.exists(log_file)}")
         
-        with open(log_file, 'a', newline='') as f:
-            writer = csv.writer(f)
-            writer.writerow([e, score, max_visited, f"{avg_reward:.2f}", invalid_move_count, f"{agent.epsilon:.4f}", win])
+        with timers.phase('log'):
+            logger.log(e, score, max_visited, avg_reward, invalid_move_count, agent.epsilon, win)
         
         # Debug: verificar se o arquivo foi escrito (apenas nos primeiros episódios)
         if e < 5:
-            print(f"Episódio {e}: Log escrito - Score: {score}, Max Visited: {max_visited}, Win: {win}")
+            print(f"Episódio {e}: Log registrado - Score: {score}, Max Visited: {max_visited}, Win: {win}")
 
         # Guardar desempenho atual
         last_100.append({
@@ -130,21 +307,36 @@ def main():
 
         # Ao final de cada grupo de 100 episódios
         if (e + 1) % 100 == 0:
-            # Encontra o melhor episódio (prioriza vitórias, depois maior número de casas visitadas)
-            best_episode = max(last_100, key=lambda x: (x['win'], x['visited'], -x['episode']))
-            
-            # Conta quantas vitórias houve no grupo
-            wins_in_group = sum(1 for ep in last_100 if ep['win'] == 1)
-            
-            print(f"\n[Resumo dos Episódios {e - 99} a {e+1}]")
-            print(f"Melhor Episódio: {best_episode['episode']} | Score: {best_episode['score']} | Max Visited: {best_episode['visited']}/{env.total_squares} | Win: {best_episode['win']} | Epsilon: {best_episode['epsilon']:.4f}")
-            print(f"Vitórias no grupo: {wins_in_group}/100 | Média de casas visitadas: {sum(ep['visited'] for ep in last_100)/len(last_100):.1f}")
+            print_summary(e, last_100, env.total_squares)
+            print(f"Passos do ambiente: {total_steps} | Passos de gradiente: {gradient_steps} | Memória: {len(agent.memory)}")
+            if prefetcher is not None:
+                stats = prefetcher.stats()
+                print(f"Prefetch: produtor parado {stats['producer_stall']:.1f}s | "
+                      f"treino esperando batch {stats['consumer_stall']:.1f}s | fila {stats['queue_size']}/{args.prefetch}")
+            if timers.enabled:
+                report = timers.report()
+                for line in format_report(report):
+                    print(line)
+                logger.log_metrics(e, flatten_report(report))
 
             # Salva modelo
-            model_path = f"models/{BOARD_SIZE}x{BOARD_SIZE}/knight_tour_dqn_b{BOARD_SIZE}_e{e+1}.weights.h5"
-            agent.save(model_path)
-            print(f"Modelo salvo em: {model_path}")
-            print(f"Arquivo do modelo existe: {os.path.exists(model_path)}")
+            with timers.phase('model_save'):
+                save_episode_model(agent, e)
+
+        # Checkpoint completo, gravado em segundo plano
+        if (e + 1) % CHECKPOINT_EVERY_EPISODES == 0:
+            with timers.phase('checkpoint'):
+                checkpoint_writer.submit(capture_checkpoint(agent, e, {
+                    'total_steps': total_steps,
+                    'gradient_steps': gradient_steps,
+                    'last_100': last_100,
+                    'log_state': logger.state(),
+                }, include_replay=CHECKPOINT_REPLAY))
+
+    if prefetcher is not None:
+        prefetcher.stop()
+    checkpoint_writer.close()
+    logger.close()
 
     print("Treinamento concluído.")
     final_model_path = f"models/{BOARD_SIZE}x{BOARD_SIZE}/knight_tour_dqn_b{BOARD_SIZE}_final.weights.h5"
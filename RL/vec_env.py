@@ -0,0 +1,176 @@
+import numpy as np
+
+from bitboard import KNIGHT_MOVES, knight_move_table
+
+# Códigos de status por tabuleiro retornados em info['status']
+STATUS_MOVED = 0
+STATUS_INVALID_MOVE = 1
+STATUS_WIN = 2
+STATUS_STUCK = 3
+STATUS_TRUNCATED = 4
+STATUS_NAMES = ('moved', 'invalid_move', 'win', 'stuck', 'truncated')
+
+
+class VecKnightTourEnv:
+    """
+    Versão vetorizada do KnightTourEnv: mantém N tabuleiros empilhados em arrays
+    NumPy e executa reset/step/máscara/observação para todos de uma vez.
+
+    As recompensas e condições de término são as mesmas do ambiente simples.
+    Com auto_reset=True, tabuleiros que terminam são reiniciados no próprio
+    step(), na mesma casa inicial do último reset(); a observação terminal
+    fica em info['final_observation'].
+    """
+
+    def __init__(self, num_envs, board_size=5, max_steps=None, auto_reset=True):
+        self.num_envs = num_envs
+        self.board_size = board_size
+        self.total_squares = self.board_size * self.board_size
+        self.max_steps = max_steps
+        self.auto_reset = auto_reset
+
+        self.knight_moves = np.array(KNIGHT_MOVES)
+        self.action_size = len(self.knight_moves)
+        self.observation_shape = (self.board_size, self.board_size, 3)
+
+        # Tabela de destinos: _targets[casa, ação] = índice da casa de destino ou -1 (fora do tabuleiro)
+        self._targets = knight_move_table(self.board_size)
+
+        # Tabuleiros achatados: 0 = livre, 1 = visitado, 2 = cavalo
+        self.boards = np.zeros((self.num_envs, self.total_squares), dtype=np.int8)
+        self.positions = np.zeros(self.num_envs, dtype=np.int64)
+        self.visited_counts = np.zeros(self.num_envs, dtype=np.int64)
+        self.steps = np.zeros(self.num_envs, dtype=np.int64)
+        self._rows = np.arange(self.num_envs)
+
+        self.reset()
+
+    @property
+    def current_positions(self):
+        """ Posições atuais como array (N, 2) de (linha, coluna). """
+        return np.stack(np.divmod(self.positions, self.board_size), axis=-1)
+
+    def reset(self, start_positions=None, return_info=False):
+        """
+        Reseta todos os tabuleiros. start_positions pode ser None (centro),
+        uma única posição (linha, coluna) ou um array (N, 2); os auto-resets
+        seguintes reutilizam as mesmas casas iniciais.
+        Com return_info=True retorna (observações, {'action_mask': máscaras}).
+        """
+        if start_positions is None:
+            center = self.board_size // 2
+            squares = center * self.board_size + center
+        else:
+            start_positions = np.asarray(start_positions).reshape(-1, 2)
+            squares = start_positions[:, 0] * self.board_size + start_positions[:, 1]
+        self._start_squares = np.broadcast_to(squares, (self.num_envs,)).astype(np.int64)
+        self._reset_boards(self._rows)
+        self.action_masks = self.get_valid_moves_masks()
+        obs = self._get_observations(self.action_masks)
+        if return_info:
+            return obs, {'action_mask': self.action_masks}
+        return obs
+
+    def _reset_boards(self, indices):
+        self.boards[indices] = 0
+        self.positions[indices] = self._start_squares[indices]
+        self.boards[indices, self.positions[indices]] = 2
+        self.visited_counts[indices] = 1
+        self.steps[indices] = 0
+
+    def get_valid_moves_masks(self):
+        """
+        Calcula a máscara (N, 8) de ações válidas para todos os tabuleiros.
+        A máscara do estado atual já fica em cache no atributo action_masks.
+        """
+        targets = self._targets[self.positions]
+        free = self.boards[self._rows[:, None], np.maximum(targets, 0)] == 0
+        return (targets >= 0) & free
+
+    def _get_observations(self, masks=None):
+        if masks is None:
+            masks = self.get_valid_moves_masks()
+
+        obs = np.zeros((self.num_envs, self.total_squares, 3), dtype=np.float32)
+        obs[self._rows, self.positions, 0] = 1.0
+        obs[:, :, 1] = self.boards == 1
+
+        env_idx, action_idx = np.nonzero(masks)
+        obs[env_idx, self._targets[self.positions[env_idx], action_idx], 2] = 1.0
+
+        return obs.reshape((self.num_envs,) + self.observation_shape)
+
+    def step(self, actions):
+        """
+        Executa uma ação em cada tabuleiro.
+
+        Retorna (observações, recompensas, dones, info), onde info contém
+        'status' (códigos STATUS_*), 'truncated' (dones por max_steps, que não
+        são terminais para o bootstrap), 'visited_count' (antes do auto-reset),
+        'action_mask' (das observações retornadas) e, para os tabuleiros que
+        terminaram, 'final_observation' e 'final_action_mask' na ordem de
+        np.flatnonzero(dones).
+        """
+        actions = np.asarray(actions, dtype=np.int64)
+        targets = self._targets[self.positions, actions]
+
+        valid = targets >= 0
+        valid[valid] = self.boards[self._rows[valid], targets[valid]] == 0
+
+        rewards = np.full(self.num_envs, -2.0, dtype=np.float32)
+        status = np.full(self.num_envs, STATUS_INVALID_MOVE, dtype=np.int8)
+
+        moved = self._rows[valid]
+        rewards[moved] = 1.0 + (self.visited_counts[moved] / self.total_squares) * 5.0
+        status[moved] = STATUS_MOVED
+
+        self.boards[moved, self.positions[moved]] = 1
+        self.positions[moved] = targets[moved]
+        self.boards[moved, self.positions[moved]] = 2
+        self.visited_counts[moved] += 1
+        self.steps += 1
+
+        masks = self.get_valid_moves_masks()
+
+        win = valid & (self.visited_counts == self.total_squares)
+        stuck = valid & ~win & ~masks.any(axis=1)
+        rewards[win] = -1.0 * (self.total_squares - self.visited_counts[win])
+        rewards[stuck] = -10.0
+        status[win] = STATUS_WIN
+        status[stuck] = STATUS_STUCK
+        dones = win | stuck
+
+        truncated = np.zeros(self.num_envs, dtype=bool)
+        if self.max_steps is not None:
+            truncated = ~dones & (self.steps >= self.max_steps)
+            status[truncated] = STATUS_TRUNCATED
+            dones |= truncated
+
+        obs = self._get_observations(masks)
+        info = {
+            'status': status,
+            'truncated': truncated,
+            'visited_count': self.visited_counts.copy(),
+        }
+
+        done_idx = np.flatnonzero(dones)
+        if self.auto_reset and len(done_idx) > 0:
+            info['final_observation'] = obs[done_idx].copy()
+            info['final_action_mask'] = masks[done_idx]
+            self._reset_boards(done_idx)
+            masks = self.get_valid_moves_masks()
+            obs[done_idx] = self._get_observations(masks)[done_idx]
+
+        self.action_masks = masks
+        info['action_mask'] = masks
+        return obs, rewards, dones, info
+
+    def render(self, index=0):
+        """ Renderiza um dos tabuleiros no console. """
+        render_board = self.boards[index].reshape(self.board_size, self.board_size).astype(str)
+        render_board[render_board == '0'] = '.'
+        render_board[render_board == '1'] = 'V'
+        render_board[render_board == '2'] = 'K'
+        print(f"[{index}] Visited: {self.visited_counts[index]}/{self.total_squares}")
+        print("\n".join(" ".join(row) for row in render_board))
+        print("-" * 20)